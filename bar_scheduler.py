@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Bar-Close Scheduler
+Decides when the main loop wakes next: shortly after the earliest entry-bar
+close or market open, with exchange groups staggered so their downloads do
+not all hit Yahoo at the same second, or at the next quote poll while trades
+are open
+"""
+
+from typing import Iterable, Tuple
+
+import pandas as pd
+
+from bulk_fetch import exchange_group
+
+# Wave order after a bar boundary (one bulk download group per wave)
+STAGGER_ORDER = ["FX", "CRYPTO", "FUT", "IN", "OTHER"]
+
+
+class BarCloseScheduler:
+    def __init__(self, stagger_seconds: float = 10, poll_seconds: float = 60,
+                 max_sleep_seconds: float = 300, min_sleep_seconds: float = 1):
+        self.stagger = pd.Timedelta(seconds=stagger_seconds)
+        self.poll = pd.Timedelta(seconds=poll_seconds)
+        self.max_sleep = pd.Timedelta(seconds=max_sleep_seconds)
+        self.min_sleep = pd.Timedelta(seconds=min_sleep_seconds)
+
+    def offset(self, symbol: str) -> pd.Timedelta:
+        """Delay after a bar close for the symbol's exchange group"""
+        group = exchange_group(symbol)
+        slot = STAGGER_ORDER.index(group) if group in STAGGER_ORDER else len(STAGGER_ORDER)
+        return self.stagger * slot
+
+    def next_wake(self, now: pd.Timestamp, triggers: Iterable[pd.Timestamp],
+                  polling: bool) -> Tuple[pd.Timestamp, str]:
+        """(wake time, reason) for the earliest future trigger, the next poll or the heartbeat cap"""
+        candidates = [(trigger, "bar close") for trigger in triggers if trigger > now]
+        if polling:
+            candidates.append((now + self.poll, "quote poll"))
+        candidates.append((now + self.max_sleep, "heartbeat"))
+        wake, reason = min(candidates, key=lambda candidate: candidate[0])
+        return max(wake, now + self.min_sleep), reason
+
+
+# Test function
+if __name__ == "__main__":
+    scheduler = BarCloseScheduler()
+    now = pd.Timestamp("2025-01-08 10:20:30", tz="UTC")
+    bar_close = pd.Timestamp("2025-01-08 11:00:00", tz="UTC") + pd.Timedelta(seconds=60)
+    for symbol in ["EURUSD=X", "BTC-USD", "GC=F", "RELIANCE.NS", "^GSPC"]:
+        print(f"{symbol:<12} triggers at {bar_close + scheduler.offset(symbol)}")
+    print("Idle:        ", scheduler.next_wake(now, [bar_close], polling=False))
+    print("Open trades: ", scheduler.next_wake(now, [bar_close], polling=True))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Compact Bar Series
+OHLCV bars and indicator columns as contiguous NumPy arrays with int64 epoch
+timestamps, instead of DataFrames that grow a column at a time. Indicators
+and rule rows work on it directly; DataFrames are only built at the edges
+(downloads in, alerts / screenshots / dashboard out)
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class BarSeries:
+    """
+    Bars of one symbol and timeframe. `time` holds UTC epoch nanoseconds,
+    `columns` float64 arrays of the same length. float32 was ruled out: it
+    keeps ~7 significant digits, which moves BTC prices by cents and
+    accumulates in EMAs over thousands of bars.
+    """
+
+    __slots__ = ("time", "tz", "columns")
+
+    def __init__(self, time: np.ndarray, columns: Dict[str, np.ndarray], tz=None):
+        self.time = np.ascontiguousarray(time, dtype=np.int64)
+        self.columns = {name: np.ascontiguousarray(values, dtype=np.float64) for name, values in columns.items()}
+        self.tz = tz
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "BarSeries":
+        index = df.index
+        naive = index.tz_convert("UTC").tz_localize(None) if index.tz is not None else index
+        return cls(naive.as_unit("ns").asi8, {col: df[col].to_numpy(dtype=np.float64) for col in df.columns}, index.tz)
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        naive = pd.DatetimeIndex(self.time.view("datetime64[ns]"))
+        return naive.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else naive
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(dict(self.columns), index=self.index)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def timestamp(self, i: int) -> pd.Timestamp:
+        if self.tz is not None:
+            return pd.Timestamp(int(self.time[i]), tz="UTC").tz_convert(self.tz)
+        return pd.Timestamp(int(self.time[i]))
+
+    def row(self, i: int) -> "BarRow":
+        return BarRow(self, i if i >= 0 else len(self) + i)
+
+    def tail(self, n: int) -> "BarSeries":
+        """Last `n` bars (views on the same arrays)"""
+        n = min(n, len(self))
+        return BarSeries(self.time[len(self) - n:], {k: v[len(v) - n:] for k, v in self.columns.items()}, self.tz)
+
+    def with_columns(self, columns: Dict[str, np.ndarray]) -> "BarSeries":
+        """Same bars with added / replaced columns (existing arrays are shared, not copied)"""
+        return BarSeries(self.time, {**self.columns, **columns}, self.tz)
+
+    @property
+    def nbytes(self) -> int:
+        return self.time.nbytes + sum(values.nbytes for values in self.columns.values())
+
+
+class BarRow(Mapping):
+    """One bar, read like a DataFrame row: row['Close'], row.get('RSI'), row.name"""
+
+    __slots__ = ("series", "i")
+
+    def __init__(self, series: BarSeries, i: int):
+        self.series = series
+        self.i = i
+
+    def __getitem__(self, name: str) -> float:
+        return float(self.series.columns[name][self.i])
+
+    def __iter__(self):
+        return iter(self.series.columns)
+
+    def __len__(self) -> int:
+        return len(self.series.columns)
+
+    @property
+    def name(self) -> pd.Timestamp:
+        return self.series.timestamp(self.i)
+
+
+# ---- Indicators (same operations as calculate_macd / _ema / _rsi / _atr) ----
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """ewm(span, adjust=False).mean() through pandas' kernel on the bare array"""
+    return pd.Series(values, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    return pd.Series(values, copy=False).rolling(window=period).mean().to_numpy()
+
+
+def with_indicators(series: BarSeries, fast: int = 12, slow: int = 26, signal: int = 9,
+                    ema_periods: Iterable[int] = (), rsi_period: Optional[int] = None,
+                    atr_period: Optional[int] = None) -> BarSeries:
+    close = series['Close']
+    macd = ewm_mean(close, fast) - ewm_mean(close, slow)
+    signal_line = ewm_mean(macd, signal)
+    columns = {'MACD_Line': macd, 'Signal_Line': signal_line, 'Histogram': macd - signal_line}
+    for period in ema_periods:
+        columns[f'EMA_{period}'] = ewm_mean(close, period)
+    if rsi_period:
+        delta = np.empty_like(close)
+        delta[0] = np.nan
+        np.subtract(close[1:], close[:-1], out=delta[1:])
+        gain = rolling_mean(np.where(delta > 0, delta, 0.0), rsi_period)
+        loss = rolling_mean(-np.where(delta < 0, delta, 0.0), rsi_period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns['RSI'] = 100 - (100 / (1 + gain / loss))
+    if atr_period:
+        high, low = series['High'], series['Low']
+        prev_close = np.empty_like(close)
+        prev_close[0] = np.nan
+        prev_close[1:] = close[:-1]
+        # fmax skips NaN like DataFrame.max(axis=1)
+        ranges = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        columns['ATR'] = rolling_mean(ranges, atr_period)
+    return series.with_columns(columns)
+
+
+# Test function
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+    from streaming_indicators import StreamingIndicators
+
+    def frames_for(count: int, seed: int = 3):
+        """Per instrument: 2y daily trend, 1y of 4H momentum, 30d hourly entry"""
+        rng = np.random.default_rng(seed)
+        out = []
+        for _ in range(count):
+            frames = []
+            for bars, freq in ((520, "1D"), (1560, "4h"), (500, "1h")):
+                idx = pd.date_range(end="2025-06-30", periods=bars, freq=freq, tz="UTC")
+                close = 100 + np.cumsum(rng.normal(0, 0.5, bars))
+                frames.append(pd.DataFrame({
+                    "Open": close, "High": close + rng.uniform(0, 1, bars),
+                    "Low": close - rng.uniform(0, 1, bars), "Close": close, "Volume": 1000.0
+                }, index=idx))
+            out.append(frames)
+        return out
+
+    specs = [dict(ema_periods=(200,)), dict(), dict(ema_periods=(200,), rsi_period=14, atr_period=14)]
+    references = [StreamingIndicators(**spec) for spec in specs]
+
+    def dataframe_cycle(universe):
+        """Current representation: a copy of each frame with indicator columns added one by one"""
+        kept = []
+        for frames in universe:
+            out = [ref.frame(df) for ref, df in zip(references, frames)]
+            kept.append((out, [df.iloc[-2] for df in out], out[1].iloc[-3], out[2].iloc[-3]))
+        return kept
+
+    def bar_cycle(universe):
+        kept = []
+        for frames in universe:
+            out = [with_indicators(BarSeries.from_frame(df), **spec) for spec, df in zip(specs, frames)]
+            kept.append((out, [s.row(-2) for s in out], out[1].row(-3), out[2].row(-3)))
+        return kept
+
+    print("🧪 BarSeries parity with the DataFrame indicators")
+    universe = frames_for(5)
+    worst = 0.0
+    for frames in universe:
+        for ref, spec, df in zip(references, specs, frames):
+            a = ref.frame(df)[ref.columns].to_numpy()
+            b = with_indicators(BarSeries.from_frame(df), **spec).to_frame()[ref.columns].to_numpy()
+            diff = np.where(np.isnan(a) & np.isnan(b), 0.0, np.abs(a - b))
+            worst = max(worst, float(np.nan_to_num(diff, nan=np.inf).max()))
+    print(f"  max |diff| {worst:.1e} {'✅' if worst == 0 else '❌'}")
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    print(f"⏱️ Indicator stage of one cycle, {count} instruments x (520 1D + 1560 4H + 500 1H bars)")
+    universe = frames_for(count)
+    for label, run in (("DataFrame", dataframe_cycle), ("BarSeries", bar_cycle)):
+        run(universe[:2])
+        started = time.perf_counter()
+        kept = run(universe)
+        elapsed = time.perf_counter() - started
+        if label == "DataFrame":
+            size = sum(df.memory_usage(index=True, deep=True).sum() for out, *_ in kept for df in out)
+        else:
+            size = sum(s.nbytes for out, *_ in kept for s in out)
+        del kept
+        tracemalloc.start()
+        run(universe)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {label:<9} {elapsed * 1000:7.1f} ms | held {size / 2**20:6.1f} MiB | peak {peak / 2**20:6.1f} MiB")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Persistent Incremental Bar Store
+Keeps one columnar file per (symbol, interval) under BASE_DIR so each cycle
+only downloads the bars newer than the last stored one instead of the full
+2y/1y history, and restarts start warm
+"""
+
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+from timeframes import at_index_tz, period_covers, period_to_delta, slice_period
+
+try:
+    import pyarrow  # noqa: F401  (parquet engine)
+    STORE_FORMAT = "parquet"
+except ImportError:
+    STORE_FORMAT = "pickle"
+
+# Candidate incremental download windows, shortest first
+REFRESH_PERIODS = ["5d", "1mo", "3mo", "6mo", "1y", "2y"]
+
+
+def longest_period(a: str, b: str) -> str:
+    return a if period_covers(a, b) else b
+
+
+class BarStore:
+    """Append-only on-disk OHLCV store with a rewritable forming bar"""
+
+    def __init__(self, root: Path, full_refresh_hours: float = 24,
+                 clock: Optional[Callable[[], pd.Timestamp]] = None):
+        self.root = Path(root)
+        # The data provider's clock (UTC); windows and refresh ages are measured on it
+        self.clock = clock or (lambda: pd.Timestamp.now(tz="UTC"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Yahoo back-adjusts history after dividends/splits, so every file is
+        # re-downloaded in full once in a while
+        self.full_refresh_hours = full_refresh_hours
+        # In-memory mirror so a running process only reads each file once
+        self.memory = {}
+        # Serialises refresh -> download -> merge for one file across fetch workers
+        self.locks = defaultdict(threading.Lock)
+
+    def lock(self, symbol: str, interval: str) -> threading.Lock:
+        return self.locks[(symbol, interval)]
+
+    def path(self, symbol: str, interval: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9]", "_", symbol)
+        ext = "parquet" if STORE_FORMAT == "parquet" else "pkl"
+        return self.root / f"{safe}_{interval}.{ext}"
+
+    def load(self, symbol: str, interval: str) -> pd.DataFrame:
+        if (symbol, interval) in self.memory:
+            return self.memory[(symbol, interval)]
+        path = self.path(symbol, interval)
+        if not path.exists():
+            return pd.DataFrame()
+        try:
+            if STORE_FORMAT == "parquet":
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_pickle(path)
+        except Exception as e:
+            print(f"  ⚠️ Bar store file unreadable, refetching {symbol} ({interval}): {e}")
+            return pd.DataFrame()
+        self.memory[(symbol, interval)] = df
+        return df
+
+    def save(self, symbol: str, interval: str, df: pd.DataFrame):
+        self.memory[(symbol, interval)] = df
+        path = self.path(symbol, interval)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            if STORE_FORMAT == "parquet":
+                df.to_parquet(tmp)
+            else:
+                df.to_pickle(tmp)
+            tmp.replace(path)
+        except Exception as e:
+            print(f"  ⚠️ Failed to save bar store for {symbol} ({interval}): {e}")
+
+    def refresh_period(self, symbol: str, interval: str, period: str) -> Tuple[str, bool]:
+        """
+        Decide what to download for a `period` request.
+        Returns (download_period, is_full): a full download of the longest window
+        kept for this file when the store is cold, does not reach back far enough
+        or is due a full refresh, otherwise the shortest window that overlaps
+        the last stored bar.
+        """
+        stored = self.load(symbol, interval)
+        if stored.empty:
+            return period, True
+
+        window = longest_period(stored.attrs.get("period", period), period)
+        now = at_index_tz(self.clock(), stored.index)
+        # First bar may legitimately start a few days after the window (weekends/holidays)
+        if stored.index[0] > now - period_to_delta(period) + pd.Timedelta(days=5):
+            return window, True
+
+        full_refresh = stored.attrs.get("full_refresh")
+        refreshed_at = pd.Timestamp(full_refresh) if full_refresh else None
+        # Stamps without a timezone (local wall time, older stores) are refreshed once
+        if (refreshed_at is None or refreshed_at.tzinfo is None
+                or self.clock() - refreshed_at > pd.Timedelta(hours=self.full_refresh_hours)):
+            return window, True
+
+        oldest_needed = stored.index[-1] - pd.Timedelta(days=1)
+        for candidate in REFRESH_PERIODS:
+            if now - period_to_delta(candidate) <= oldest_needed:
+                return candidate, False
+        return window, True
+
+    def update(self, symbol: str, interval: str, period: str, fresh: pd.DataFrame,
+               full: bool) -> pd.DataFrame:
+        """
+        Merge freshly downloaded bars into the store and return the `period` window.
+        Stored bars at or after the first fresh bar (the still-forming bar and any
+        revised ones) are overwritten, newer bars are appended.
+        """
+        stored = self.load(symbol, interval)
+        now = self.clock()
+        if fresh.empty:
+            return slice_period(stored, period, now) if not stored.empty else fresh
+
+        if stored.empty:
+            merged = fresh.copy()
+        else:
+            merged = pd.concat([stored[stored.index < fresh.index[0]], fresh])
+            merged = merged[~merged.index.duplicated(keep='last')]
+
+        window = longest_period(stored.attrs.get("period", period), period)
+        merged = slice_period(merged, window, now)
+        merged.attrs = {
+            "period": window,
+            "full_refresh": now.isoformat() if full else stored.attrs.get("full_refresh"),
+        }
+        self.save(symbol, interval, merged)
+        return slice_period(merged, period, now)
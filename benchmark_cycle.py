@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Offline Cycle Benchmark
+Runs full strategy cycles against recorded bars (MARKET_DATA_PROVIDER=replay)
+in a scratch copy of the code, so timings are repeatable on a box without
+internet and no live state, alerts or screenshots are touched.
+
+  # 1. Record one live cycle (needs internet)
+  python3 benchmark_cycle.py --record replay_data
+  # 2. Benchmark offline, e.g. with 150ms simulated round trips
+  python3 benchmark_cycle.py --replay replay_data --latency-ms 150 --runs 3
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+
+
+def run_cycle(env_overrides: dict) -> dict:
+    """Run one RUN_ONCE cycle in a temp copy of the code and collect its output"""
+    with tempfile.TemporaryDirectory(prefix="biasbuster_bench_") as workdir:
+        # Code only: no .env (Telegram credentials), no live state files
+        for path in BASE_DIR.glob("*.py"):
+            shutil.copy2(path, workdir)
+
+        env = dict(os.environ)
+        env.update({
+            "RUN_ONCE": "True",
+            "ENABLE_SCREENSHOTS": "False",
+            "TELEGRAM_BOT_TOKEN": "",
+            "TELEGRAM_CHAT_ID": "",
+            "PYTHONUNBUFFERED": "1",
+        })
+        env.update(env_overrides)
+
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "forex_macd_strategy.py"], cwd=workdir, env=env,
+            capture_output=True, text=True
+        )
+        wall = time.perf_counter() - started
+
+        match = re.search(r"Cycle time: ([\d.]+)s", proc.stdout)
+        result = {
+            "returncode": proc.returncode,
+            "wall_s": wall,
+            "cycle_s": float(match.group(1)) if match else None,
+            "log": proc.stdout + proc.stderr
+        }
+        signals_path = Path(workdir) / "forex_macd_signals.json"
+        if signals_path.exists():
+            with open(signals_path, 'r') as f:
+                output = json.load(f)
+            data = output.get("data", [])
+            for res in data:
+                res.pop("timestamp", None)
+            result["instruments"] = len(data)
+            result["frame_cache"] = output.get("frame_cache")
+            result["digest"] = hashlib.sha256(
+                json.dumps(data, sort_keys=True, default=str).encode()
+            ).hexdigest()[:12]
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strategy cycles on recorded market data")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--replay", help="Directory of recorded bars to replay")
+    group.add_argument("--record", help="Record one live cycle into this directory")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated latency per request")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter fraction")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--log", action="store_true", help="Print the strategy log of every run")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"🎙️ Recording one live cycle into {args.record}...")
+        result = run_cycle({
+            "MARKET_DATA_PROVIDER": "record",
+            "REPLAY_DIR": str(Path(args.record).resolve())
+        })
+        print(result["log"] if args.log or result["returncode"] else "")
+        print(f"✅ Recorded {result.get('instruments', 0)} instruments in {result['wall_s']:.1f}s")
+        return
+
+    replay_dir = Path(args.replay).resolve()
+    print(f"⏱️ Benchmarking {args.runs} cycles on {replay_dir} "
+          f"({args.latency_ms:.0f}ms ±{args.jitter:.0%} per request)")
+    env = {
+        "MARKET_DATA_PROVIDER": "replay",
+        "REPLAY_DIR": str(replay_dir),
+        "REPLAY_LATENCY_MS": str(args.latency_ms),
+        "REPLAY_JITTER": str(args.jitter),
+    }
+
+    cycles = []
+    for run in range(1, args.runs + 1):
+        result = run_cycle(env)
+        if args.log or result["returncode"]:
+            print(result["log"])
+        if result["returncode"]:
+            print(f"❌ Run {run} failed (exit {result['returncode']})")
+            sys.exit(1)
+        cache = result.get("frame_cache") or {}
+        print(f"  Run {run}: cycle {result['cycle_s']:.2f}s | process {result['wall_s']:.2f}s | "
+              f"{result.get('instruments', 0)} instruments | {cache.get('misses', '?')} downloads | "
+              f"digest {result.get('digest')}")
+        cycles.append(result)
+
+    times = sorted(r["cycle_s"] for r in cycles if r["cycle_s"] is not None)
+    if times:
+        print(f"📊 Cycle time: min {times[0]:.2f}s | median {times[len(times) // 2]:.2f}s | max {times[-1]:.2f}s")
+    digests = {r.get("digest") for r in cycles}
+    print("✅ Identical signal output across runs" if len(digests) == 1 else f"⚠️ Outputs differ: {digests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Bulk Multi-Ticker Download
+Requests every symbol of an (interval, period) pair in grouped batches before
+the per-instrument loop and splits the result back into per-symbol frames
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+FrameKey = Tuple[str, str, str]
+
+
+def exchange_group(symbol: str) -> str:
+    """
+    Group symbols that share an exchange timezone. yf.download converts every
+    ticker in a batch to the most common timezone, which would shift the 4H
+    resample buckets, so batches never mix groups.
+    """
+    if symbol.endswith((".NS", ".BO")) or symbol in ("^NSEI", "^NSEBANK", "^BSESN", "^CNXIT"):
+        return "IN"
+    if symbol.endswith("=X"):
+        return "FX"
+    if symbol.endswith("=F"):
+        return "FUT"
+    if symbol.endswith("-USD"):
+        return "CRYPTO"
+    return "OTHER"
+
+
+def plan_batches(keys: Iterable[FrameKey], batch_size: int) -> List[Tuple[str, str, List[str]]]:
+    """Split frame keys into (interval, period, symbols) batches of at most batch_size"""
+    groups: Dict[Tuple[str, str, str], List[str]] = {}
+    for symbol, interval, period in dict.fromkeys(keys):
+        groups.setdefault((interval, period, exchange_group(symbol)), []).append(symbol)
+
+    batches = []
+    for (interval, period, _), symbols in groups.items():
+        for i in range(0, len(symbols), max(1, batch_size)):
+            batches.append((interval, period, symbols[i:i + batch_size]))
+    return batches
+
+
+def split_batch(data: pd.DataFrame, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a group_by='ticker' download into per-symbol OHLCV frames"""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    available = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        df = data[symbol]
+        df = df[[col for col in OHLCV_COLUMNS if col in df.columns]]
+        # The batch index is the union of all tickers; drop the rows this one never traded
+        df = df.dropna(how='all')
+        if not df.empty:
+            frames[symbol] = df
+    return frames
+
+
+def bulk_fetch_frames(keys: Iterable[FrameKey], batch_size: int,
+                      fallback: Callable[[str, str, str], pd.DataFrame],
+                      download: Callable[[List[str], str, str], pd.DataFrame],
+                      max_workers: int = 1) -> Dict[FrameKey, pd.DataFrame]:
+    """
+    Fetch all keys in grouped batches through `download` (a provider's
+    multi-symbol download), up to `max_workers` batches at a time.
+    Symbols missing or empty in a batch result (or every symbol of a batch
+    that raised) fall back to single-symbol fetches so one bad ticker cannot
+    blank out the rest of the batch.
+    """
+    def fetch_batch(batch_spec):
+        interval, period, symbols = batch_spec
+        try:
+            batch = split_batch(download(symbols, interval, period), symbols)
+        except Exception as e:
+            print(f"  ⚠️ Bulk download failed for {len(symbols)} symbols ({interval}/{period}): {e}")
+            batch = {}
+
+        missing = [s for s in symbols if s not in batch]
+        if missing:
+            print(f"  ↩️ Falling back to single fetches for {len(missing)} of {len(symbols)} symbols ({interval}/{period})")
+        for symbol in missing:
+            batch[symbol] = fallback(symbol, interval, period)
+        return batch
+
+    batches = plan_batches(keys, batch_size)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = list(pool.map(fetch_batch, batches))
+
+    # Assemble in plan order so the output does not depend on completion order
+    frames: Dict[FrameKey, pd.DataFrame] = {}
+    for (interval, period, symbols), batch in zip(batches, results):
+        for symbol in symbols:
+            frames[(symbol, interval, period)] = batch[symbol]
+    return frames
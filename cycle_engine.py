@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Asyncio Cycle Engine
+Runs one analysis cycle as a three-stage pipeline so network latency is hidden
+behind indicator computation:
+  1. fetch   - async producers download frames on an I/O thread pool
+  2. compute - indicators and rule evaluation on a CPU executor
+  3. apply   - side effects, applied one instrument at a time in input order
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+STAGES = ("fetch", "compute", "apply")
+
+
+class AsyncCycleEngine:
+    """Bounded three-stage pipeline over a list of instruments"""
+
+    def __init__(self, load: Callable[[Any], Any], prepare: Callable[[Any, Any], Any],
+                 apply: Callable[[Any, Any], Any],
+                 on_error: Optional[Callable[[Any, Exception], None]] = None,
+                 max_in_flight: int = 16, queue_size: int = 8,
+                 io_workers: int = 8, cpu_workers: int = 2):
+        self.load = load
+        self.prepare = prepare
+        self.apply = apply
+        self.on_error = on_error
+        self.max_in_flight = max(1, max_in_flight)
+        self.queue_size = max(1, queue_size)
+        self.io_workers = max(1, io_workers)
+        self.cpu_workers = max(1, cpu_workers)
+        self.timings: Dict[str, Dict] = {}
+
+    def _record(self, stage: str, started: float):
+        elapsed = time.perf_counter() - started
+        stats = self.timings[stage]
+        stats["count"] += 1
+        stats["busy_s"] += elapsed
+        stats["max_s"] = max(stats["max_s"], elapsed)
+
+    def _fail(self, item: Any, error: Exception):
+        if self.on_error:
+            self.on_error(item, error)
+
+    def run(self, items: List[Any]) -> List[Any]:
+        """Run the pipeline and return apply() results in input order"""
+        self.timings = {stage: {"count": 0, "busy_s": 0.0, "max_s": 0.0} for stage in STAGES}
+        started = time.perf_counter()
+        results = asyncio.run(self._run(list(items)))
+        self.wall_s = time.perf_counter() - started
+        return results
+
+    async def _run(self, items: List[Any]) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        io_pool = ThreadPoolExecutor(self.io_workers, thread_name_prefix="fetch")
+        cpu_pool = ThreadPoolExecutor(self.cpu_workers, thread_name_prefix="compute")
+        # A single apply thread keeps side effects strictly sequential without blocking the loop
+        apply_pool = ThreadPoolExecutor(1, thread_name_prefix="apply")
+
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        fetched: asyncio.Queue = asyncio.Queue(self.queue_size)
+        prepared: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        async def fetch_one(index, item):
+            started = time.perf_counter()
+            try:
+                data = await loop.run_in_executor(io_pool, self.load, item)
+            except Exception as e:
+                self._fail(item, e)
+                data = None
+            self._record("fetch", started)
+            await fetched.put((index, item, data))
+
+        async def produce():
+            tasks = []
+            for index, item in enumerate(items):
+                await in_flight.acquire()
+                tasks.append(asyncio.create_task(fetch_one(index, item)))
+            await asyncio.gather(*tasks)
+            for _ in range(self.cpu_workers):
+                await fetched.put(None)
+
+        async def compute():
+            while True:
+                message = await fetched.get()
+                if message is None:
+                    return
+                index, item, data = message
+                if data is not None:
+                    started = time.perf_counter()
+                    try:
+                        data = await loop.run_in_executor(cpu_pool, self.prepare, item, data)
+                    except Exception as e:
+                        self._fail(item, e)
+                        data = None
+                    self._record("compute", started)
+                await prepared.put((index, item, data))
+
+        async def consume():
+            results = [None] * len(items)
+            pending = {}
+            next_index = 0
+            while next_index < len(items):
+                index, item, data = await prepared.get()
+                pending[index] = (item, data)
+                # Reorder buffer: apply strictly in input order
+                while next_index in pending:
+                    item, data = pending.pop(next_index)
+                    started = time.perf_counter()
+                    try:
+                        results[next_index] = await loop.run_in_executor(apply_pool, self.apply, item, data)
+                    except Exception as e:
+                        self._fail(item, e)
+                    self._record("apply", started)
+                    in_flight.release()
+                    next_index += 1
+            return results
+
+        try:
+            workers = [asyncio.create_task(compute()) for _ in range(self.cpu_workers)]
+            producer = asyncio.create_task(produce())
+            results = await consume()
+            await asyncio.gather(producer, *workers)
+            return results
+        finally:
+            for pool in (io_pool, cpu_pool, apply_pool):
+                pool.shutdown(wait=False)
+
+    def report(self) -> Dict:
+        """Per-stage timing report for the last run"""
+        report = {"wall_s": round(getattr(self, "wall_s", 0.0), 3)}
+        for stage, stats in self.timings.items():
+            report[stage] = {
+                "count": stats["count"],
+                "busy_s": round(stats["busy_s"], 3),
+                "avg_s": round(stats["busy_s"] / stats["count"], 4) if stats["count"] else 0.0,
+                "max_s": round(stats["max_s"], 3)
+            }
+        return report
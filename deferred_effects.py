@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Deferred Side Effects
+Records the calls an analysis would make to shared state (alerts, history
+files, screenshots, the quote monitor) so they can be replayed one instrument
+at a time in a fixed order, or handed to background threads so a slow
+Telegram POST or PNG render does not hold up the scan
+"""
+
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# (target name, method name or None for a plain function, args, kwargs)
+Call = Tuple[str, Any, tuple, dict]
+
+
+class RecordingProxy:
+    """Stands in for an object: every method call is recorded and returns None"""
+
+    __slots__ = ("_log", "_name")
+
+    def __init__(self, log: "EffectLog", name: str):
+        self._log = log
+        self._name = name
+
+    def __getattr__(self, method: str):
+        def record(*args, **kwargs):
+            self._log.calls.append((self._name, method, args, kwargs))
+        return record
+
+
+class EffectSink:
+    """The side-effect targets of one evaluation as attributes: the real objects, or recorders for them"""
+
+    def __init__(self, targets: Dict[str, Any]):
+        self.__dict__.update(targets)
+
+
+class EffectLog:
+    def __init__(self):
+        self.calls: List[Call] = []
+
+    def function(self, name: str) -> Callable:
+        """Stand-in for the module function `name`"""
+        def record(*args, **kwargs):
+            self.calls.append((name, None, args, kwargs))
+        return record
+
+    def proxy(self, name: str) -> RecordingProxy:
+        """Stand-in for the module object `name`"""
+        return RecordingProxy(self, name)
+
+    def sink(self, targets: Dict[str, Any], functions: Iterable[str] = ()) -> EffectSink:
+        """Recorders for `targets` (names in `functions` are called directly); a None target stays None"""
+        functions = set(functions)
+        return EffectSink({
+            name: None if target is None else self.function(name) if name in functions else self.proxy(name)
+            for name, target in targets.items()
+        })
+
+
+def replay(calls: Iterable[Call], resolve: Callable[[str], Any], skip: Iterable[str] = ()):
+    """Run recorded calls against the real targets; a failing call is reported and skipped"""
+    skip = set(skip)
+    for target, method, args, kwargs in calls:
+        if target in skip:
+            continue
+        obj = resolve(target)
+        if obj is None:
+            continue
+        try:
+            (getattr(obj, method) if method else obj)(*args, **kwargs)
+        except Exception as e:
+            print(f"  ⚠️ Deferred {target}{'.' + method if method else ''} failed: {e}")
+
+
+class EffectDispatcher:
+    """
+    Runs recorded calls on background threads, one lane (a single thread)
+    per target, so calls on the same target keep their order while a slow
+    target never delays the others. Arguments are deep-copied on submit:
+    the caller keeps mutating its signal dicts after handing them over.
+    """
+
+    def __init__(self, lanes: Iterable[str]):
+        self.pools = {name: ThreadPoolExecutor(1, thread_name_prefix=f"effects-{name}") for name in lanes}
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.stats_by_lane = {name: {"sent": 0, "failed": 0, "busy_s": 0.0, "max_s": 0.0} for name in self.pools}
+
+    def _run(self, lane: str, label: str, call: Callable, args: tuple, kwargs: dict):
+        started = time.perf_counter()
+        failed = False
+        try:
+            call(*args, **kwargs)
+        except Exception as e:
+            failed = True
+            print(f"  ⚠️ Deferred {label} failed: {e}")
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            stats = self.stats_by_lane[lane]
+            stats["sent"] += 1
+            stats["failed"] += failed
+            stats["busy_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+
+    def submit(self, calls: Iterable[Call], resolve: Callable[[str], Any]) -> List[Call]:
+        """Queue the calls whose target has a lane; the others are returned, in order, for the caller to run"""
+        inline = []
+        for target, method, args, kwargs in calls:
+            pool = self.pools.get(target)
+            obj = resolve(target) if pool else None
+            if obj is None:
+                if not pool:
+                    inline.append((target, method, args, kwargs))
+                continue
+            args, kwargs = copy.deepcopy((args, kwargs))
+            label = f"{target}{'.' + method if method else ''}"
+            future = pool.submit(self._run, target, label, getattr(obj, method) if method else obj, args, kwargs)
+            with self.lock:
+                self.pending.add(future)
+            future.add_done_callback(self._done)
+        return inline
+
+    def _done(self, future):
+        with self.lock:
+            self.pending.discard(future)
+
+    def drain(self, timeout: Optional[float] = None) -> int:
+        """Wait for queued calls; returns how many are still pending"""
+        with self.lock:
+            pending = list(self.pending)
+        return len(wait(pending, timeout=timeout).not_done) if pending else 0
+
+    def stats(self) -> Dict:
+        with self.lock:
+            lanes = {name: {**stats, "busy_s": round(stats["busy_s"], 3), "max_s": round(stats["max_s"], 3)}
+                     for name, stats in self.stats_by_lane.items()}
+            return {"pending": len(self.pending), "lanes": lanes}
+
+
+# Test function
+if __name__ == "__main__":
+    class Alerts:
+        def send_tp_hit_alert(self, name, level, signal, price):
+            print(f"  📨 {name} TP{level} @ {price}")
+
+    log = EffectLog()
+    effects = log.sink({"telegram_alerts": Alerts(), "log_signal_event": print, "capture_trade_screenshot": None},
+                       functions=["log_signal_event"])
+    effects.telegram_alerts.send_tp_hit_alert("EUR/USD", 1, {"type": "BUY"}, 1.1050)
+    effects.log_signal_event("EUR/USD", "TP1_HIT", 1.1050)
+    print(f"Screenshots disabled: {effects.capture_trade_screenshot is None}")
+    print(f"Recorded {len(log.calls)} calls:", [(target, method) for target, method, _, _ in log.calls])
+    targets = {"telegram_alerts": Alerts(), "log_signal_event": lambda *args: print("  📝 history", args)}
+    replay(log.calls, targets.get)
+
+    class SlowAlerts:
+        def send_tp_hit_alert(self, name, level, signal, price):
+            time.sleep(0.5)
+
+    print("\n⏱️ 10 instruments, each with a 0.5s alert: inline vs background lane")
+    log = EffectLog()
+    for i in range(10):
+        log.proxy("telegram_alerts").send_tp_hit_alert(f"PAIR{i}", 1, {"type": "BUY"}, 1.0)
+    targets = {"telegram_alerts": SlowAlerts()}
+    started = time.perf_counter()
+    replay(log.calls, targets.get)
+    print(f"  inline     scan blocked {time.perf_counter() - started:.2f}s")
+    dispatcher = EffectDispatcher(["telegram_alerts"])
+    started = time.perf_counter()
+    dispatcher.submit(log.calls, targets.get)
+    print(f"  background scan blocked {time.perf_counter() - started:.3f}s, {dispatcher.stats()['pending']} alerts queued")
+    dispatcher.drain()
+    print(f"  drained: {dispatcher.stats()}")
@@ -1,7 +1,10 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 
+from market_data import get_provider
+
+MARKET_DATA = get_provider()
+
 def calculate_macd(df):
     fast, slow, signal = 12, 26, 9
     exp1 = df['Close'].ewm(span=fast, adjust=False).mean()
@@ -30,7 +33,7 @@ symbol = "AUDUSD=X"
 print(f"Checking {symbol}...")
 
 # Entry (1H)
-entry_df = yf.Ticker(symbol).history(period="30d", interval="1h")
+entry_df = MARKET_DATA.history(symbol, "1h", "30d")
 entry_df = calculate_macd(entry_df)
 entry_df = calculate_ema(entry_df, 200)
 entry_df = calculate_rsi(entry_df, 14)
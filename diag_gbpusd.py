@@ -1,8 +1,11 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from market_data import get_provider
+
+MARKET_DATA = get_provider()
+
 def calculate_macd(df):
     fast, slow, signal = 12, 26, 9
     exp1 = df['Close'].ewm(span=fast, adjust=False).mean()
@@ -31,13 +34,13 @@ symbol = "GBPUSD=X"
 print(f"Checking {symbol} at {datetime.now()}...")
 
 # Daily Trend
-daily_df = yf.Ticker(symbol).history(period="2y", interval="1d")
+daily_df = MARKET_DATA.history(symbol, "1d", "2y")
 daily_df = calculate_macd(daily_df)
 daily_df = calculate_ema(daily_df, 200)
 t_last = daily_df.iloc[-2]
 
 # 4H Momentum (from 1H)
-h1_raw = yf.Ticker(symbol).history(period="1y", interval="1h")
+h1_raw = MARKET_DATA.history(symbol, "1h", "1y")
 h1_raw.index = pd.to_datetime(h1_raw.index)
 mom_df = h1_raw.resample('4h').agg({
     'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
@@ -46,7 +49,7 @@ mom_df = calculate_macd(mom_df)
 m_last = mom_df.iloc[-2]
 
 # 1H Entry
-entry_df = yf.Ticker(symbol).history(period="30d", interval="1h")
+entry_df = MARKET_DATA.history(symbol, "1h", "30d")
 entry_df = calculate_macd(entry_df)
 entry_df = calculate_ema(entry_df, 200)
 entry_df = calculate_rsi(entry_df, 14)
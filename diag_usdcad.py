@@ -1,7 +1,10 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 
+from market_data import get_provider
+
+MARKET_DATA = get_provider()
+
 def calculate_macd(df):
     exp1 = df['Close'].ewm(span=12, adjust=False).mean()
     exp2 = df['Close'].ewm(span=26, adjust=False).mean()
@@ -16,7 +19,7 @@ def calculate_macd(df):
 def diag_usdcad():
     symbol = "USDCAD=X"
     print(f"Checking {symbol} 1H conditions...")
-    df = yf.Ticker(symbol).history(period="5d", interval="1h")
+    df = MARKET_DATA.history(symbol, "1h", "5d")
     df = calculate_macd(df)
     
     last = df.iloc[-2]
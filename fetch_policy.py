@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Fetch Retry Policy & Circuit Breaker
+Exponential backoff with jitter for single downloads, and a per-(symbol,
+interval) circuit breaker that stops hammering feeds Yahoo keeps failing on
+"""
+
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+
+class RetryPolicy:
+    """Exponential backoff: base_delay * 2^attempt, capped at max_delay, +/- jitter"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 jitter: float = 0.5):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number `attempt` (0-based)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        # Jitter spreads out retries of symbols that failed together
+        return max(0.0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+class CircuitBreaker:
+    """
+    One breaker per (symbol, interval), so a symbol whose hourly feed keeps
+    failing trips even while its daily bars download fine. Within a cycle
+    (see begin_cycle()) a feed counts at most one failure, and a success
+    only resets it if none of the cycle's windows failed, so
+    `failure_threshold` consecutive failures are that many failed cycles.
+    An open breaker skips the feed for
+    `cooldown_seconds`; the first fetch after the cool-down is a probe that
+    either closes the breaker or re-opens it. State is saved to `state_file`
+    so it survives restarts.
+    """
+
+    def __init__(self, failure_threshold: int = 6, cooldown_seconds: float = 900,
+                 state_file: Optional[Path] = None):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.state_file = Path(state_file) if state_file else None
+        self.lock = threading.Lock()
+        # "SYMBOL INTERVAL" -> breaker state (string keys for the JSON state file)
+        self.symbols: Dict[str, Dict] = {}
+        # Feeds that already failed in the current cycle
+        self.failed: Set[str] = set()
+        self.load()
+
+    @staticmethod
+    def key(symbol: str, interval: str) -> str:
+        return f"{symbol} {interval}"
+
+    def load(self):
+        if not self.state_file or not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                # Entries from the former per-symbol breaker have no interval and are dropped
+                self.symbols = {key: entry for key, entry in json.load(f).items() if " " in key}
+            # A probe interrupted by a restart must be allowed to run again
+            for entry in self.symbols.values():
+                if entry.get("state") == "half_open":
+                    entry["state"] = "open"
+        except Exception as e:
+            print(f"⚠️ Failed to load circuit breaker state: {e}")
+
+    def save(self):
+        if not self.state_file:
+            return
+        tmp = self.state_file.with_suffix(self.state_file.suffix + ".tmp")
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self.symbols, f, indent=2)
+            tmp.replace(self.state_file)
+        except Exception as e:
+            print(f"⚠️ Failed to save circuit breaker state: {e}")
+
+    def begin_cycle(self):
+        with self.lock:
+            self.failed.clear()
+
+    def allow(self, symbol: str, interval: str) -> bool:
+        """False while the breaker of the symbol's `interval` feed is open"""
+        with self.lock:
+            entry = self.symbols.get(self.key(symbol, interval))
+            if not entry or not entry.get("open_until"):
+                return True
+            if datetime.now() < datetime.fromisoformat(entry["open_until"]):
+                return False
+            # Cool-down over: let one probe through, others keep waiting on it
+            if entry.get("state") == "half_open":
+                return False
+            entry["state"] = "half_open"
+            return True
+
+    def record_success(self, symbol: str, interval: str):
+        with self.lock:
+            if self.key(symbol, interval) in self.failed:
+                return
+            entry = self.symbols.pop(self.key(symbol, interval), None)
+            if entry and entry.get("open_until"):
+                print(f"  🔌 Circuit closed for {symbol} ({interval})")
+            if entry:
+                self.save()
+
+    def record_failure(self, symbol: str, interval: str, error: str = ""):
+        with self.lock:
+            if self.key(symbol, interval) in self.failed:
+                return
+            self.failed.add(self.key(symbol, interval))
+            entry = self.symbols.setdefault(self.key(symbol, interval), {"failures": 0, "state": "closed", "open_until": None})
+            entry["failures"] += 1
+            entry["last_failure"] = datetime.now().isoformat()
+            entry["last_error"] = error
+            if entry["state"] == "half_open" or entry["failures"] >= self.failure_threshold:
+                entry["state"] = "open"
+                entry["open_until"] = (datetime.now() + timedelta(seconds=self.cooldown_seconds)).isoformat()
+                print(f"  🔌 Circuit open for {symbol} ({interval}) after {entry['failures']} failures "
+                      f"(skipping for {self.cooldown_seconds / 60:.0f} min)")
+            self.save()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copy of every feed with recent failures, for the output JSON"""
+        with self.lock:
+            return {symbol: dict(entry) for symbol, entry in self.symbols.items()}
+
+
+# Test function
+if __name__ == "__main__":
+    policy = RetryPolicy(attempts=4, base_delay=0.5, max_delay=8.0, jitter=0.5)
+    print("Backoff delays:", [round(policy.delay(i), 2) for i in range(policy.attempts)])
+
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=0)
+    for _ in range(3):
+        # Every cycle both hourly windows fail and the daily one succeeds
+        breaker.begin_cycle()
+        breaker.record_failure("DEAD.NS", "1h", "empty 1y frame")
+        breaker.record_failure("DEAD.NS", "1h", "empty 30d frame")
+        breaker.record_success("DEAD.NS", "1d")
+    print("Daily still allowed:", breaker.allow("DEAD.NS", "1d"))
+    print("Hourly probe allowed after cool-down:", breaker.allow("DEAD.NS", "1h"))
+    print("Second caller while probing:", breaker.allow("DEAD.NS", "1h"))
+    breaker.begin_cycle()
+    breaker.record_success("DEAD.NS", "1h")
+    print("State:", breaker.snapshot())
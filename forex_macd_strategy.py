@@ -4,10 +4,16 @@ MACD Multi-Timeframe Strategy for Major Forex Pairs
 Daily (Trend) + 4H (Momentum) + 1H (Entry)
 """
 
+import copy
 import json
 import time
 import sys
 import os
+import io
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
@@ -26,54 +32,49 @@ try:
         is_orb_window, cleanup_old_data as cleanup_old_orb
     )
     from premarket_analysis import get_premarket_sentiment, is_premarket_data_fresh
+    from frame_cache import CycleFrameCache
+    from timeframes import TimeframeDeriver, slice_period, is_intraday_rule, BASE_PERIODS
+    from resampler import IncrementalResampler
+    from streaming_indicators import StreamingIndicators
+    from panel_indicators import PanelIndicators
+    from indicator_memo import IndicatorMemo
+    from bar_series import BarSeries, with_indicators
+    from deferred_effects import EffectLog, EffectSink, EffectDispatcher, replay
+    from rule_engine import evaluate_rules, evaluate_universe
+    from instrument_registry import InstrumentRegistry
+    from warmup import warmup_bars, trim_frame, bars_per_session, calendar_days
+    from bulk_fetch import bulk_fetch_frames
+    from rate_limiter import HostRateLimiter
+    from bar_store import BarStore
+    from cycle_engine import AsyncCycleEngine, STAGES
+    from fetch_policy import RetryPolicy, CircuitBreaker
+    from negative_cache import NegativeCache, is_valid_frame
+    from market_data import get_provider
+    from frame_ttl import FrameTTL, INTRADAY_MINUTES, next_bar_close
+    from fx_rates import FXRates
+    from quote_monitor import QuoteMonitor
+    from market_sessions import SessionCalendar
+    from bar_scheduler import BarCloseScheduler
+    from nse_contracts import ContractCalendar
 except ImportError as e:
     print(f"❌ Error: Required libraries not installed: {e}")
     print("   Make sure yfinance, pandas, numpy, pillow are installed")
     sys.exit(1)
 
 # ================= NSE FUTURES HELPER FUNCTIONS =================
-import calendar
-from datetime import timedelta
-
 def get_nse_expiry_date(year, month):
-    """Get last Thursday of the month (NSE futures expiry day)"""
-    # Get last day of month
-    last_day = calendar.monthrange(year, month)[1]
-    last_date = datetime(year, month, last_day)
-    
-    # Find last Thursday (Thursday = 3 in weekday())
-    days_to_thursday = (last_date.weekday() - 3) % 7
-    expiry_date = last_date - timedelta(days=days_to_thursday)
-    return expiry_date
+    """NSE futures expiry of the month: last Thursday (Tuesday from Sep 2025), or the trading day before on a holiday"""
+    expiry = NSE_CONTRACTS.expiry(year, month)
+    return datetime(expiry.year, expiry.month, expiry.day)
 
 def get_current_nse_contract():
     """
-    Get current month contract or next month if 1 day before expiry.
+    Get current month contract or next month from 1 day before expiry
+    (cached per IST date by NSE_CONTRACTS).
     Returns: (contract_month, contract_year, expiry_date)
     """
-    now = datetime.now()
-    current_expiry = get_nse_expiry_date(now.year, now.month)
-    
-    # If today is 1 day before expiry or later, use next month
-    rollover_date = current_expiry - timedelta(days=1)
-    
-    if now.date() >= rollover_date.date():
-        # Move to next month
-        if now.month == 12:
-            next_month = 1
-            next_year = now.year + 1
-        else:
-            next_month = now.month + 1
-            next_year = now.year
-        
-        expiry = get_nse_expiry_date(next_year, next_month)
-        contract_month = expiry.strftime("%b").upper()  # JAN, FEB, etc.
-        contract_year = expiry.strftime("%y")  # 25, 26, etc.
-        return contract_month, contract_year, expiry
-    else:
-        contract_month = current_expiry.strftime("%b").upper()
-        contract_year = current_expiry.strftime("%y")
-        return contract_month, contract_year, current_expiry
+    contract = NSE_CONTRACTS.current()
+    return contract.month, contract.year, contract.expiry
 
 def get_nse_future_symbol(base_name):
     """
@@ -221,6 +222,25 @@ CONFIG = {
         "slow": 26,
         "signal": 9
     },
+    "indicators": {
+        # "pandas": full recompute over each downloaded window every cycle
+        # "streaming": O(1) per new bar from state kept across cycles while
+        # the window start stays put; a window that slid forward is reseeded
+        # so values match "pandas" on the same window
+        # "panel": same values as "pandas", computed for all instruments of
+        # a cycle in one vectorized pass per timeframe (prefetch pipeline
+        # only; the async pipeline computes per instrument with pandas)
+        # "bars": same values as "pandas", computed on compact BarSeries
+        # arrays; rules read their rows directly and only the entry tail is
+        # turned back into a DataFrame for alerts and the dashboard
+        "engine": "pandas",
+        # Reuse indicator frames while (symbol, interval, last closed bar,
+        # forming bar, MACD params, periods) is unchanged; pandas and panel
+        # engines. Symbols shared by several instruments share entries.
+        "memo": True,
+        "memo_max_mb": 128
+
+    },
     "risk": {
         "sl_atr_multiplier": 1.5,      # Dynamic SL based on ATR
         "tp_ratios": [1.5, 3.0, 5.0],  # TP1, TP2, TP3
@@ -230,6 +250,117 @@ CONFIG = {
             "move_to_tp1_at_tp2": True
         }
     },
+    "data": {
+        "bulk_download": True,          # Fetch all symbols per interval/period in grouped batches
+        "bulk_batch_size": 20,          # Symbols per grouped download request
+        "bar_store": True,              # Persist bars on disk and only download new ones
+        "bar_store_dir": "bar_store",   # Relative to BASE_DIR
+        "bar_store_full_refresh_hours": 24,  # Full re-download (picks up dividend/split adjustments)
+        "fetch_workers": 8,             # Concurrent downloads during the fetch phase
+        "max_requests_per_second": 5,   # Upstream (Yahoo) request ceiling
+        "rate_limit_burst": 10,         # Requests allowed back-to-back before throttling
+        "retry_attempts": 3,            # Download attempts per frame
+        "retry_base_delay": 0.5,        # Backoff: base * 2^attempt seconds, +/- 50% jitter
+        "retry_max_delay": 8,
+        "breaker_failure_threshold": 3, # Consecutive failed cycles before a symbol's interval is skipped
+        "breaker_cooldown_minutes": 15  # How long an open breaker skips the feed
+    },
+    "cache": {
+        "ttl_enabled": True,            # Keep downloads across cycles until their next bar closes
+        # Daily bars are refetched after the session close of the symbol's exchange group...
+        "daily_closes": {
+            "IN": "15:30 Asia/Kolkata",
+            "FX": "00:00 Europe/London",
+            "FUT": "17:00 America/New_York",
+            "CRYPTO": "00:00 UTC",
+            "OTHER": "16:00 America/New_York"
+        },
+        "daily_max_age_minutes": 360,   # ...or at least this often
+        "bar_close_grace_seconds": 60   # Wait for Yahoo to publish the just-closed bar
+    },
+    "engine": {
+        "pipeline": "prefetch",         # "prefetch" (download everything, then analyze), "async" or "process"
+        "max_in_flight": 16,            # Instruments fetched/computed ahead of the apply stage
+        "queue_size": 8,                # Bound of each inter-stage queue
+        "cpu_workers": 2,               # Indicator / rule evaluation threads
+        # "process": prefetch, then analyze on forked worker processes (Linux).
+        # Workers get a snapshot of their instrument's active signal and the
+        # frames cut to their warm-up windows (4H resampled by the parent),
+        # and hand back the result, the updated signal and their recorded
+        # side effects; the parent applies them in CONFIG order and saves
+        # signals once. Streaming state is rebuilt for every job and each
+        # worker's memo gets memo_max_mb / process_workers. Measured slower
+        # than "prefetch" on one core; only worth it with several cores.
+        "process_workers": None,        # None = one per CPU core
+        # "background": the analysis is evaluated with its side effects
+        # recorded; Telegram alerts, screenshots and history writes then run
+        # on background threads (one per target, in order) so their latency
+        # stays out of the scan, and active signals are saved once per cycle.
+        # "inline": every effect runs inside the analysis
+        "effects": "background"
+    },
+    "quotes": {
+        # Between entry-bar closes only open trades are checked, on a bulk
+        # last-price quote; the full analysis runs once the entry bar closes
+        "fast_path": True
+    },
+    "sessions": {
+        # Closed markets are left out of the fetch plan once their last
+        # analysis includes the closing bar; the dashboard keeps that snapshot
+        "enabled": True,
+        "markets": {
+            "NSE": {"tz": "Asia/Kolkata", "open": "09:15", "close": "15:30", "days": "Mon-Fri"},
+            "MCX": {"tz": "Asia/Kolkata", "open": "09:00", "close": "23:55", "days": "Mon-Fri"},
+            # Forex week: Sunday 17:00 to Friday 17:00 New York
+            "FX": {"tz": "America/New_York", "open": "17:00", "close": "17:00", "days": "Sun-Fri", "weekly": True},
+            "US": {"tz": "America/New_York", "open": "09:30", "close": "16:00", "days": "Mon-Fri"},
+            "CRYPTO": {}  # 24/7
+        },
+        "name_prefixes": {"MCX": "MCX"},
+        # Markets shut on NSE trading holidays (nse_specific.holidays plus the
+        # fixed-date ones). MCX's evening session on some of them is not modelled
+        "holiday_markets": ["NSE", "MCX"],
+        # Categories not listed here are always analysed
+        "categories": {
+            "Indian Stocks": "NSE",
+            "NSE Live": "NSE",
+            "Indian Indices & Commodities": "NSE",
+            "Forex": "FX",
+            "Metals/Energy": "FX",
+            "World Index": "US",
+            "Crypto Scalping": "CRYPTO"
+        }
+    },
+    "schedule": {
+        # Wake shortly after entry-bar closes and market opens instead of
+        # every 60s; open trades are still polled on the quote path
+        "event_driven": True,
+        "stagger_seconds": 10,          # Gap between exchange-group waves after a bar close
+        "quote_poll_seconds": 60,       # Quote checks while trades are open (and fixed interval when off)
+        "max_sleep_seconds": 300        # Refresh the dashboard heartbeat at least this often
+    },
+    "timeframes": {
+        # Categories whose 1D trend bars are rebuilt from the hourly base series
+        # (only safe for 24/7 UTC markets; Yahoo's own daily bars differ slightly)
+        "derive_daily_categories": [],
+        "momentum_rule": "4h",          # Momentum bars built from the hourly series (e.g. "2h", "4h", "1W")
+        # Intraday momentum buckets start at the session open instead of midnight
+        "session_anchors": {
+            "NSE": "09:15 Asia/Kolkata",
+            "MCX": "09:00 Asia/Kolkata"
+        }
+    },
+    "warmup": {
+        # Keep only the bars the indicators still depend on: each timeframe
+        # is trimmed to the warm-up of its slowest indicator (EMA-200, MACD,
+        # RSI/ATR) at this tolerance, and the hourly download behind the 4H
+        # momentum shrinks from 1y to the window holding that many bars.
+        # Values then match the full-history ones to ~tolerance of the
+        # price range. The 2y daily and 30d entry windows are already
+        # shorter than the EMA-200 warm-up and are left as they are.
+        "enabled": False,
+        "tolerance": 1e-4
+    },
     "nse_specific": {
         "sl_atr_multiplier": 2.5,      # Safer SL for 3-4 day swing trades
         "volume_multiplier": 1.2,       # Volume must be 1.2x average for signal
@@ -237,7 +368,16 @@ CONFIG = {
         "orb_enabled": True,            # Enable Opening Range Breakout
         "orb_duration_minutes": 15,     # Track 9:15-9:30 AM (15 minutes)
         "premarket_filter": True,       # Use global cues for first hour
-        "first_hour_end": "10:15"       # Pre-market filter active till 10:15 AM IST
+        "first_hour_end": "10:15",      # Pre-market filter active till 10:15 AM IST
+        # Contract calendar: expiries falling on a holiday move to the trading day
+        # before. Fixed-date holidays (Republic Day, Independence Day, ...) are
+        # built in; add festival holidays from NSE's yearly circular ("YYYY-MM-DD").
+        "holidays": [],
+        # Expiry weekday (Monday = 0) from each contract month on: Thursday,
+        # then Tuesday since NSE moved monthly F&O expiry with the Sep 2025 series
+        "expiry_weekdays": [["2000-01-01", 3], ["2025-09-01", 1]],
+        "rollover_days": 1,             # Trade next month's contract from 1 day before expiry
+        "calendar_months": 24           # Expiries precomputed ahead
     }
 }
 
@@ -322,20 +462,317 @@ except Exception as e:
 
 
 # ================= DATA & INDICATORS =================
-def fetch_data(symbol: str, interval: str, period: str) -> pd.DataFrame:
-    """Fetch data from Yahoo Finance with retries."""
-    for attempt in range(3):
+BAR_STORE = None
+if CONFIG['data']['bar_store']:
+    try:
+        BAR_STORE = BarStore(BASE_DIR / CONFIG['data']['bar_store_dir'],
+                             CONFIG['data']['bar_store_full_refresh_hours'],
+                             clock=lambda: MARKET_DATA.now())
+    except Exception as e:
+        print(f"⚠️  Bar store disabled: {e}")
+
+# Yahoo Finance by default; MARKET_DATA_PROVIDER=replay serves recorded bars offline.
+# MARKET_DATA.now() is the clock of every data-dependent decision (the recording
+# time in a replay)
+MARKET_DATA = get_provider()
+print(f"📡 Market data: {MARKET_DATA.describe()}")
+RATE_LIMITER = HostRateLimiter(CONFIG['data']['max_requests_per_second'], CONFIG['data']['rate_limit_burst'])
+
+def throttle(requests: int = 1):
+    """Spend rate-limit tokens for the provider's upstream host (if it has one)."""
+    if MARKET_DATA.host:
+        RATE_LIMITER.acquire(MARKET_DATA.host, requests)
+
+RETRY_POLICY = RetryPolicy(
+    attempts=CONFIG['data']['retry_attempts'],
+    base_delay=CONFIG['data']['retry_base_delay'],
+    max_delay=CONFIG['data']['retry_max_delay']
+)
+FETCH_BREAKER = CircuitBreaker(
+    failure_threshold=CONFIG['data']['breaker_failure_threshold'],
+    cooldown_seconds=CONFIG['data']['breaker_cooldown_minutes'] * 60,
+    state_file=BASE_DIR / "circuit_breakers.json"
+)
+# Last good frame per key, used when the bar store is disabled
+LAST_GOOD_FRAMES = {}
+# (symbol, interval) pairs with no usable data at all, re-probed on an escalating TTL
+NEGATIVE_CACHE = NegativeCache(state_file=BASE_DIR / "negative_cache.json")
+
+def download_history(symbol: str, interval: str, period: str) -> pd.DataFrame:
+    """Download bars from the market data provider with exponential backoff between retries."""
+    for attempt in range(RETRY_POLICY.attempts):
         try:
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period=period, interval=interval)
+            throttle()
+            df = MARKET_DATA.history(symbol, interval, period)
             if not df.empty:
                 return df
             print(f"  ⚠️ Empty data for {symbol} ({interval}) on attempt {attempt+1}")
         except Exception as e:
             print(f"  ❌ Error fetching {symbol} ({interval}) on attempt {attempt+1}: {e}")
-        time.sleep(2) # Wait before retry
+        if attempt + 1 < RETRY_POLICY.attempts:
+            time.sleep(RETRY_POLICY.delay(attempt))
     return pd.DataFrame()
 
+def last_good_frame(symbol: str, interval: str, period: str) -> pd.DataFrame:
+    """Most recent successful frame for a failing symbol, flagged with attrs['stale']."""
+    if BAR_STORE is not None:
+        stored = BAR_STORE.load(symbol, interval)
+        df = slice_period(stored, period, MARKET_DATA.now()) if not stored.empty else None
+    else:
+        df = LAST_GOOD_FRAMES.get((symbol, interval, period))
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy(deep=False)
+    df.attrs = {**df.attrs, "stale": True}
+    return df
+
+def record_download(symbol: str, interval: str, period: str, fresh: pd.DataFrame) -> bool:
+    """Feed a download result to the circuit breaker. Returns True if it was usable."""
+    if not is_valid_frame(fresh):
+        FETCH_BREAKER.record_failure(symbol, interval, f"empty {period} frame")
+        return False
+    FETCH_BREAKER.record_success(symbol, interval)
+    return True
+
+def fetch_data(symbol: str, interval: str, period: str) -> pd.DataFrame:
+    """Fetch a `period` window; symbols known to return nothing are not requested."""
+    if NEGATIVE_CACHE.is_live(symbol, interval):
+        return pd.DataFrame()
+    return fetch_frame(symbol, interval, period)
+
+def fetch_frame(symbol: str, interval: str, period: str) -> pd.DataFrame:
+    """
+    Fetch a `period` window, only downloading bars missing from the bar store.
+    Behind an open circuit breaker nothing is requested and the negative
+    cache is left alone; otherwise the result of the download counts.
+    """
+    if not FETCH_BREAKER.allow(symbol, interval):
+        return last_good_frame(symbol, interval, period)
+    if BAR_STORE is None:
+        df = download_history(symbol, interval, period)
+        if record_download(symbol, interval, period, df):
+            LAST_GOOD_FRAMES[(symbol, interval, period)] = df
+        else:
+            df = last_good_frame(symbol, interval, period)
+    else:
+        with BAR_STORE.lock(symbol, interval):
+            fetch_period, full = BAR_STORE.refresh_period(symbol, interval, period)
+            fresh = download_history(symbol, interval, fetch_period)
+            if record_download(symbol, interval, period, fresh):
+                df = BAR_STORE.update(symbol, interval, period, fresh, full)
+            else:
+                df = last_good_frame(symbol, interval, period)
+    NEGATIVE_CACHE.record(symbol, interval, df)
+    return df
+
+def download_batch_limited(symbols: List[str], interval: str, period: str) -> pd.DataFrame:
+    """Grouped provider download that spends one rate-limit token per symbol."""
+    throttle(len(symbols))
+    return MARKET_DATA.download(symbols, interval, period)
+
+def bulk_fetch(keys: List[tuple]) -> Dict[tuple, pd.DataFrame]:
+    """Grouped multi-ticker download with per-batch fallback to single downloads."""
+    batch_size = CONFIG['data']['bulk_batch_size']
+    workers = CONFIG['data']['fetch_workers']
+    # Symbols known to return nothing or behind an open circuit breaker are not requested
+    frames = {key: pd.DataFrame() for key in keys if NEGATIVE_CACHE.is_live(key[0], key[1])}
+    frames.update({key: last_good_frame(*key) for key in keys
+                   if key not in frames and not FETCH_BREAKER.allow(key[0], key[1])})
+    keys = [key for key in keys if key not in frames]
+    
+    if BAR_STORE is None:
+        fresh = bulk_fetch_frames(keys, batch_size, download_history, download_batch_limited, workers)
+        for key in keys:
+            if record_download(*key, fresh[key]):
+                LAST_GOOD_FRAMES[key] = frames[key] = fresh[key]
+            else:
+                frames[key] = last_good_frame(*key)
+    else:
+        # Download only the missing tail of each stored series, then merge it in
+        refresh = {key: BAR_STORE.refresh_period(*key) for key in keys}
+        fresh = bulk_fetch_frames(
+            [(key[0], key[1], fetch_period) for key, (fetch_period, _) in refresh.items()],
+            batch_size, download_history, download_batch_limited, workers
+        )
+        for key, (fetch_period, full) in refresh.items():
+            tail = fresh[(key[0], key[1], fetch_period)]
+            if record_download(*key, tail):
+                frames[key] = BAR_STORE.update(*key, tail, full)
+            else:
+                frames[key] = last_good_frame(*key)
+    
+    # Only the downloaded keys count toward the negative cache
+    for key in keys:
+        NEGATIVE_CACHE.record(key[0], key[1], frames[key])
+    return frames
+
+# Front-month NSE futures contract, looked up again once per IST date
+NSE_CONTRACTS = ContractCalendar(
+    CONFIG['nse_specific']['holidays'], CONFIG['nse_specific']['expiry_weekdays'],
+    CONFIG['nse_specific']['rollover_days'], CONFIG['nse_specific']['calendar_months'],
+    clock=lambda: MARKET_DATA.now().timestamp()
+)
+
+SESSIONS = SessionCalendar(
+    CONFIG['sessions']['markets'], CONFIG['sessions']['categories'], CONFIG['sessions']['name_prefixes'],
+    holidays={market: NSE_CONTRACTS.is_holiday for market in CONFIG['sessions']['holiday_markets']}
+)
+
+def announce_rollover(previous, contract):
+    print(f"🔁 NSE futures rollover: {previous.label} -> {contract.label} (expiry {contract.expiry:%d-%b-%Y})")
+    for spec in REGISTRY:
+        if spec.symbol is None and spec.name in ACTIVE_SIGNALS:
+            print(f"  ⚠️ {spec.name}: open trade was taken on the {previous.label} contract")
+
+NSE_CONTRACTS.on_rollover(announce_rollover)
+
+# Per-instrument parameters resolved once; instruments are looked up by their `id`
+REGISTRY = InstrumentRegistry(
+    CONFIG['instruments'], CONFIG['risk'], CONFIG['nse_specific']['sl_atr_multiplier'], SESSIONS
+)
+
+# Bars each timeframe's indicators depend on (CONFIG['warmup'])
+WARMUP_BARS = {
+    "trend": warmup_bars(CONFIG['macd']['fast'], CONFIG['macd']['slow'], CONFIG['macd']['signal'],
+                         ema_periods=(200,), tolerance=CONFIG['warmup']['tolerance']),
+    "momentum": warmup_bars(CONFIG['macd']['fast'], CONFIG['macd']['slow'], CONFIG['macd']['signal'],
+                            tolerance=CONFIG['warmup']['tolerance']),
+    "entry": warmup_bars(CONFIG['macd']['fast'], CONFIG['macd']['slow'], CONFIG['macd']['signal'],
+                         ema_periods=(200,), rsi_period=14, atr_period=14,
+                         tolerance=CONFIG['warmup']['tolerance'])
+}
+
+def momentum_fetch_period() -> str:
+    """Hourly download behind the 4H momentum: 1y, or the warm-up window of the slowest market."""
+    rule = CONFIG['timeframes']['momentum_rule']
+    if not CONFIG['warmup']['enabled'] or not is_intraday_rule(rule):
+        return "1y"
+    rule_minutes = pd.Timedelta(rule).total_seconds() / 60
+    days = 30  # Never shorter than the 30d entry window
+    for spec in REGISTRY:
+        minutes, per_week = spec.session.week_shape() if spec.session else (1440, 5)
+        per_day = bars_per_session(minutes, rule_minutes)
+        days = max(days, calendar_days(WARMUP_BARS['momentum'], per_day, per_week))
+    return f"{days}d" if days < 365 else "1y"
+
+MOMENTUM_PERIOD = momentum_fetch_period()
+
+# Market sessions of the instruments quoting each symbol (CL=F: US Oil and MCX Crude)
+SYMBOL_SESSIONS = {}
+for spec in REGISTRY:
+    if spec.symbol is not None:
+        SYMBOL_SESSIONS.setdefault(spec.symbol, []).append(spec.session)
+
+def symbol_session_open(symbol: str, now: pd.Timestamp) -> Optional[bool]:
+    """Whether a market trading `symbol` is open (None = unknown or session checks disabled)."""
+    sessions = SYMBOL_SESSIONS.get(symbol)
+    if not CONFIG['sessions']['enabled'] or not sessions or None in sessions:
+        return None
+    return any(session.is_open(now) for session in sessions)
+
+# Shared per-cycle frame cache (CL=F, GC=F, SI=F, NG=F, ^NSEBANK are used by several instruments).
+# Shorter hourly windows are sliced from the hourly momentum download; the 30d entry
+# frame is downloaded directly (timeframes.DIRECT_WINDOWS).
+FRAME_CACHE = CycleFrameCache(
+    fetch_data,
+    TimeframeDeriver(base_periods={**BASE_PERIODS, "1h": MOMENTUM_PERIOD}, derive_daily_symbols={
+        inst['symbol'] for inst in CONFIG['instruments']
+        if inst.get('category') in CONFIG['timeframes']['derive_daily_categories']
+    }),
+    bulk_fetcher=bulk_fetch if CONFIG['data']['bulk_download'] else None,
+    max_workers=CONFIG['data']['fetch_workers'],
+    clock=MARKET_DATA.now,
+    ttl=FrameTTL(
+        CONFIG['cache']['daily_closes'],
+        CONFIG['cache']['daily_max_age_minutes'],
+        CONFIG['cache']['bar_close_grace_seconds'],
+        session_open=symbol_session_open
+    ) if CONFIG['cache']['ttl_enabled'] else None
+)
+
+# MCX USD -> INR conversion: one rate lookup per cycle, shared by every MCX instrument
+FX_RATES = FXRates(FRAME_CACHE.get)
+
+# Completed momentum buckets per (symbol, rule, anchor), kept across cycles
+RESAMPLER = IncrementalResampler()
+
+# Indicator state per (symbol, timeframe) for CONFIG['indicators']['engine'] = "streaming"
+MACD_PERIODS = (CONFIG['macd']['fast'], CONFIG['macd']['slow'], CONFIG['macd']['signal'])
+TREND_INDICATORS = StreamingIndicators(*MACD_PERIODS, ema_periods=(200,))
+MOMENTUM_INDICATORS = StreamingIndicators(*MACD_PERIODS)
+ENTRY_INDICATORS = StreamingIndicators(*MACD_PERIODS, ema_periods=(200,), rsi_period=14, atr_period=14)
+
+# Whole-universe passes per timeframe for CONFIG['indicators']['engine'] = "panel"
+TREND_PANEL = PanelIndicators(*MACD_PERIODS, ema_periods=(200,))
+MOMENTUM_PANEL = PanelIndicators(*MACD_PERIODS)
+ENTRY_PANEL = PanelIndicators(*MACD_PERIODS, ema_periods=(200,), rsi_period=14, atr_period=14)
+
+# Indicator frames of unchanged inputs, shared across cycles and instruments
+INDICATOR_MEMO = IndicatorMemo(max_bytes=CONFIG['indicators']['memo_max_mb'] * 2**20)
+
+# Last full analysis per instrument for the quote-only cycles in between
+QUOTE_MONITOR = QuoteMonitor()
+
+# Slow side effects handed off by evaluate_instrument(), one lane per target
+EFFECT_DISPATCHER = EffectDispatcher(["telegram_alerts", "capture_trade_screenshot", "log_signal_event"])
+
+def clock_now(tz=None, clock: Optional[datetime] = None) -> datetime:
+    """Like datetime.now(tz), on the pinned evaluation clock (tz-aware) or else MARKET_DATA.now()"""
+    if clock is None:
+        clock = MARKET_DATA.now().to_pydatetime()
+    return clock.astimezone(tz) if tz else clock.astimezone().replace(tzinfo=None)
+
+SCHEDULER = BarCloseScheduler(
+    stagger_seconds=CONFIG['schedule']['stagger_seconds'],
+    poll_seconds=CONFIG['schedule']['quote_poll_seconds'],
+    max_sleep_seconds=CONFIG['schedule']['max_sleep_seconds']
+)
+
+def resolve_symbol(instrument: Dict) -> str:
+    """Resolve the Yahoo symbol for an instrument (NSE Live uses the current contract)."""
+    spec = REGISTRY.of(instrument)
+    return spec.symbol if spec.symbol is not None else get_nse_future_symbol(spec.base_symbol)[0]
+
+def active_signal_symbols() -> set:
+    """Symbols with an open trade; their frames bypass the TTL so SL/TP see the latest price."""
+    symbols = set()
+    for instrument in CONFIG['instruments']:
+        if instrument['name'] in ACTIVE_SIGNALS:
+            try:
+                symbols.add(resolve_symbol(instrument))
+            except Exception:
+                pass
+    return symbols
+
+def fx_refresh_symbols(analysed: List[Dict]) -> set:
+    """FX symbols behind MCX prices, refreshed every cycle an MCX instrument is analysed or has an open trade."""
+    analysed = {instrument['name'] for instrument in analysed}
+    for instrument in CONFIG['instruments']:
+        spec = REGISTRY.of(instrument)
+        if spec.unit_conversion and (spec.name in analysed or spec.name in ACTIVE_SIGNALS):
+            return set(FX_RATES.symbols.values())
+    return set()
+
+def frame_age(df: pd.DataFrame) -> Optional[int]:
+    """Seconds since the frame was downloaded (None when it did not come from the cache)."""
+    fetched_at = df.attrs.get("fetched_at")
+    if fetched_at is None:
+        return None
+    return int((MARKET_DATA.now() - fetched_at).total_seconds())
+
+def plan_frame_requests(instrument: Dict) -> List[tuple]:
+    """List the (symbol, interval, period) frames analyze_instrument will request."""
+    spec = REGISTRY.of(instrument)
+    symbol = resolve_symbol(instrument)
+    requests = [
+        (symbol, "1d", "2y"),
+        (symbol, "1h", MOMENTUM_PERIOD),
+        (symbol, spec.entry_interval, "30d"),
+    ]
+    if spec.unit_conversion:
+        requests.extend(FX_RATES.requests())
+    return requests
+
 def calculate_macd(df: pd.DataFrame) -> pd.DataFrame:
     fast = CONFIG['macd']['fast']
     slow = CONFIG['macd']['slow']
@@ -394,8 +831,8 @@ def check_volume_confirmation(df: pd.DataFrame, lookback: int = 20, multiplier:
     
     return is_confirmed, current_volume, avg_volume, ratio
 
-def log_signal_event(instrument, event_type, price, signal_data=None, trade_metrics=None):
-    """Log signal events to a persistent history file."""
+def log_signal_event(instrument, event_type, price, signal_data=None, trade_metrics=None, at=None):
+    """Log signal events to a persistent history file (`at` = event time, default now)."""
     try:
         history = []
         if HISTORY_FILE.exists():
@@ -406,7 +843,7 @@ def log_signal_event(instrument, event_type, price, signal_data=None, trade_metr
             "instrument": instrument,
             "event": event_type,
             "price": price,
-            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "time": (at or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
             "category": signal_data.get('category', 'Other') if signal_data else 'Other'
         }
         
@@ -431,7 +868,7 @@ def log_signal_event(instrument, event_type, price, signal_data=None, trade_metr
     except Exception as e:
         print(f"  ❌ Error logging event: {e}")
 
-def calculate_lifecycle_status(signal, has_reentry=False):
+def calculate_lifecycle_status(signal, has_reentry=False, now=None):
     """Calculate the lifecycle status of a signal based on its current state."""
     if not signal:
         return None
@@ -439,7 +876,7 @@ def calculate_lifecycle_status(signal, has_reentry=False):
     # Check signal age (within 1 hour = "New Signal")
     try:
         signal_time = datetime.fromisoformat(signal['time'])
-        age_hours = (datetime.now() - signal_time).total_seconds() / 3600
+        age_hours = ((now or datetime.now()) - signal_time).total_seconds() / 3600
         
         if age_hours < 1:
             return "New Signal"
@@ -509,232 +946,375 @@ def calculate_trade_metrics(instrument_name, entry_price, exit_price, signal_typ
     }
 
 # ================= STRATEGY LOGIC =================
-def analyze_instrument(instrument: Dict) -> Dict:
-    symbol = instrument['symbol']
-    name = instrument['name']
+def load_instrument_frames(instrument: Dict, get_frame=fetch_data) -> Optional[Dict]:
+    """Stage 1: resolve the symbol and fetch the trend, momentum and entry frames."""
+    spec = REGISTRY.of(instrument)
+    symbol = spec.symbol
+    name = spec.name
     
     # Handle NSE Futures with dynamic contract rollover
     contract_info = None
-    if instrument.get('category') == 'NSE Live':
-        base_symbol = instrument.get('base_symbol')
-        symbol, expiry, month, year = get_nse_future_symbol(base_symbol)
+    if symbol is None:
+        symbol, expiry, month, year = get_nse_future_symbol(spec.base_symbol)
         contract_info = {
             "contract": f"{month} {year}",
             "expiry": expiry.strftime("%d-%b-%Y"),
-            "days_to_expiry": (expiry - datetime.now()).days
+            "expiry_at": expiry
         }
         print(f"\n📊 Analyzing {name} ({symbol})...")
-        print(f"  📅 Contract: {month} {year} | Expiry: {expiry.strftime('%d-%b-%Y')} | Days: {contract_info['days_to_expiry']}")
+        print(f"  📅 Contract: {month} {year} | Expiry: {expiry.strftime('%d-%b-%Y')}")
     else:
         print(f"\n📊 Analyzing {name} ({symbol})...")
     
-    category = instrument.get('category', 'Forex')
+    entry_interval = spec.entry_interval
+    
+    # Symbols that recently returned no data are skipped until their next probe
+    blocked = NEGATIVE_CACHE.blocked(symbol, ["1d", "1h", entry_interval])
+    if blocked:
+        interval, remaining = blocked
+        print(f"  ⏭️ Skipping {name}: no data for {symbol} ({interval}), next check in {remaining / 60:.0f} min")
+        return None
     
     # Standardized Timeframes for all categories:
     # Trend: 1D
     # Momentum: 4H (resampled from 1H)
     # Entry: 1H (default) OR 15m (for Stock Scalping)
     
-    trend_df = fetch_data(symbol, "1d", "2y")
-    mom_df_raw = fetch_data(symbol, "1h", "1y")
+    trend_df = get_frame(symbol, "1d", "2y")
+    mom_df_raw = get_frame(symbol, "1h", MOMENTUM_PERIOD)
     
     # Use 15-min entry for Stock Scalping, 1-hour for everything else
-    if category == "Stock Scalping":
-        entry_df = fetch_data(symbol, "15m", "30d")
-        entry_label = "15m Entry"
-    else:
-        entry_df = fetch_data(symbol, "1h", "30d")
-        entry_label = "1H Entry"
+    entry_df = get_frame(symbol, entry_interval, "30d")
     
     if trend_df.empty or entry_df.empty or mom_df_raw.empty:
         print(f"  ⚠️ Insufficient data for {name}")
         return None
-        
-    # Resample 1H to 4H for Momentum
-    mom_df_raw.index = pd.to_datetime(mom_df_raw.index)
-    mom_df = mom_df_raw.resample('4h').agg({
-        'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
-    }).dropna()
     
-    trend_label = "1D Trend"
-    mom_label = "4H MOM"
-    entry_label = "1H Entry"
-
-    # 2. Calculate Indicators
-    trend_macd = calculate_macd(trend_df)
-    trend_macd = calculate_ema(trend_macd, 200)
-    
-    mom_macd = calculate_macd(mom_df)
-    
-    entry_macd = calculate_macd(entry_df)
-    entry_macd = calculate_ema(entry_macd, 200)
-    entry_macd = calculate_rsi(entry_macd, 14)
-    entry_macd = calculate_atr(entry_macd, 14)
+    # Served from the last good download while fetches for the symbol are failing
+    stale = any(df.attrs.get("stale", False) for df in (trend_df, mom_df_raw, entry_df))
+    if stale:
+        print(f"  🕰️ Fetch failing for {symbol}, using last good data")
     
-    # Get latest CLOSED values (Strict Confirmation)
-    t_last = trend_macd.iloc[-2]
-    m_last = mom_macd.iloc[-2]
-    m_prev = mom_macd.iloc[-3]
-    e_last = entry_macd.iloc[-2]
-    e_prev = entry_macd.iloc[-3]
-    
-    # Get LATEST price for display
-    latest_price = entry_macd.iloc[-1]['Close']
-    prev_price = entry_macd.iloc[-2]['Close']
-    
-    # Price Sanity Check: Ignore spikes > 5% in a single candle (unless it's Crypto)
-    if category != "Crypto Scalping":
-        price_change = abs(latest_price - prev_price) / prev_price
-        if price_change > 0.05:
-            print(f"  ⚠️ Ignoring extreme price spike for {name}: {prev_price} -> {latest_price} ({price_change:.2%})")
-            latest_price = prev_price
-
-    
-    # Special handling for MCX Instruments (Convert USD to INR with unit factors)
-    current_price = latest_price
-    if name.startswith("MCX"):
+    # USD/INR rate for MCX price conversion
+    fx_rate = None
+    if spec.unit_conversion:
         try:
-            usdinr_df = fetch_data("USDINR=X", "1d", "5d")
-            if not usdinr_df.empty:
-                rate = usdinr_df['Close'].iloc[-1]
-                
-                if name in ["MCX Gold", "MCX Gold Mini"]:
-                    # Convert Ounce to 10g: (Price / 31.1035) * 10
-                    current_price = (latest_price / 31.1035) * 10 * rate
-                elif name in ["MCX Silver", "MCX Silver Mini"]:
-                    # Convert Ounce to 1kg: Price * 32.1507
-                    current_price = latest_price * 32.1507 * rate
-                elif name == "MCX Copper":
-                    # Convert lb to 1kg: Price * 2.20462 * Premium (approx 2.6%)
-                    current_price = latest_price * 2.20462 * rate * 1.026
-                elif name == "MCX Lead":
-                    # Convert lb to 1kg: Price * 2.20462
-                    current_price = latest_price * 2.20462 * rate
-                elif name == "MCX Zinc":
-                    # Convert lb to 1kg: Price * 2.20462
-                    current_price = latest_price * 2.20462 * rate
-                else:
-                    # Crude Oil and Natural Gas: Direct conversion
-                    current_price = latest_price * rate
-                
-                print(f"  💱 Converted {name}: ${latest_price:.2f} -> ₹{current_price:.2f} (Rate: {rate:.2f})")
+            fx_rate = FX_RATES.get("USD", "INR")
         except Exception as e:
             print(f"  ⚠️ Conversion failed for {name}: {e}")
     
-    # 3. Apply Rules
-    # Trend: MACD Line > 0 AND Price > EMA 200 (Relaxed for BTC/ETH)
-    trend_ema_200 = t_last.get('EMA_200', None)
-    if name in ["Bitcoin", "Ethereum"]:
-        trend_bullish = t_last['MACD_Line'] > 0
-        trend_bearish = t_last['MACD_Line'] < 0
-    else:
-        trend_bullish = t_last['MACD_Line'] > 0 and (trend_ema_200 is None or t_last['Close'] > trend_ema_200)
-        trend_bearish = t_last['MACD_Line'] < 0 and (trend_ema_200 is None or t_last['Close'] < trend_ema_200)
-    
-    trend_bias = "BULLISH" if trend_bullish else ("BEARISH" if trend_bearish else "NEUTRAL")
+    return {
+        "id": spec.id,
+        "symbol": symbol,
+        "contract_info": contract_info,
+        "trend_df": trend_df,
+        "mom_df_raw": mom_df_raw,
+        "entry_df": entry_df,
+        "entry_interval": entry_interval,
+        "fx_rate": fx_rate,
+        "stale": stale,
+        "cache_age": {
+            "trend": frame_age(trend_df),
+            "momentum": frame_age(mom_df_raw),
+            "entry": frame_age(entry_df)
+        }
+    }
+
+def prepared_spec(instrument: Dict, data: Dict):
+    """The InstrumentSpec resolved by load_instrument_frames(), by its id (-1: not in CONFIG)."""
+    return REGISTRY[data['id']] if data['id'] >= 0 else REGISTRY.of(instrument)
+
+def trend_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    return calculate_ema(calculate_macd(df), 200)
+
+def entry_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    return calculate_atr(calculate_rsi(calculate_ema(calculate_macd(df), 200), 14), 14)
+
+def indicator_key(frame_key: tuple, df: pd.DataFrame, periods: tuple) -> tuple:
+    """INDICATOR_MEMO key; frame_key is (symbol, interval...) so shared symbols share entries."""
+    periods = (CONFIG['indicators']['engine'],) + periods
+    return IndicatorMemo.key(frame_key[0], frame_key[1:], df, MACD_PERIODS, periods)
+
+def memoized_indicators(frame_key: tuple, df: pd.DataFrame, periods: tuple, compute) -> pd.DataFrame:
+    """compute(df), reused while the frame is unchanged (CONFIG['indicators']['memo'])."""
+    if not CONFIG['indicators']['memo']:
+        return compute(df)
+    # Computed on a copy: the calculate_* helpers write into the cached frame
+    return INDICATOR_MEMO.get_or_compute(indicator_key(frame_key, df, periods), lambda: compute(df.copy()))
+
+def memoized_panel(panel: PanelIndicators, frames: Dict, periods: tuple) -> Dict:
+    """panel.compute() for the frames INDICATOR_MEMO does not already hold."""
+    if not CONFIG['indicators']['memo']:
+        return panel.compute(frames)
+    keys = {frame_key: indicator_key(frame_key, df, periods) for frame_key, df in frames.items()}
+    results = {frame_key: INDICATOR_MEMO.get(key) for frame_key, key in keys.items()}
+    missing = {frame_key: frames[frame_key] for frame_key, out in results.items() if out is None}
+    for frame_key, out in panel.compute(missing).items():
+        INDICATOR_MEMO.put(keys[frame_key], out)
+        results[frame_key] = out
+    return results
+
+def momentum_frame(instrument: Dict, data: Dict) -> tuple:
+    """Resample 1H to 4H for Momentum (only the open bucket is rebuilt between cycles)."""
+    if 'mom_df' in data:
+        # Resampled by the parent of a process-pool job
+        return data['mom_df'], data['mom_key']
+    rule = CONFIG['timeframes']['momentum_rule']
+    anchor = CONFIG['timeframes']['session_anchors'].get(SESSIONS.market(instrument))
+    mom_df = RESAMPLER.resample((data['symbol'], rule, anchor), data['mom_df_raw'], rule, anchor)
+    return mom_df, (data['symbol'], rule, anchor)
+
+def indicator_inputs(data: Dict, mom_df: pd.DataFrame) -> tuple:
+    """Trend, momentum and entry frames cut to their warm-up windows (CONFIG['warmup'])."""
+    if not CONFIG['warmup']['enabled']:
+        return data['trend_df'], mom_df, data['entry_df']
+    return (trim_frame(data['trend_df'], WARMUP_BARS['trend']),
+            trim_frame(mom_df, WARMUP_BARS['momentum']),
+            trim_frame(data['entry_df'], WARMUP_BARS['entry']))
+
+def prepare_instrument(instrument: Dict, data: Dict) -> Dict:
+    """Stage 2 (CPU): indicators on every timeframe plus the pure rule evaluation."""
+    mom_df, mom_key = momentum_frame(instrument, data)
+    trend_df, mom_df, entry_df = indicator_inputs(data, mom_df)
     
-    # Momentum: Histogram > 0 AND Histogram is increasing (Relaxed for BTC/ETH)
-    if name in ["Bitcoin", "Ethereum"]:
-        mom_bullish = m_last['Histogram'] > 0
-        mom_bearish = m_last['Histogram'] < 0
+    # 2. Calculate Indicators
+    if CONFIG['indicators']['engine'] == "streaming":
+        symbol = data['symbol']
+        trend_macd = TREND_INDICATORS.update((symbol, "1d"), trend_df)
+        mom_macd = MOMENTUM_INDICATORS.update(mom_key, mom_df)
+        entry_macd = ENTRY_INDICATORS.update((symbol, data['entry_interval']), entry_df)
+    elif CONFIG['indicators']['engine'] == "bars":
+        trend_macd = with_indicators(BarSeries.from_frame(trend_df), *MACD_PERIODS, ema_periods=(200,))
+        mom_macd = with_indicators(BarSeries.from_frame(mom_df), *MACD_PERIODS)
+        entry_macd = with_indicators(BarSeries.from_frame(entry_df), *MACD_PERIODS,
+                                     ema_periods=(200,), rsi_period=14, atr_period=14)
     else:
-        mom_bullish = m_last['Histogram'] > 0 and m_last['Histogram'] > m_prev['Histogram']
-        mom_bearish = m_last['Histogram'] < 0 and m_last['Histogram'] < m_prev['Histogram']
+        trend_macd = memoized_indicators((data['symbol'], "1d"), trend_df, ("EMA", 200), trend_indicators)
+        mom_macd = memoized_indicators(mom_key, mom_df, (), calculate_macd)
+        entry_macd = memoized_indicators((data['symbol'], data['entry_interval']), entry_df,
+                                         ("EMA", 200, "RSI", 14, "ATR", 14), entry_indicators)
+    return evaluate_prepared(instrument, data, trend_macd, mom_macd, entry_macd)
+
+def prepare_panel(batch: List[tuple]) -> List[Dict]:
+    """
+    prepare_instrument() for a whole cycle: each timeframe's indicators for
+    every instrument in one panel pass. Symbols shared by several
+    instruments are computed once. `batch` is [(instrument, loaded frames)].
+    """
+    keys, trend, mom, entry = [], {}, {}, {}
+    for instrument, data in batch:
+        mom_df, mom_key = momentum_frame(instrument, data)
+        entry_key = (data['symbol'], data['entry_interval'])
+        trend[(data['symbol'], "1d")], mom[mom_key], entry[entry_key] = indicator_inputs(data, mom_df)
+        keys.append(((data['symbol'], "1d"), mom_key, entry_key))
+    trend = memoized_panel(TREND_PANEL, trend, ("EMA", 200))
+    mom = memoized_panel(MOMENTUM_PANEL, mom, ())
+    entry = memoized_panel(ENTRY_PANEL, entry, ("EMA", 200, "RSI", 14, "ATR", 14))
     
-    mom_bias = "BULLISH" if mom_bullish else ("BEARISH" if mom_bearish else "NEUTRAL")
+    prepared = []
+    for (instrument, data), (trend_key, mom_key, entry_key) in zip(batch, keys):
+        try:
+            prepared.append(latest_rows(data, trend[trend_key], mom[mom_key], entry[entry_key]))
+        except Exception as e:
+            print(f"  ❌ Error analyzing {instrument.get('name', 'Unknown')}: {e}")
+            prepared.append(None)
     
-    # Entry Signal
-    e_signal = "NEUTRAL"
+    # Rules for the whole batch in one vectorized pass
+    ready = [(instrument, data) for (instrument, _), data in zip(batch, prepared) if data]
+    rules = evaluate_universe([instrument['name'] for instrument, _ in ready], [data for _, data in ready],
+                              [prepared_spec(instrument, data).relaxed for instrument, data in ready])
+    for (_, data), instrument_rules in zip(ready, rules):
+        data["rules"] = instrument_rules
+    return prepared
+
+def bar_row(frame, i: int):
+    """Row `i` of an indicator DataFrame or BarSeries."""
+    return frame.row(i) if isinstance(frame, BarSeries) else frame.iloc[i]
+
+def latest_rows(data: Dict, trend_macd, mom_macd, entry_macd) -> Dict:
+    """Indicator frames (DataFrame or BarSeries) and their latest closed rows, added to `data`."""
+    # Get latest CLOSED values (Strict Confirmation)
+    data.update({
+        "trend_macd": trend_macd,
+        "mom_macd": mom_macd,
+        "entry_macd": entry_macd,
+        "t_last": bar_row(trend_macd, -2),
+        "m_last": bar_row(mom_macd, -2),
+        "m_prev": bar_row(mom_macd, -3),
+        "e_last": bar_row(entry_macd, -2),
+        "e_prev": bar_row(entry_macd, -3)
+    })
+    if isinstance(entry_macd, BarSeries):
+        # Alerts, screenshots and the dashboard read the recent entry bars with pandas
+        data["entry_macd"] = entry_macd.tail(24).to_frame()
+    return data
+
+def evaluate_prepared(instrument: Dict, data: Dict, trend_macd, mom_macd, entry_macd) -> Dict:
+    """Latest closed indicator rows and the rule evaluation on top of them."""
+    latest_rows(data, trend_macd, mom_macd, entry_macd)
+    data["rules"] = evaluate_rules(
+        prepared_spec(instrument, data).relaxed, data['t_last'], data['m_last'], data['m_prev'], data['e_last'], data['e_prev']
+    )
+    return data
+
+def convert_mcx_price(spec, latest_price: float, fx_rate) -> float:
+    """USD quote of the underlying future -> INR per MCX contract unit (unchanged without a rate)."""
+    if fx_rate is None:
+        return latest_price
+    rate = fx_rate.rate
+    # Unit factors per contract live in instrument_registry.MCX_UNITS
+    current_price = spec.convert(latest_price, rate)
+    name = spec.name
     
-    # Filters
-    ema_200 = e_last.get('EMA_200', None)
-    rsi = e_last.get('RSI', None)
-    atr = e_last.get('ATR', 0)
+    print(f"  💱 Converted {name}: ${latest_price:.2f} -> ₹{current_price:.2f} (Rate: {rate:.2f} as of {fx_rate.as_of})")
+    return current_price
+
+def manage_active_signal(instrument: Dict, active_signal: Dict, current_price: float,
+                         trend_bias: str, mom_bias: str, e_signal: str,
+                         signals: Optional[Dict] = None, clock: Optional[datetime] = None,
+                         effects=None) -> Optional[Dict]:
+    """
+    TP / SL / trailing-SL checks for an open trade at `current_price`.
+    Returns the signal while it is still open, None once it has exited.
+    The biases only label the trade screenshots. `signals`, `clock` and
+    `effects` default to ACTIVE_SIGNALS, the wall clock and live_effects().
+    """
+    name = instrument['name']
+    signals = ACTIVE_SIGNALS if signals is None else signals
+    effects = live_effects() if effects is None else effects
     
-    is_above_ema = True if ema_200 is None or e_last['Close'] > ema_200 else False
-    is_below_ema = True if ema_200 is None or e_last['Close'] < ema_200 else False
+    # Entry price remains fixed at signal generation
     
-    # Relaxed RSI for BTC/ETH
-    if name in ["Bitcoin", "Ethereum"]:
-        rsi_bullish = True if rsi is None or rsi > 45 else False
-        rsi_bearish = True if rsi is None or rsi < 55 else False
-    else:
-        rsi_bullish = True if rsi is None or rsi > 50 else False
-        rsi_bearish = True if rsi is None or rsi < 50 else False
+    # Initialize TP hits if not present (migration)
+    if 'tp_hits' not in active_signal or 'tp1' not in active_signal:
+        active_signal['tp_hits'] = active_signal.get('tp_hits', [False, False, False])
+        active_signal['current_sl'] = active_signal.get('current_sl', active_signal['sl'])
+        
+        # Calculate TPs for existing signals based on entry and SL distance
+        sl_dist = abs(active_signal['entry_price'] - active_signal['sl'])
+        if active_signal['type'] == 'BUY':
+            active_signal['tp1'] = active_signal['entry_price'] + (sl_dist * CONFIG['risk']['tp_ratios'][0])
+            active_signal['tp2'] = active_signal['entry_price'] + (sl_dist * CONFIG['risk']['tp_ratios'][1])
+            active_signal['tp3'] = active_signal['entry_price'] + (sl_dist * CONFIG['risk']['tp_ratios'][2])
+        else:
+            active_signal['tp1'] = active_signal['entry_price'] - (sl_dist * CONFIG['risk']['tp_ratios'][0])
+            active_signal['tp2'] = active_signal['entry_price'] - (sl_dist * CONFIG['risk']['tp_ratios'][1])
+            active_signal['tp3'] = active_signal['entry_price'] - (sl_dist * CONFIG['risk']['tp_ratios'][2])
+        
+    current_sl = active_signal['current_sl']
     
-    # Stricter MACD: Both lines must be on the same side of zero (Relaxed for BTC/ETH)
-    if name in ["Bitcoin", "Ethereum"]:
-        macd_bullish = e_last['MACD_Line'] > 0
-        macd_bearish = e_last['MACD_Line'] < 0
-    else:
-        macd_bullish = e_last['MACD_Line'] > 0 and e_last['Signal_Line'] > 0
-        macd_bearish = e_last['MACD_Line'] < 0 and e_last['Signal_Line'] < 0
-
-    if e_prev['Histogram'] < 0 and e_last['Histogram'] > 0:
-        e_signal = "BUY_CROSS"
-    elif e_prev['Histogram'] > 0 and e_last['Histogram'] < 0:
-        e_signal = "SELL_CROSS"
-    elif e_last['Histogram'] > 0:
-        e_signal = "BULLISH_MOM"
-    else:
-        e_signal = "BEARISH_MOM"
+    if active_signal['type'] == 'BUY':
+        # Check SL
+        if current_price <= current_sl:
+            event_type = "TRAIL_SL_HIT" if active_signal['current_sl'] != active_signal['sl'] else "SL_HIT"
+            print(f"  🛑 {name}: BUY signal hit {event_type} @ {current_price}")
+            # Send Telegram alert
+            if effects.telegram_alerts:
+                try:
+                    is_trailing = active_signal['current_sl'] != active_signal['sl']
+                    effects.telegram_alerts.send_sl_hit_alert(name, active_signal, current_price, is_trailing)
+                except Exception as e:
+                    print(f"  ⚠️ Telegram alert failed: {e}")
+            # Calculate trade metrics
+            metrics = calculate_trade_metrics(
+                name, active_signal['entry_price'], current_price, 'BUY',
+                active_signal['time'], clock_now(clock=clock).isoformat(),
+                active_signal['sl'], instrument['pip_size']
+            )
+            effects.log_signal_event(name, event_type, current_price, active_signal, metrics, at=clock_now(clock=clock))
+            active_signal['sl_hit'] = True
+            active_signal['exit_price'] = current_price
+            active_signal['exit_time'] = clock_now(clock=clock).isoformat()
+            # Capture Screenshot before popping
+            if os.environ.get("ENABLE_SCREENSHOTS", "True").lower() == "true":
+                try:
+                    date_str = clock_now(clock=clock).strftime("%Y-%m-%d")
+                    folder = BASE_DIR / "past_trades" / date_str
+                    filename = f"{name.replace('/', '_')}_{event_type}_{clock_now(clock=clock).strftime('%H%M%S')}.png"
+                    
+                    # Create a temporary result dict for the screenshot
+                    temp_res = {
+                        "instrument": name,
+                        "flag": instrument.get('flag', ''),
+                        "ltp": current_price,
+                        "daily": {"bias": trend_bias},
+                        "h4": {"bias": mom_bias},
+                        "h1": {"status": e_signal},
+                        "signal": active_signal
+                    }
+                    effects.capture_trade_screenshot(temp_res, event_type, str(folder / filename))
+                except Exception as e:
+                    print(f"  ⚠️ Screenshot failed: {e}")
 
-    # 4. Check for active signal and validate
-    # current_price is already set above
-    active_signal = ACTIVE_SIGNALS.get(name)
-    
-    # Check if active signal hit SL or TP
-    if active_signal:
-        # Entry price remains fixed at signal generation
-        
-        # Initialize TP hits if not present (migration)
-        if 'tp_hits' not in active_signal or 'tp1' not in active_signal:
-            active_signal['tp_hits'] = active_signal.get('tp_hits', [False, False, False])
-            active_signal['current_sl'] = active_signal.get('current_sl', active_signal['sl'])
-            
-            # Calculate TPs for existing signals based on entry and SL distance
-            sl_dist = abs(active_signal['entry_price'] - active_signal['sl'])
-            if active_signal['type'] == 'BUY':
-                active_signal['tp1'] = active_signal['entry_price'] + (sl_dist * CONFIG['risk']['tp_ratios'][0])
-                active_signal['tp2'] = active_signal['entry_price'] + (sl_dist * CONFIG['risk']['tp_ratios'][1])
-                active_signal['tp3'] = active_signal['entry_price'] + (sl_dist * CONFIG['risk']['tp_ratios'][2])
-            else:
-                active_signal['tp1'] = active_signal['entry_price'] - (sl_dist * CONFIG['risk']['tp_ratios'][0])
-                active_signal['tp2'] = active_signal['entry_price'] - (sl_dist * CONFIG['risk']['tp_ratios'][1])
-                active_signal['tp3'] = active_signal['entry_price'] - (sl_dist * CONFIG['risk']['tp_ratios'][2])
+            # Remove immediately from ACTIVE_SIGNALS
+            signals.pop(name, None)
+            effects.save_active_signals()
+            active_signal = None
+        else:
+            # Check TPs and Trailing SL
+            # TP1
+            if not active_signal['tp_hits'][0] and current_price >= active_signal['tp1']:
+                print(f"  🎯 {name}: BUY signal hit TP1")
+                active_signal['tp_hits'][0] = True
+                effects.log_signal_event(name, "TP1_HIT", current_price, active_signal, at=clock_now(clock=clock))
+                # Send Telegram alert
+                if effects.telegram_alerts:
+                    try:
+                        effects.telegram_alerts.send_tp_hit_alert(name, 1, active_signal, current_price)
+                    except Exception as e:
+                        print(f"  ⚠️ Telegram alert failed: {e}")
+                if CONFIG['risk']['trailing_sl']['move_to_breakeven_at_tp1']:
+                    active_signal['current_sl'] = active_signal['entry_price']
+                    active_signal['lifecycle_status'] = "Trailing SL Active"
+                    print(f"  🛡️ {name}: SL moved to Breakeven")
+                    effects.save_active_signals()
+                else:
+                    active_signal['lifecycle_status'] = "Partial TP Hit"
+                    effects.save_active_signals()
             
-        current_sl = active_signal['current_sl']
-        
-        if active_signal['type'] == 'BUY':
-            # Check SL
-            if current_price <= current_sl:
-                event_type = "TRAIL_SL_HIT" if active_signal['current_sl'] != active_signal['sl'] else "SL_HIT"
-                print(f"  🛑 {name}: BUY signal hit {event_type} @ {current_price}")
+            # TP2
+            if not active_signal['tp_hits'][1] and current_price >= active_signal['tp2']:
+                print(f"  🎯 {name}: BUY signal hit TP2")
+                active_signal['tp_hits'][1] = True
+                effects.log_signal_event(name, "TP2_HIT", current_price, active_signal, at=clock_now(clock=clock))
                 # Send Telegram alert
-                if telegram_alerts:
+                if effects.telegram_alerts:
                     try:
-                        is_trailing = active_signal['current_sl'] != active_signal['sl']
-                        telegram_alerts.send_sl_hit_alert(name, active_signal, current_price, is_trailing)
+                        effects.telegram_alerts.send_tp_hit_alert(name, 2, active_signal, current_price)
                     except Exception as e:
                         print(f"  ⚠️ Telegram alert failed: {e}")
+                if CONFIG['risk']['trailing_sl']['move_to_tp1_at_tp2']:
+                    active_signal['current_sl'] = active_signal['tp1']
+                    active_signal['lifecycle_status'] = "Trailing SL Active"
+                    print(f"  🛡️ {name}: SL moved to TP1")
+                    effects.save_active_signals()
+                else:
+                    active_signal['lifecycle_status'] = "Partial TP Hit"
+                    effects.save_active_signals()
+                    
+            # TP3
+            if not active_signal['tp_hits'][2] and current_price >= active_signal['tp3']:
+                print(f"  🚀 {name}: BUY signal hit TP3 (Full Exit)")
                 # Calculate trade metrics
                 metrics = calculate_trade_metrics(
                     name, active_signal['entry_price'], current_price, 'BUY',
-                    active_signal['time'], datetime.now().isoformat(),
+                    active_signal['time'], clock_now(clock=clock).isoformat(),
                     active_signal['sl'], instrument['pip_size']
                 )
-                log_signal_event(name, event_type, current_price, active_signal, metrics)
-                active_signal['sl_hit'] = True
-                active_signal['exit_price'] = current_price
-                active_signal['exit_time'] = datetime.now().isoformat()
-                # Capture Screenshot before popping
+                effects.log_signal_event(name, "TP3_HIT", current_price, active_signal, metrics, at=clock_now(clock=clock))
+                # Send Telegram alert
+                if effects.telegram_alerts:
+                    try:
+                        effects.telegram_alerts.send_tp_hit_alert(name, 3, active_signal, current_price)
+                    except Exception as e:
+                        print(f"  ⚠️ Telegram alert failed: {e}")
+                
+                # Capture Screenshot
                 if os.environ.get("ENABLE_SCREENSHOTS", "True").lower() == "true":
                     try:
-                        date_str = datetime.now().strftime("%Y-%m-%d")
+                        date_str = clock_now(clock=clock).strftime("%Y-%m-%d")
                         folder = BASE_DIR / "past_trades" / date_str
-                        filename = f"{name.replace('/', '_')}_{event_type}_{datetime.now().strftime('%H%M%S')}.png"
-                        
-                        # Create a temporary result dict for the screenshot
+                        filename = f"{name.replace('/', '_')}_TP3_HIT_{clock_now(clock=clock).strftime('%H%M%S')}.png"
                         temp_res = {
                             "instrument": name,
                             "flag": instrument.get('flag', ''),
@@ -744,123 +1324,123 @@ def analyze_instrument(instrument: Dict) -> Dict:
                             "h1": {"status": e_signal},
                             "signal": active_signal
                         }
-                        capture_trade_screenshot(temp_res, event_type, str(folder / filename))
+                        effects.capture_trade_screenshot(temp_res, "TP3 HIT", str(folder / filename))
                     except Exception as e:
                         print(f"  ⚠️ Screenshot failed: {e}")
 
-                # Remove immediately from ACTIVE_SIGNALS
-                ACTIVE_SIGNALS.pop(name, None)
-                save_active_signals()
+                signals.pop(name, None)
                 active_signal = None
-            else:
-                # Check TPs and Trailing SL
-                # TP1
-                if not active_signal['tp_hits'][0] and current_price >= active_signal['tp1']:
-                    print(f"  🎯 {name}: BUY signal hit TP1")
-                    active_signal['tp_hits'][0] = True
-                    log_signal_event(name, "TP1_HIT", current_price, active_signal)
-                    # Send Telegram alert
-                    if telegram_alerts:
-                        try:
-                            telegram_alerts.send_tp_hit_alert(name, 1, active_signal, current_price)
-                        except Exception as e:
-                            print(f"  ⚠️ Telegram alert failed: {e}")
-                    if CONFIG['risk']['trailing_sl']['move_to_breakeven_at_tp1']:
-                        active_signal['current_sl'] = active_signal['entry_price']
-                        active_signal['lifecycle_status'] = "Trailing SL Active"
-                        print(f"  🛡️ {name}: SL moved to Breakeven")
-                        save_active_signals()
-                    else:
-                        active_signal['lifecycle_status'] = "Partial TP Hit"
-                        save_active_signals()
-                
-                # TP2
-                if not active_signal['tp_hits'][1] and current_price >= active_signal['tp2']:
-                    print(f"  🎯 {name}: BUY signal hit TP2")
-                    active_signal['tp_hits'][1] = True
-                    log_signal_event(name, "TP2_HIT", current_price, active_signal)
-                    # Send Telegram alert
-                    if telegram_alerts:
-                        try:
-                            telegram_alerts.send_tp_hit_alert(name, 2, active_signal, current_price)
-                        except Exception as e:
-                            print(f"  ⚠️ Telegram alert failed: {e}")
-                    if CONFIG['risk']['trailing_sl']['move_to_tp1_at_tp2']:
-                        active_signal['current_sl'] = active_signal['tp1']
-                        active_signal['lifecycle_status'] = "Trailing SL Active"
-                        print(f"  🛡️ {name}: SL moved to TP1")
-                        save_active_signals()
-                    else:
-                        active_signal['lifecycle_status'] = "Partial TP Hit"
-                        save_active_signals()
-                        
-                # TP3
-                if not active_signal['tp_hits'][2] and current_price >= active_signal['tp3']:
-                    print(f"  🚀 {name}: BUY signal hit TP3 (Full Exit)")
-                    # Calculate trade metrics
-                    metrics = calculate_trade_metrics(
-                        name, active_signal['entry_price'], current_price, 'BUY',
-                        active_signal['time'], datetime.now().isoformat(),
-                        active_signal['sl'], instrument['pip_size']
-                    )
-                    log_signal_event(name, "TP3_HIT", current_price, active_signal, metrics)
-                    # Send Telegram alert
-                    if telegram_alerts:
-                        try:
-                            telegram_alerts.send_tp_hit_alert(name, 3, active_signal, current_price)
-                        except Exception as e:
-                            print(f"  ⚠️ Telegram alert failed: {e}")
-                    
-                    # Capture Screenshot
-                    if os.environ.get("ENABLE_SCREENSHOTS", "True").lower() == "true":
-                        try:
-                            date_str = datetime.now().strftime("%Y-%m-%d")
-                            folder = BASE_DIR / "past_trades" / date_str
-                            filename = f"{name.replace('/', '_')}_TP3_HIT_{datetime.now().strftime('%H%M%S')}.png"
-                            temp_res = {
-                                "instrument": name,
-                                "flag": instrument.get('flag', ''),
-                                "ltp": current_price,
-                                "daily": {"bias": trend_bias},
-                                "h4": {"bias": mom_bias},
-                                "h1": {"status": e_signal},
-                                "signal": active_signal
-                            }
-                            capture_trade_screenshot(temp_res, "TP3 HIT", str(folder / filename))
-                        except Exception as e:
-                            print(f"  ⚠️ Screenshot failed: {e}")
+        
+    elif active_signal['type'] == 'SELL':
+        # Check SL
+        if current_price >= current_sl:
+            event_type = "TRAIL_SL_HIT" if active_signal['current_sl'] != active_signal['sl'] else "SL_HIT"
+            print(f"  🛑 {name}: SELL signal hit {event_type} @ {current_price}")
+            # Send Telegram alert
+            if effects.telegram_alerts:
+                try:
+                    is_trailing = active_signal['current_sl'] != active_signal['sl']
+                    effects.telegram_alerts.send_sl_hit_alert(name, active_signal, current_price, is_trailing)
+                except Exception as e:
+                    print(f"  ⚠️ Telegram alert failed: {e}")
+            # Calculate trade metrics
+            metrics = calculate_trade_metrics(
+                name, active_signal['entry_price'], current_price, 'SELL',
+                active_signal['time'], clock_now(clock=clock).isoformat(),
+                active_signal['sl'], instrument['pip_size']
+            )
+            effects.log_signal_event(name, event_type, current_price, active_signal, metrics, at=clock_now(clock=clock))
+            active_signal['sl_hit'] = True
+            active_signal['exit_price'] = current_price
+            active_signal['exit_time'] = clock_now(clock=clock).isoformat()
+            # Capture Screenshot
+            if os.environ.get("ENABLE_SCREENSHOTS", "True").lower() == "true":
+                try:
+                    date_str = clock_now(clock=clock).strftime("%Y-%m-%d")
+                    folder = BASE_DIR / "past_trades" / date_str
+                    filename = f"{name.replace('/', '_')}_{event_type}_{clock_now(clock=clock).strftime('%H%M%S')}.png"
+                    temp_res = {
+                        "instrument": name,
+                        "flag": instrument.get('flag', ''),
+                        "ltp": current_price,
+                        "daily": {"bias": trend_bias},
+                        "h4": {"bias": mom_bias},
+                        "h1": {"status": e_signal},
+                        "signal": active_signal
+                    }
+                    effects.capture_trade_screenshot(temp_res, event_type, str(folder / filename))
+                except Exception as e:
+                    print(f"  ⚠️ Screenshot failed: {e}")
 
-                    ACTIVE_SIGNALS.pop(name, None)
-                    active_signal = None
+            # Remove immediately from ACTIVE_SIGNALS
+            signals.pop(name, None)
+            effects.save_active_signals()
+            active_signal = None
+        else:
+            # Check TPs and Trailing SL
+            # TP1
+            if not active_signal['tp_hits'][0] and current_price <= active_signal['tp1']:
+                print(f"  🎯 {name}: SELL signal hit TP1")
+                active_signal['tp_hits'][0] = True
+                effects.log_signal_event(name, "TP1_HIT", current_price, active_signal, at=clock_now(clock=clock))
+                # Send Telegram alert
+                if effects.telegram_alerts:
+                    try:
+                        effects.telegram_alerts.send_tp_hit_alert(name, 1, active_signal, current_price)
+                    except Exception as e:
+                        print(f"  ⚠️ Telegram alert failed: {e}")
+                if CONFIG['risk']['trailing_sl']['move_to_breakeven_at_tp1']:
+                    active_signal['current_sl'] = active_signal['entry_price']
+                    active_signal['lifecycle_status'] = "Trailing SL Active"
+                    print(f"  🛡️ {name}: SL moved to Breakeven")
+                    effects.save_active_signals()
+                else:
+                    active_signal['lifecycle_status'] = "Partial TP Hit"
+                    effects.save_active_signals()
             
-        elif active_signal['type'] == 'SELL':
-            # Check SL
-            if current_price >= current_sl:
-                event_type = "TRAIL_SL_HIT" if active_signal['current_sl'] != active_signal['sl'] else "SL_HIT"
-                print(f"  🛑 {name}: SELL signal hit {event_type} @ {current_price}")
+            # TP2
+            if not active_signal['tp_hits'][1] and current_price <= active_signal['tp2']:
+                print(f"  🎯 {name}: SELL signal hit TP2")
+                active_signal['tp_hits'][1] = True
+                effects.log_signal_event(name, "TP2_HIT", current_price, active_signal, at=clock_now(clock=clock))
                 # Send Telegram alert
-                if telegram_alerts:
+                if effects.telegram_alerts:
                     try:
-                        is_trailing = active_signal['current_sl'] != active_signal['sl']
-                        telegram_alerts.send_sl_hit_alert(name, active_signal, current_price, is_trailing)
+                        effects.telegram_alerts.send_tp_hit_alert(name, 2, active_signal, current_price)
                     except Exception as e:
                         print(f"  ⚠️ Telegram alert failed: {e}")
+                if CONFIG['risk']['trailing_sl']['move_to_tp1_at_tp2']:
+                    active_signal['current_sl'] = active_signal['tp1']
+                    active_signal['lifecycle_status'] = "Trailing SL Active"
+                    print(f"  🛡️ {name}: SL moved to TP1")
+                    effects.save_active_signals()
+                else:
+                    active_signal['lifecycle_status'] = "Partial TP Hit"
+                    effects.save_active_signals()
+                    
+            # TP3
+            if not active_signal['tp_hits'][2] and current_price <= active_signal['tp3']:
+                print(f"  🚀 {name}: SELL signal hit TP3 (Full Exit)")
                 # Calculate trade metrics
                 metrics = calculate_trade_metrics(
                     name, active_signal['entry_price'], current_price, 'SELL',
-                    active_signal['time'], datetime.now().isoformat(),
+                    active_signal['time'], clock_now(clock=clock).isoformat(),
                     active_signal['sl'], instrument['pip_size']
                 )
-                log_signal_event(name, event_type, current_price, active_signal, metrics)
-                active_signal['sl_hit'] = True
-                active_signal['exit_price'] = current_price
-                active_signal['exit_time'] = datetime.now().isoformat()
+                effects.log_signal_event(name, "TP3_HIT", current_price, active_signal, metrics, at=clock_now(clock=clock))
+                # Send Telegram alert
+                if effects.telegram_alerts:
+                    try:
+                        effects.telegram_alerts.send_tp_hit_alert(name, 3, active_signal, current_price)
+                    except Exception as e:
+                        print(f"  ⚠️ Telegram alert failed: {e}")
+                
                 # Capture Screenshot
                 if os.environ.get("ENABLE_SCREENSHOTS", "True").lower() == "true":
                     try:
-                        date_str = datetime.now().strftime("%Y-%m-%d")
+                        date_str = clock_now(clock=clock).strftime("%Y-%m-%d")
                         folder = BASE_DIR / "past_trades" / date_str
-                        filename = f"{name.replace('/', '_')}_{event_type}_{datetime.now().strftime('%H%M%S')}.png"
+                        filename = f"{name.replace('/', '_')}_TP3_HIT_{clock_now(clock=clock).strftime('%H%M%S')}.png"
                         temp_res = {
                             "instrument": name,
                             "flag": instrument.get('flag', ''),
@@ -870,103 +1450,95 @@ def analyze_instrument(instrument: Dict) -> Dict:
                             "h1": {"status": e_signal},
                             "signal": active_signal
                         }
-                        capture_trade_screenshot(temp_res, event_type, str(folder / filename))
+                        effects.capture_trade_screenshot(temp_res, "TP3 HIT", str(folder / filename))
                     except Exception as e:
                         print(f"  ⚠️ Screenshot failed: {e}")
 
-                # Remove immediately from ACTIVE_SIGNALS
-                ACTIVE_SIGNALS.pop(name, None)
-                save_active_signals()
+                signals.pop(name, None)
                 active_signal = None
-            else:
-                # Check TPs and Trailing SL
-                # TP1
-                if not active_signal['tp_hits'][0] and current_price <= active_signal['tp1']:
-                    print(f"  🎯 {name}: SELL signal hit TP1")
-                    active_signal['tp_hits'][0] = True
-                    log_signal_event(name, "TP1_HIT", current_price, active_signal)
-                    # Send Telegram alert
-                    if telegram_alerts:
-                        try:
-                            telegram_alerts.send_tp_hit_alert(name, 1, active_signal, current_price)
-                        except Exception as e:
-                            print(f"  ⚠️ Telegram alert failed: {e}")
-                    if CONFIG['risk']['trailing_sl']['move_to_breakeven_at_tp1']:
-                        active_signal['current_sl'] = active_signal['entry_price']
-                        active_signal['lifecycle_status'] = "Trailing SL Active"
-                        print(f"  🛡️ {name}: SL moved to Breakeven")
-                        save_active_signals()
-                    else:
-                        active_signal['lifecycle_status'] = "Partial TP Hit"
-                        save_active_signals()
-                
-                # TP2
-                if not active_signal['tp_hits'][1] and current_price <= active_signal['tp2']:
-                    print(f"  🎯 {name}: SELL signal hit TP2")
-                    active_signal['tp_hits'][1] = True
-                    log_signal_event(name, "TP2_HIT", current_price, active_signal)
-                    # Send Telegram alert
-                    if telegram_alerts:
-                        try:
-                            telegram_alerts.send_tp_hit_alert(name, 2, active_signal, current_price)
-                        except Exception as e:
-                            print(f"  ⚠️ Telegram alert failed: {e}")
-                    if CONFIG['risk']['trailing_sl']['move_to_tp1_at_tp2']:
-                        active_signal['current_sl'] = active_signal['tp1']
-                        active_signal['lifecycle_status'] = "Trailing SL Active"
-                        print(f"  🛡️ {name}: SL moved to TP1")
-                        save_active_signals()
-                    else:
-                        active_signal['lifecycle_status'] = "Partial TP Hit"
-                        save_active_signals()
-                        
-                # TP3
-                if not active_signal['tp_hits'][2] and current_price <= active_signal['tp3']:
-                    print(f"  🚀 {name}: SELL signal hit TP3 (Full Exit)")
-                    # Calculate trade metrics
-                    metrics = calculate_trade_metrics(
-                        name, active_signal['entry_price'], current_price, 'SELL',
-                        active_signal['time'], datetime.now().isoformat(),
-                        active_signal['sl'], instrument['pip_size']
-                    )
-                    log_signal_event(name, "TP3_HIT", current_price, active_signal, metrics)
-                    # Send Telegram alert
-                    if telegram_alerts:
-                        try:
-                            telegram_alerts.send_tp_hit_alert(name, 3, active_signal, current_price)
-                        except Exception as e:
-                            print(f"  ⚠️ Telegram alert failed: {e}")
-                    
-                    # Capture Screenshot
-                    if os.environ.get("ENABLE_SCREENSHOTS", "True").lower() == "true":
-                        try:
-                            date_str = datetime.now().strftime("%Y-%m-%d")
-                            folder = BASE_DIR / "past_trades" / date_str
-                            filename = f"{name.replace('/', '_')}_TP3_HIT_{datetime.now().strftime('%H%M%S')}.png"
-                            temp_res = {
-                                "instrument": name,
-                                "flag": instrument.get('flag', ''),
-                                "ltp": current_price,
-                                "daily": {"bias": trend_bias},
-                                "h4": {"bias": mom_bias},
-                                "h1": {"status": e_signal},
-                                "signal": active_signal
-                            }
-                            capture_trade_screenshot(temp_res, "TP3 HIT", str(folder / filename))
-                        except Exception as e:
-                            print(f"  ⚠️ Screenshot failed: {e}")
+    
+    return active_signal
+
+def load_prepared(instrument: Dict, frames: Optional[CycleFrameCache] = None) -> Optional[Dict]:
+    """Frames and indicators of one instrument, from the cycle cache when given"""
+    data = load_instrument_frames(instrument, frames.get if frames is not None else fetch_data)
+    return prepare_instrument(instrument, data) if data is not None else None
+
+def analyze_instrument(instrument: Dict, frames: Optional[CycleFrameCache] = None,
+                       prepared: Optional[Dict] = None, signals: Optional[Dict] = None,
+                       clock: Optional[datetime] = None, effects=None) -> Dict:
+    """
+    Full analysis of one instrument. `prepared` is the output of
+    prepare_instrument() when an earlier pipeline stage already fetched the
+    frames and computed the indicators. `signals`, `clock` and `effects` are
+    as for manage_active_signal().
+    """
+    spec = REGISTRY.of(instrument)
+    name = spec.name
+    category = spec.category
+    signals = ACTIVE_SIGNALS if signals is None else signals
+    effects = live_effects() if effects is None else effects
+    
+    if prepared is None:
+        prepared = load_prepared(instrument, frames)
+        if prepared is None:
+            return None
+    
+    contract_info = prepared['contract_info']
+    if contract_info:
+        contract_info = {key: value for key, value in contract_info.items() if key != "expiry_at"}
+        contract_info["days_to_expiry"] = (prepared['contract_info']["expiry_at"] - clock_now(clock=clock)).days
+    entry_df = prepared['entry_df']
+    entry_macd = prepared['entry_macd']
+    t_last, m_last, m_prev = prepared['t_last'], prepared['m_last'], prepared['m_prev']
+    e_last, e_prev = prepared['e_last'], prepared['e_prev']
+    
+    rules = prepared['rules']
+    trend_bias, mom_bias, e_signal = rules['trend_bias'], rules['mom_bias'], rules['e_signal']
+    ema_200, rsi, atr = rules['ema_200'], rules['rsi'], rules['atr']
+    is_above_ema, is_below_ema = rules['is_above_ema'], rules['is_below_ema']
+    rsi_bullish, rsi_bearish = rules['rsi_bullish'], rules['rsi_bearish']
+    macd_bullish, macd_bearish = rules['macd_bullish'], rules['macd_bearish']
+    
+    trend_label = "1D Trend"
+    mom_label = "4H MOM"
+    entry_label = "1H Entry"
+    
+    # Get LATEST price for display
+    latest_price = entry_macd.iloc[-1]['Close']
+    prev_price = entry_macd.iloc[-2]['Close']
+    
+    # Price Sanity Check: Ignore spikes > 5% in a single candle (unless it's Crypto)
+    if spec.spike_filter:
+        price_change = abs(latest_price - prev_price) / prev_price
+        if price_change > 0.05:
+            print(f"  ⚠️ Ignoring extreme price spike for {name}: {prev_price} -> {latest_price} ({price_change:.2%})")
+            latest_price = prev_price
+
+    
+    # Special handling for MCX Instruments (Convert USD to INR with unit factors)
+    current_price = latest_price
+    if spec.unit_conversion:
+        try:
+            current_price = convert_mcx_price(spec, latest_price, prepared['fx_rate'])
+        except Exception as e:
+            print(f"  ⚠️ Conversion failed for {name}: {e}")
 
-                    ACTIVE_SIGNALS.pop(name, None)
-                    active_signal = None
+    # 4. Check for active signal and validate
+    # current_price is already set above
+    active_signal = signals.get(name)
+    
+    # Check if active signal hit SL or TP
+    if active_signal:
+        active_signal = manage_active_signal(instrument, active_signal, current_price, trend_bias, mom_bias, e_signal,
+                                             signals=signals, clock=clock, effects=effects)
     
     # ================= RE-ENTRY DETECTION (ENHANCED WITH FIBONACCI) =================
     # Per-category reentry detection with Fibonacci levels and strength scoring
     re_entry_opportunity = None
     
-    # Enable reentry only for Forex category
-    REENTRY_ENABLED_CATEGORIES = ['Forex']
-    
-    if active_signal and category in REENTRY_ENABLED_CATEGORIES:
+    # Enable reentry only for Forex category (spec.reentry)
+    if active_signal and spec.reentry:
         entry_price = active_signal['entry_price']
         signal_type = active_signal['type']
         current_sl = active_signal.get('current_sl', active_signal['sl'])
@@ -1079,9 +1651,9 @@ def analyze_instrument(instrument: Dict) -> Dict:
                             }
                             print(f"  🔄 {name}: RE-ENTRY [{strength}%] - {re_entry_opportunity['reason']} | R:R {re_entry_opportunity['risk_reward']}")
                             # Send Telegram alert
-                            if telegram_alerts:
+                            if effects.telegram_alerts:
                                 try:
-                                    telegram_alerts.send_reentry_alert(name, re_entry_opportunity, active_signal)
+                                    effects.telegram_alerts.send_reentry_alert(name, re_entry_opportunity, active_signal)
                                 except Exception as e:
                                     print(f"  ⚠️ Telegram alert failed: {e}")
             
@@ -1174,9 +1746,9 @@ def analyze_instrument(instrument: Dict) -> Dict:
                             }
                             print(f"  🔄 {name}: RE-ENTRY [{strength}%] - {re_entry_opportunity['reason']} | R:R {re_entry_opportunity['risk_reward']}")
                             # Send Telegram alert
-                            if telegram_alerts:
+                            if effects.telegram_alerts:
                                 try:
-                                    telegram_alerts.send_reentry_alert(name, re_entry_opportunity, active_signal)
+                                    effects.telegram_alerts.send_reentry_alert(name, re_entry_opportunity, active_signal)
                                 except Exception as e:
                                     print(f"  ⚠️ Telegram alert failed: {e}")
     
@@ -1188,18 +1760,18 @@ def analyze_instrument(instrument: Dict) -> Dict:
     # Indian Market Hours Check
     can_generate_signal = True
     ist = pytz.timezone('Asia/Kolkata')
-    current_time_ist = datetime.now(ist)
+    current_time_ist = clock_now(ist, clock)
     current_hour = current_time_ist.hour
     current_minute = current_time_ist.minute
     
     # MCX Market Hours: 9:00 AM to 11:55 PM (09:00 to 23:55)
-    if name.startswith("MCX"):
+    if spec.signal_hours == "MCX":
         if current_hour < 9 or (current_hour == 23 and current_minute > 55) or current_hour >= 24:
             can_generate_signal = False
             print(f"  ⏰ {name}: Outside MCX market hours (Current: {current_time_ist.strftime('%H:%M IST')}). Skipping signal generation.")
     
     # NSE Equity Futures Market Hours: 9:15 AM to 3:30 PM (09:15 to 15:30)
-    elif name in ["Nifty 50", "Bank Nifty", "Sensex"] or category == "Indian Stocks":
+    elif spec.signal_hours == "NSE":
         if current_hour < 9 or (current_hour == 9 and current_minute < 15) or current_hour > 15 or (current_hour == 15 and current_minute > 30):
             can_generate_signal = False
             print(f"  ⏰ {name}: Outside NSE market hours (Current: {current_time_ist.strftime('%H:%M IST')}). Skipping signal generation.")
@@ -1212,31 +1784,18 @@ def analyze_instrument(instrument: Dict) -> Dict:
                 # Define entry, sl_dist, and tp_ratios BEFORE using them
                 entry = current_price  # Use real-time price for entry
                 
-                # Dynamic SL based on ATR
-                # NSE Live: 2.5x ATR (safer for 3-4 day swing trades)
-                # Stock Scalping: 1.0x ATR (tighter for intraday)
-                # Others: 1.5x ATR (standard)
-                if category == "NSE Live":
-                    sl_multiplier = CONFIG['nse_specific']['sl_atr_multiplier']  # 2.5x for swing trades
-                    tp_ratios = CONFIG['risk']['tp_ratios']
-                elif category == "Stock Scalping":
-                    sl_multiplier = 1.0  # Tighter SL for scalping
-                    tp_ratios = [1.0, 2.0, 3.0]  # 1:1, 1:2, 1:3 for scalping
-                elif category in ["Crypto Scalping", "Crypto"]:
-                    sl_multiplier = 2.5  # Wider SL for crypto volatility
-                    tp_ratios = CONFIG['risk']['tp_ratios']
-                else:
-                    sl_multiplier = CONFIG['risk']['sl_atr_multiplier']
-                    tp_ratios = CONFIG['risk']['tp_ratios']
-                
-                sl_dist = atr * sl_multiplier
+                # Dynamic SL based on ATR, per category (instrument_registry.risk_profile):
+                # NSE Live 2.5x (3-4 day swings), Stock Scalping 1.0x with 1:1/1:2/1:3,
+                # Crypto 2.5x, others CONFIG['risk']
+                tp_ratios = spec.tp_ratios
+                sl_dist = atr * spec.sl_multiplier
                 if sl_dist == 0:  # Fallback
-                    sl_dist = 30 * instrument['pip_size']
+                    sl_dist = 30 * spec.pip_size
                 
                 # ========== NSE LIVE SPECIFIC FILTERS ==========
                 can_generate_nse_signal = True
                 
-                if category == "NSE Live":
+                if spec.nse_filters:
                     # 1. Volume Filter (1.2x average)
                     if CONFIG['nse_specific']['volume_multiplier'] > 0:
                         vol_confirmed, curr_vol, avg_vol, vol_ratio = check_volume_confirmation(
@@ -1254,7 +1813,7 @@ def analyze_instrument(instrument: Dict) -> Dict:
                     if can_generate_nse_signal and CONFIG['nse_specific']['orb_enabled']:
                         # Update ORB data if in ORB window
                         if is_orb_window(current_time_ist):
-                            update_opening_range(name, current_price)
+                            effects.update_opening_range(name, current_price)
                         
                         # Check ORB breakout alignment
                         orb_status = get_orb_status(name)
@@ -1303,20 +1862,20 @@ def analyze_instrument(instrument: Dict) -> Dict:
                         "tp2": tp2,
                         "tp3": tp3,
                         "tp_hits": [False, False, False],
-                        "time": datetime.now().isoformat(),
+                        "time": clock_now(clock=clock).isoformat(),
                         "candle_time": e_last.name.isoformat(),
                         "category": category,
                         "lifecycle_status": "New Signal"
                     }
-                    ACTIVE_SIGNALS[name] = final_signal
-                    save_active_signals()
+                    signals[name] = final_signal
+                    effects.save_active_signals()
                     status = "ACTIVE_BUY"
                     print(f"  🆕 {name}: NEW BUY SIGNAL @ {entry:.5f}")
-                    log_signal_event(name, "ENTRY", entry, final_signal)
+                    effects.log_signal_event(name, "ENTRY", entry, final_signal, at=clock_now(clock=clock))
                     # Send Telegram alert
-                    if telegram_alerts:
+                    if effects.telegram_alerts:
                         try:
-                            telegram_alerts.send_new_signal_alert(name, final_signal)
+                            effects.telegram_alerts.send_new_signal_alert(name, final_signal)
                         except Exception as e:
                             print(f"  ⚠️ Telegram alert failed: {e}")
                 else:
@@ -1328,31 +1887,18 @@ def analyze_instrument(instrument: Dict) -> Dict:
             if e_signal == "SELL_CROSS" or (e_signal == "BEARISH_MOM" and e_prev['Histogram'] >= 0):
                 entry = current_price # Use real-time price for entry
                 
-                # Dynamic SL based on ATR
-                # NSE Live: 2.5x ATR (safer for 3-4 day swing trades)
-                # Stock Scalping: 1.0x ATR (tighter for intraday)
-                # Others: 1.5x ATR (standard)
-                if category == "NSE Live":
-                    sl_multiplier = CONFIG['nse_specific']['sl_atr_multiplier']  # 2.5x for swing trades
-                    tp_ratios = CONFIG['risk']['tp_ratios']
-                elif category == "Stock Scalping":
-                    sl_multiplier = 1.0  # Tighter SL for scalping
-                    tp_ratios = [1.0, 2.0, 3.0]  # 1:1, 1:2, 1:3 for scalping
-                elif category in ["Crypto Scalping", "Crypto"]:
-                    sl_multiplier = 2.5  # Wider SL for crypto volatility
-                    tp_ratios = CONFIG['risk']['tp_ratios']
-                else:
-                    sl_multiplier = CONFIG['risk']['sl_atr_multiplier']
-                    tp_ratios = CONFIG['risk']['tp_ratios']
-                
-                sl_dist = atr * sl_multiplier
+                # Dynamic SL based on ATR, per category (instrument_registry.risk_profile):
+                # NSE Live 2.5x (3-4 day swings), Stock Scalping 1.0x with 1:1/1:2/1:3,
+                # Crypto 2.5x, others CONFIG['risk']
+                tp_ratios = spec.tp_ratios
+                sl_dist = atr * spec.sl_multiplier
                 if sl_dist == 0: # Fallback
-                    sl_dist = 30 * instrument['pip_size']
+                    sl_dist = 30 * spec.pip_size
                 
                 # ========== NSE LIVE SPECIFIC FILTERS ==========
                 can_generate_nse_signal = True
                 
-                if category == "NSE Live":
+                if spec.nse_filters:
                     # 1. Volume Filter (1.2x average)
                     if CONFIG['nse_specific']['volume_multiplier'] > 0:
                         vol_confirmed, curr_vol, avg_vol, vol_ratio = check_volume_confirmation(
@@ -1370,7 +1916,7 @@ def analyze_instrument(instrument: Dict) -> Dict:
                     if can_generate_nse_signal and CONFIG['nse_specific']['orb_enabled']:
                         # Update ORB data if in ORB window
                         if is_orb_window(current_time_ist):
-                            update_opening_range(name, current_price)
+                            effects.update_opening_range(name, current_price)
                         
                         # Check ORB breakout alignment
                         orb_status = get_orb_status(name)
@@ -1419,20 +1965,20 @@ def analyze_instrument(instrument: Dict) -> Dict:
                         "tp2": tp2,
                         "tp3": tp3,
                         "tp_hits": [False, False, False],
-                        "time": datetime.now().isoformat(),
+                        "time": clock_now(clock=clock).isoformat(),
                         "candle_time": e_last.name.isoformat(),
                         "category": category,
                         "lifecycle_status": "New Signal"
                     }
-                    ACTIVE_SIGNALS[name] = final_signal
-                    save_active_signals()
+                    signals[name] = final_signal
+                    effects.save_active_signals()
                     status = "ACTIVE_SELL"
                     print(f"  🆕 {name}: NEW SELL SIGNAL @ {entry:.5f}")
-                    log_signal_event(name, "ENTRY", entry, final_signal)
+                    effects.log_signal_event(name, "ENTRY", entry, final_signal, at=clock_now(clock=clock))
                     # Send Telegram alert
-                    if telegram_alerts:
+                    if effects.telegram_alerts:
                         try:
-                            telegram_alerts.send_new_signal_alert(name, final_signal)
+                            effects.telegram_alerts.send_new_signal_alert(name, final_signal)
                         except Exception as e:
                             print(f"  ⚠️ Telegram alert failed: {e}")
                 else:
@@ -1452,17 +1998,17 @@ def analyze_instrument(instrument: Dict) -> Dict:
             if active_signal['type'] == 'BUY' and (trend_bias == "BEARISH" and mom_bias == "BEARISH"):
                 if e_signal == "SELL_CROSS":
                     print(f"  🔄 {name}: REVERSE SIGNAL - Closing BUY")
-                    ACTIVE_SIGNALS.pop(name, None)
-                    save_active_signals()
+                    signals.pop(name, None)
+                    effects.save_active_signals()
                     final_signal = None
             elif active_signal['type'] == 'SELL' and (trend_bias == "BULLISH" and mom_bias == "BULLISH"):
                 if e_signal == "BUY_CROSS":
                     print(f"  🔄 {name}: REVERSE SIGNAL - Closing SELL")
-                    ACTIVE_SIGNALS.pop(name, None)
-                    save_active_signals()
+                    signals.pop(name, None)
+                    effects.save_active_signals()
                     final_signal = None
 
-    return {
+    result = {
         "instrument": name,
         "flag": instrument.get('flag', ''),
         "ltp": current_price,
@@ -1489,9 +2035,401 @@ def analyze_instrument(instrument: Dict) -> Dict:
         "re_entry": re_entry_opportunity,  # Re-entry detection
         "category": instrument.get('category', 'Other'),
         "contract_info": contract_info,  # NSE futures contract details
-        "timestamp": datetime.now().isoformat(),
-        "sparkline": entry_df['Close'].tail(24).tolist()  # Last 24 1H candles for mini chart
+        "stale_data": prepared['stale'],  # True when a fetch failed and the last good frame was used
+        "cache_age": prepared['cache_age'],  # Seconds since each timeframe was downloaded
+        "fx_rate": prepared['fx_rate'].to_dict() if prepared['fx_rate'] else None,  # USD/INR used for MCX prices
+        "timestamp": clock_now(clock=clock).isoformat(),
+        "sparkline": entry_df['Close'].tail(24).tolist(),  # Last 24 1H candles for mini chart
+        "analysis": "full"
     }
+    
+    # Next full analysis once the forming entry bar has closed (staggered per exchange group);
+    # while the market is open, a bar the provider has not published yet is retried after the grace
+    now = pd.Timestamp(clock_now(pytz.utc, clock))
+    session_open = SESSIONS.is_open(instrument, now) if CONFIG['sessions']['enabled'] else None
+    next_full_at = next_bar_close(
+        entry_df, INTRADAY_MINUTES[prepared['entry_interval']], now, session_open
+    ) + pd.Timedelta(seconds=CONFIG['cache']['bar_close_grace_seconds']) + SCHEDULER.offset(prepared['symbol'])
+    effects.quote_monitor.record(name, result, latest_price, next_full_at, now)
+    return result
+
+def monitor_active_signal(instrument: Dict, quote: Optional[tuple]) -> Optional[Dict]:
+    """
+    Quote path for an open trade between entry-bar closes: SL/TP/trailing on
+    the last price, everything else from the last full analysis. Falls back
+    to the full analysis when there is no quote or the trade closes. In
+    "background" effects mode the step is recorded and committed through
+    apply_evaluation(), like a full analysis.
+    """
+    spec = REGISTRY.of(instrument)
+    name = spec.name
+    snapshot = QUOTE_MONITOR.snapshot(name)
+    if quote is None or snapshot is None:
+        print(f"  ⚠️ No quote for {name}, running full analysis")
+        return analyze(instrument, FRAME_CACHE)
+    
+    latest_price, as_of = quote
+    
+    # Same spike guard as the full analysis, against the last analysed close
+    prev_price = QUOTE_MONITOR.raw_price(name)
+    if spec.spike_filter and prev_price:
+        price_change = abs(latest_price - prev_price) / prev_price
+        if price_change > 0.05:
+            print(f"  ⚠️ Ignoring extreme price spike for {name}: {prev_price} -> {latest_price} ({price_change:.2%})")
+            latest_price = prev_price
+    
+    current_price = latest_price
+    fx_rate = None
+    if spec.unit_conversion:
+        try:
+            fx_rate = FX_RATES.get("USD", "INR")
+            current_price = convert_mcx_price(spec, latest_price, fx_rate)
+        except Exception as e:
+            print(f"  ⚠️ Conversion failed for {name}: {e}")
+    
+    clock = MARKET_DATA.now().to_pydatetime()
+    background = CONFIG['engine']['effects'] == "background"
+    signals = {name: copy.deepcopy(ACTIVE_SIGNALS[name])} if background else ACTIVE_SIGNALS
+    log = EffectLog()
+    active_signal = manage_active_signal(
+        instrument, signals[name], current_price,
+        snapshot['daily']['bias'], snapshot['h4']['bias'], snapshot['h1']['status'],
+        signals=signals, clock=clock, effects=recording_effects(log) if background else live_effects()
+    )
+    if background:
+        apply_evaluation(name, signals.get(name), log.calls)
+    if active_signal is None:
+        # Trade closed: the full analysis decides the new status and any new entry
+        return analyze(instrument, FRAME_CACHE)
+    
+    snapshot.update({
+        "ltp": current_price,
+        "signal": active_signal,
+        "overall_status": f"ACTIVE_{active_signal['type']}",
+        "quote": {"price": latest_price, "as_of": as_of.isoformat()},
+        "timestamp": clock_now(clock=clock).isoformat(),
+        "analysis": "quote"
+    })
+    if fx_rate:
+        snapshot["fx_rate"] = fx_rate.to_dict()
+    return snapshot
+
+def market_settled(instrument: Dict, now: pd.Timestamp) -> bool:
+    """Market closed and the last full analysis ran after its closing bar was published"""
+    if SESSIONS.is_open(instrument, now):
+        return False
+    analysed_at = QUOTE_MONITOR.analysed_at(instrument['name'])
+    last_close = SESSIONS.last_close(instrument, now)
+    if analysed_at is None or last_close is None:
+        return False
+    return analysed_at >= last_close + pd.Timedelta(seconds=CONFIG['cache']['bar_close_grace_seconds'])
+
+def closed_market_results(instruments: List[Dict], now: pd.Timestamp) -> List[Dict]:
+    """Last full analysis of each closed-market instrument, tagged with its next open"""
+    results = []
+    for instrument in instruments:
+        res = QUOTE_MONITOR.snapshot(instrument['name'])
+        next_open = SESSIONS.next_open(instrument, now)
+        res["analysis"] = "snapshot"
+        res["session"] = {
+            "market": SESSIONS.market(instrument),
+            "open": False,
+            "next_open": next_open.isoformat() if next_open is not None else None
+        }
+        results.append(res)
+    return results
+
+def next_wake(now: pd.Timestamp) -> tuple:
+    """(wake time, reason): next staggered entry-bar close or market open, or the next quote poll"""
+    triggers = []
+    polling = not CONFIG['quotes']['fast_path']  # every cycle is a full analysis
+    for instrument in CONFIG['instruments']:
+        name = instrument['name']
+        if CONFIG['sessions']['enabled'] and market_settled(instrument, now):
+            next_open = SESSIONS.next_open(instrument, now)
+            if next_open is not None:
+                triggers.append(next_open)
+            continue
+        next_full_at = QUOTE_MONITOR.next_full_at(name)
+        if next_full_at is None or next_full_at <= now:
+            # Analysis failing or skipped (no data): retry on the poll interval
+            polling = True
+        else:
+            triggers.append(next_full_at)
+        if name in ACTIVE_SIGNALS:
+            polling = True
+    return SCHEDULER.next_wake(now, triggers, polling)
+
+def run_quote_cycle(instruments: List[Dict]) -> List[Dict]:
+    """
+    Instruments whose entry bar has not closed since their last full analysis:
+    open trades are checked on one bulk quote request, the rest reuse their
+    last result.
+    """
+    active = [inst for inst in instruments if inst['name'] in ACTIVE_SIGNALS]
+    quotes = {}
+    if active:
+        symbols = list(dict.fromkeys(resolve_symbol(inst) for inst in active))
+        try:
+            throttle()
+            quotes = MARKET_DATA.quotes(symbols)
+        except Exception as e:
+            print(f"  ⚠️ Quote request failed: {e}")
+    print(f"⚡ Quote path: {len(active)} open trades on {len(quotes)} quotes, "
+          f"{len(instruments) - len(active)} unchanged until their bar closes")
+    
+    results = []
+    for instrument in instruments:
+        name = instrument['name']
+        try:
+            if name in ACTIVE_SIGNALS:
+                res = monitor_active_signal(instrument, quotes.get(resolve_symbol(instrument)))
+            else:
+                res = QUOTE_MONITOR.snapshot(name)
+                res["analysis"] = "snapshot"
+            if res:
+                results.append(res)
+        except Exception as e:
+            print(f"  ❌ Error monitoring {name}: {e}")
+    return results
+
+def run_panel_cycle(instruments: List[Dict]) -> List[Dict]:
+    """
+    Prefetched cycle with the panel indicator engine: load every instrument's
+    frames, compute the indicators for all of them at once, then run the
+    per-instrument analysis in CONFIG order.
+    """
+    batch = []
+    for instrument in instruments:
+        try:
+            data = load_instrument_frames(instrument, FRAME_CACHE.get)
+            if data:
+                batch.append((instrument, data))
+        except Exception as e:
+            print(f"  ❌ Error analyzing {instrument.get('name', 'Unknown')}: {e}")
+    
+    results = []
+    for (instrument, _), prepared in zip(batch, prepare_panel(batch)):
+        try:
+            res = analyze(instrument, prepared=prepared) if prepared else None
+            if res:
+                results.append(res)
+        except Exception as e:
+            print(f"  ❌ Error analyzing {instrument.get('name', 'Unknown')}: {e}")
+    return results
+
+def evaluate_instrument(instrument: Dict, prepared: Dict, prior_signal: Optional[Dict],
+                        clock: Optional[datetime] = None) -> tuple:
+    """
+    Pure core of analyze_instrument(): (prepared frames, the instrument's
+    active signal before this bar, evaluation time) -> (result, active signal
+    afterwards, recorded side effects). Shared state is left untouched and
+    the prior signal is copied, not mutated.
+    """
+    name = instrument['name']
+    signals = {name: copy.deepcopy(prior_signal)} if prior_signal else {}
+    log = EffectLog()
+    result = analyze_instrument(instrument, prepared=prepared, signals=signals,
+                                clock=clock or MARKET_DATA.now().to_pydatetime(), effects=recording_effects(log))
+    return result, signals.get(name), log.calls
+
+# Module functions analyze_instrument() calls through its effect sink
+EFFECT_FUNCTIONS = ("save_active_signals", "log_signal_event", "capture_trade_screenshot", "update_opening_range")
+
+def effect_targets() -> Dict:
+    """The real targets of recorded calls"""
+    targets = {"quote_monitor": QUOTE_MONITOR, "telegram_alerts": telegram_alerts}
+    targets.update((function, globals()[function]) for function in EFFECT_FUNCTIONS)
+    return targets
+
+def live_effects() -> EffectSink:
+    """Effects performed as they happen"""
+    return EffectSink(effect_targets())
+
+def recording_effects(log: EffectLog) -> EffectSink:
+    """Effects recorded into `log`, for apply_evaluation() to replay"""
+    return log.sink(effect_targets(), EFFECT_FUNCTIONS)
+
+# Set by apply_evaluation(), cleared by save_changed_signals()
+SIGNALS_CHANGED = False
+
+def apply_evaluation(name: str, signal: Optional[Dict], calls: List):
+    """
+    Commits one evaluation: the signal transition, then its side effects -
+    the slow ones to EFFECT_DISPATCHER in "background" mode, the rest in
+    order right here. Saving is left to save_changed_signals().
+    """
+    global SIGNALS_CHANGED
+    if signal != ACTIVE_SIGNALS.get(name):
+        if signal:
+            ACTIVE_SIGNALS[name] = signal
+        else:
+            ACTIVE_SIGNALS.pop(name, None)
+        SIGNALS_CHANGED = True
+    targets = effect_targets()
+    if CONFIG['engine']['effects'] == "background":
+        calls = EFFECT_DISPATCHER.submit(calls, targets.get)
+    replay(calls, targets.get, skip=["save_active_signals"])
+
+def save_changed_signals():
+    """One save for all transitions applied this cycle"""
+    global SIGNALS_CHANGED
+    if SIGNALS_CHANGED:
+        save_active_signals()
+        SIGNALS_CHANGED = False
+
+def analyze(instrument: Dict, frames: Optional[CycleFrameCache] = None,
+            prepared: Optional[Dict] = None) -> Optional[Dict]:
+    """analyze_instrument() as the cycle runs it: evaluated and applied in "background" effects mode"""
+    if CONFIG['engine']['effects'] != "background":
+        return analyze_instrument(instrument, frames, prepared)
+    if prepared is None:
+        prepared = load_prepared(instrument, frames)
+        if prepared is None:
+            return None
+    name = instrument['name']
+    result, signal, calls = evaluate_instrument(instrument, prepared, ACTIVE_SIGNALS.get(name))
+    apply_evaluation(name, signal, calls)
+    return result
+
+def job_frames(instrument: Dict, data: Dict) -> Dict:
+    """
+    `data` as shipped to a process-pool job: the 4H momentum frame resampled
+    with the parent's RESAMPLER and every frame cut to its warm-up window,
+    so only the bars the indicators read are pickled.
+    """
+    mom_df, mom_key = momentum_frame(instrument, data)
+    trend_df, mom_df, entry_df = indicator_inputs(data, mom_df)
+    job = {key: value for key, value in data.items() if key != 'mom_df_raw'}
+    job.update(trend_df=trend_df, mom_df=mom_df, mom_key=mom_key, entry_df=entry_df)
+    return job
+
+def init_process_worker(workers: int):
+    """Pool initializer: the memo budget is shared by all workers."""
+    INDICATOR_MEMO.max_bytes = CONFIG['indicators']['memo_max_mb'] * 2**20 // workers
+    INDICATOR_MEMO.clear()
+
+def analyze_isolated(instrument: Dict, data: Dict, active_signal: Optional[Dict]) -> tuple:
+    """
+    Process-pool job: prepare_instrument() and evaluate_instrument() on
+    frames the parent loaded from the prefetched cache, so a worker never
+    downloads or writes the cache files. Streaming state is dropped first:
+    which worker ran a symbol last must not matter. Returns (result, active
+    signal afterwards, recorded calls, printed output).
+    """
+    name = instrument['name']
+    if CONFIG['indicators']['engine'] == "streaming":
+        for indicators in (TREND_INDICATORS, MOMENTUM_INDICATORS, ENTRY_INDICATORS):
+            indicators.clear()
+    output = io.StringIO()
+    result, signal, calls = None, active_signal, []
+    with contextlib.redirect_stdout(output):
+        try:
+            result, signal, calls = evaluate_instrument(instrument, prepare_instrument(instrument, data), active_signal)
+        except Exception as e:
+            print(f"  ❌ Error analyzing {name}: {e}")
+    return result, signal, calls, output.getvalue()
+
+# Forked on the first "process" cycle and kept for the life of the process
+PROCESS_POOL = None
+
+def process_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """The process pipeline's worker pool, or None where fork() is unavailable"""
+    global PROCESS_POOL
+    if PROCESS_POOL is None:
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            return None
+        PROCESS_POOL = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                           initializer=init_process_worker, initargs=(workers,))
+    return PROCESS_POOL
+
+def run_process_cycle(instruments: List[Dict]) -> List[Dict]:
+    """
+    Prefetched cycle analyzed on the persistent process pool. Frames are
+    loaded here from the cycle cache (a frame missing from the prefetch is
+    an error, not a download) and shipped with each job, cut to their
+    warm-up windows by job_frames(). Results, signal
+    transitions and side effects are applied here in CONFIG order.
+    """
+    global PROCESS_POOL
+    workers = CONFIG['engine']['process_workers'] or os.cpu_count() or 1
+    if workers < 2:
+        # One worker only adds pickling to the sequential analysis
+        return [res for res in (analyze(inst, FRAME_CACHE) for inst in instruments) if res]
+    pool = process_pool(workers)
+    if pool is None:
+        print("  ⚠️ Process pipeline needs fork(), analyzing sequentially")
+        return [res for res in (analyze(inst, FRAME_CACHE) for inst in instruments) if res]
+    
+    jobs = []
+    for instrument in instruments:
+        output = io.StringIO()
+        job = None
+        with contextlib.redirect_stdout(output):
+            try:
+                data = load_instrument_frames(instrument, FRAME_CACHE.get_cached)
+                if data is not None:
+                    job = pool.submit(analyze_isolated, instrument, job_frames(instrument, data),
+                                      ACTIVE_SIGNALS.get(instrument['name']))
+            except Exception as e:
+                print(f"  ❌ Error analyzing {instrument.get('name', 'Unknown')}: {e}")
+        jobs.append((instrument, output.getvalue(), job))
+    
+    results = []
+    for instrument, loaded, job in jobs:
+        name = instrument['name']
+        print(loaded, end="")
+        if job is None:
+            continue
+        try:
+            result, signal, calls, output = job.result()
+        except BrokenProcessPool as e:
+            # A worker died: the next cycle forks a fresh pool
+            print(f"  ❌ Error analyzing {name}: {e}")
+            pool.shutdown(wait=False)
+            PROCESS_POOL = None
+            continue
+        except Exception as e:
+            print(f"  ❌ Error analyzing {name}: {e}")
+            continue
+        print(output, end="")
+        apply_evaluation(name, signal, calls)
+        if result:
+            results.append(result)
+    print(f"🧵 Process pipeline: {len(instruments)} instruments on {workers} workers")
+    return results
+
+def run_async_cycle(instruments: List[Dict]) -> tuple:
+    """
+    Fetch, compute and apply stages overlapped on an asyncio pipeline.
+    Side effects (signal state, alerts, history) stay in the apply stage,
+    which runs one instrument at a time in CONFIG order.
+    """
+    engine_cfg = CONFIG['engine']
+    
+    def report_error(instrument, error):
+        print(f"  ❌ Error analyzing {instrument.get('name', 'Unknown')}: {error}")
+    
+    engine = AsyncCycleEngine(
+        load=lambda instrument: load_instrument_frames(instrument, FRAME_CACHE.get),
+        prepare=prepare_instrument,
+        apply=lambda instrument, data: analyze(instrument, prepared=data) if data else None,
+        on_error=report_error,
+        max_in_flight=engine_cfg['max_in_flight'],
+        queue_size=engine_cfg['queue_size'],
+        io_workers=CONFIG['data']['fetch_workers'],
+        cpu_workers=engine_cfg['cpu_workers']
+    )
+    results = [res for res in engine.run(instruments) if res]
+    
+    timing = engine.report()
+    print(f"⏱️ Pipeline: {timing['wall_s']:.2f}s wall")
+    for stage in STAGES:
+        stats = timing[stage]
+        print(f"   {stage:<8} {stats['count']:>4} jobs | busy {stats['busy_s']:.2f}s | avg {stats['avg_s']:.3f}s | max {stats['max_s']:.2f}s")
+    return results, timing
 
 def main():
     print("=" * 60)
@@ -1503,15 +2441,62 @@ def main():
             start_time = time.time()
             print(f"\n🔄 Running analysis {datetime.now().strftime('%H:%M:%S')}...")
             
-            # Sequential analysis
-            results = []
-            for instrument in CONFIG['instruments']:
-                try:
-                    res = analyze_instrument(instrument)
-                    if res:
-                        results.append(res)
-                except Exception as e:
-                    print(f"  ❌ Error analyzing {instrument.get('name', 'Unknown')}: {e}")
+            # Closed markets reuse their last analysis; open ones get a full
+            # analysis only where a new entry bar has closed
+            now = MARKET_DATA.now()
+            instruments = CONFIG['instruments']
+            closed, quote_only = [], []
+            if CONFIG['sessions']['enabled']:
+                closed = [inst for inst in instruments if market_settled(inst, now)]
+                instruments = [inst for inst in instruments if inst not in closed]
+            if CONFIG['quotes']['fast_path']:
+                quote_only = [inst for inst in instruments if not QUOTE_MONITOR.due(inst['name'], now)]
+                instruments = [inst for inst in instruments if inst not in quote_only]
+            
+            # Frames are reused until their TTL expires, except for open trades and the FX rates
+            FRAME_CACHE.begin_cycle(refresh=active_signal_symbols() | fx_refresh_symbols(instruments))
+            FX_RATES.begin_cycle()
+            FETCH_BREAKER.begin_cycle()
+            
+            pipeline_timing = None
+            if CONFIG['engine']['pipeline'] == "async":
+                results, pipeline_timing = run_async_cycle(instruments)
+            else:
+                # Plan the unique frame set so shared symbols are downloaded only once
+                requests = []
+                for instrument in instruments:
+                    try:
+                        requests.extend(plan_frame_requests(instrument))
+                    except Exception as e:
+                        print(f"  ⚠️ Could not plan data for {instrument.get('name', 'Unknown')}: {e}")
+                plan = FRAME_CACHE.plan(requests)
+                print(f"🗃️ Fetch plan: {len(plan)} unique frames for {len(requests)} requests")
+                FRAME_CACHE.prefetch(plan)
+                
+                if CONFIG['engine']['pipeline'] == "process":
+                    results = run_process_cycle(instruments)
+                elif CONFIG['indicators']['engine'] == "panel":
+                    results = run_panel_cycle(instruments)
+                else:
+                    # Sequential analysis
+                    results = []
+                    for instrument in instruments:
+                        try:
+                            res = analyze(instrument, FRAME_CACHE)
+                            if res:
+                                results.append(res)
+                        except Exception as e:
+                            print(f"  ❌ Error analyzing {instrument.get('name', 'Unknown')}: {e}")
+            
+            if closed:
+                print(f"🌙 Markets closed: {len(closed)} instruments keep their last analysis")
+                results.extend(closed_market_results(closed, now))
+            if quote_only:
+                results.extend(run_quote_cycle(quote_only))
+            save_changed_signals()
+            if closed or quote_only:
+                order = {inst['name']: i for i, inst in enumerate(CONFIG['instruments'])}
+                results.sort(key=lambda res: order.get(res['instrument'], len(order)))
             
             # Enrich results with sentiment analysis
             for res in results:
@@ -1541,12 +2526,38 @@ def main():
                         signal_str += f" | Sentiment: {res['sentiment_confirmation']}"
                     print(signal_str)
             
+            cache_stats = FRAME_CACHE.stats()
+            print(f"🗃️ Frame cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+            
             # Save to JSON
             output = {
                 "last_updated": datetime.now().isoformat(),
                 "backend_heartbeat": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "frame_cache": cache_stats,
+                "circuit_breakers": FETCH_BREAKER.snapshot(),
+                "negative_cache": NEGATIVE_CACHE.snapshot(),
+                "resampler": RESAMPLER.stats(),
+                "indicator_memo": INDICATOR_MEMO.stats(),
                 "data": results
             }
+            if pipeline_timing:
+                output["pipeline_timing"] = pipeline_timing
+            if CONFIG['engine']['effects'] == "background":
+                output["effects"] = EFFECT_DISPATCHER.stats()
+            if CONFIG['warmup']['enabled']:
+                output["warmup"] = {"bars": WARMUP_BARS, "momentum_period": MOMENTUM_PERIOD}
+            if CONFIG['indicators']['engine'] == "panel":
+                output["indicator_panels"] = {
+                    "trend": TREND_PANEL.stats(),
+                    "momentum": MOMENTUM_PANEL.stats(),
+                    "entry": ENTRY_PANEL.stats()
+                }
+            if CONFIG['indicators']['engine'] == "streaming":
+                output["indicator_state"] = {
+                    "trend": TREND_INDICATORS.stats(),
+                    "momentum": MOMENTUM_INDICATORS.stats(),
+                    "entry": ENTRY_INDICATORS.stats()
+                }
             
             # Save to JSON in the same directory as the script
             script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1562,11 +2573,22 @@ def main():
             print(f"❌ Error: {e}")
             
         if os.environ.get("RUN_ONCE", "False").lower() == "true":
+            pending = EFFECT_DISPATCHER.drain(timeout=120)
+            if pending:
+                print(f"⚠️ {pending} alerts / history writes still pending at exit")
             print("✅ Single run complete. Exiting...")
             break
             
-        print("⏳ Waiting 60s (1 min)...")
-        time.sleep(60)
+        if not CONFIG['schedule']['event_driven']:
+            print(f"⏳ Waiting {CONFIG['schedule']['quote_poll_seconds']}s...")
+            time.sleep(CONFIG['schedule']['quote_poll_seconds'])
+            continue
+        
+        now = MARKET_DATA.now()
+        wake, reason = next_wake(now)
+        wait = (wake - now).total_seconds()
+        print(f"⏳ Next run at {wake.tz_convert(pytz.timezone('Asia/Kolkata')).strftime('%H:%M:%S IST')} ({reason}, {wait:.0f}s)")
+        time.sleep(wait)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Cycle-scoped OHLCV Frame Cache
+Fetches each (symbol, interval, period) once per analysis cycle and hands out
+views to every instrument that shares the same underlying symbol. With a TTL
+policy, downloads are also kept across cycles until they expire.
+"""
+
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from frame_ttl import FrameTTL
+from timeframes import TimeframeDeriver
+
+FrameKey = Tuple[str, str, str]
+BulkFetcher = Callable[[List[FrameKey]], Dict[FrameKey, pd.DataFrame]]
+
+
+class CycleFrameCache:
+    """Caches downloaded frames for the duration of a single analysis cycle"""
+
+    def __init__(self, fetcher: Callable[[str, str, str], pd.DataFrame],
+                 deriver: Optional[TimeframeDeriver] = None,
+                 bulk_fetcher: Optional[BulkFetcher] = None, max_workers: int = 1,
+                 ttl: Optional[FrameTTL] = None, clock: Optional[Callable[[], pd.Timestamp]] = None):
+        self.fetcher = fetcher
+        self.deriver = deriver
+        self.bulk_fetcher = bulk_fetcher
+        self.max_workers = max_workers
+        self.ttl = ttl
+        # The data provider's clock (UTC): download times, TTLs and derived windows use it
+        self.clock = clock or (lambda: pd.Timestamp.now(tz="UTC"))
+        self.frames: Dict[FrameKey, pd.DataFrame] = {}
+        # Download time and expiry of every downloaded (base) frame
+        self.fetched_at: Dict[FrameKey, pd.Timestamp] = {}
+        self.expires: Dict[FrameKey, pd.Timestamp] = {}
+        self.hits = 0
+        self.misses = 0
+        # Counters/lock table guard, plus one lock per key so concurrent
+        # consumers of a shared symbol wait for a single download
+        self.lock = threading.Lock()
+        self.key_locks = defaultdict(threading.Lock)
+
+    def begin_cycle(self, refresh: Iterable[str] = ()):
+        """
+        Start a cycle: reset the counters and drop every frame except downloads
+        whose TTL has not expired. Symbols in `refresh` are always re-downloaded.
+        Derived views are rebuilt each cycle from the kept downloads.
+        """
+        now = self.clock()
+        refresh = set(refresh)
+        keep = [key for key, expires in self.expires.items()
+                if key in self.frames and key[0] not in refresh and now < expires]
+        self.frames = {key: self.frames[key] for key in keep}
+        self.fetched_at = {key: self.fetched_at[key] for key in keep}
+        self.expires = {key: self.expires[key] for key in keep}
+        self.hits = 0
+        self.misses = 0
+        self.key_locks = defaultdict(threading.Lock)
+
+    def _key_lock(self, key: FrameKey) -> threading.Lock:
+        with self.lock:
+            return self.key_locks[key]
+
+    def base_key(self, key: FrameKey) -> FrameKey:
+        """The download that serves `key` (derived windows map to their base series)"""
+        return self.deriver.base_key(key) if self.deriver else key
+
+    def plan(self, requests: Iterable[FrameKey]) -> List[FrameKey]:
+        """Reduce the per-instrument requests to the unique download set (order kept)"""
+        return list(dict.fromkeys(self.base_key(key) for key in requests))
+
+    def prefetch(self, keys: Iterable[FrameKey]):
+        """
+        Fetch every planned key that is not already cached, in bulk when
+        configured, otherwise on a pool of `max_workers` threads. Frames are
+        stored in plan order, so the cache contents do not depend on timing.
+        """
+        missing = [key for key in self.plan(keys) if key not in self.frames]
+        if self.bulk_fetcher and missing:
+            loaded = self.bulk_fetcher(missing)
+            self.misses += len(loaded)
+            for key, df in loaded.items():
+                self._store(key, df)
+            missing = [key for key in missing if key not in self.frames]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            loaded = list(pool.map(lambda key: self.fetcher(*key), missing))
+        self.misses += len(missing)
+        for key, df in zip(missing, loaded):
+            self._store(key, df)
+
+    def _store(self, key: FrameKey, df: pd.DataFrame):
+        """Cache a download; it outlives the cycle only if the TTL policy allows"""
+        fetched_at = self.clock()
+        self.frames[key] = df
+        self.fetched_at[key] = fetched_at
+        # Stale fallbacks (open circuit breaker) are retried next cycle
+        expires = None
+        if self.ttl is not None and not df.attrs.get("stale", False):
+            expires = self.ttl.expiry(key, df, fetched_at)
+        if expires is not None:
+            self.expires[key] = expires
+        else:
+            self.expires.pop(key, None)
+
+    def _download(self, key: FrameKey) -> Tuple[pd.DataFrame, bool]:
+        with self._key_lock(key):
+            df = self.frames.get(key)
+            if df is not None:
+                return df, False
+            df = self.fetcher(*key)
+            self._store(key, df)
+            return df, True
+
+    def _build(self, key: FrameKey) -> Tuple[pd.DataFrame, bool]:
+        base = self.base_key(key)
+        if base == key:
+            return self._download(key)
+        with self._key_lock(key):
+            df = self.frames.get(key)
+            if df is not None:
+                return df, False
+            base_df, downloaded = self._download(base)
+            df = self.deriver.derive(base_df, key, self.clock())
+            self.frames[key] = df
+            return df, downloaded
+
+    def get(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
+        """
+        Return a view of the cached frame, downloading or deriving it on first use.
+        Views are shallow copies, so the indicator helpers can add columns or
+        replace the index without touching the shared cached frame.
+        Misses count downloads, hits count requests served without one.
+        Safe to call from several threads.
+        """
+        key = (symbol, interval, period)
+        df = self.frames.get(key)
+        downloaded = False
+        if df is None:
+            df, downloaded = self._build(key)
+        with self.lock:
+            if downloaded:
+                self.misses += 1
+            else:
+                self.hits += 1
+        view = df.copy(deep=False)
+        fetched_at = self.fetched_at.get(self.base_key(key))
+        if fetched_at is not None:
+            view.attrs["fetched_at"] = fetched_at
+        return view
+
+    def get_cached(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
+        """get() for consumers that must not download: a frame outside the prefetch raises KeyError"""
+        key = (symbol, interval, period)
+        if key not in self.frames and self.base_key(key) not in self.frames:
+            raise KeyError(f"{symbol} {interval}/{period} was not prefetched")
+        return self.get(symbol, interval, period)
+
+    def stats(self) -> Dict:
+        """Per-cycle hit/miss counters for logging and the output JSON"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "unique_frames": len(self.frames),
+            "reusable_frames": len(self.expires),
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Interval-aware Frame TTL
+Decides how long a downloaded frame stays valid across cycles: intraday frames
+until their forming bar closes, daily frames until the market's session close
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+import pytz
+
+from bulk_fetch import exchange_group
+
+INTRADAY_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60}
+
+# When the daily bar of each exchange group is final ("HH:MM Timezone")
+DEFAULT_DAILY_CLOSES = {
+    "IN": "15:30 Asia/Kolkata",
+    "FX": "00:00 Europe/London",
+    "FUT": "17:00 America/New_York",
+    "CRYPTO": "00:00 UTC",
+    "OTHER": "16:00 America/New_York",
+}
+
+
+def parse_close(spec: str) -> Tuple[int, int, pytz.BaseTzInfo]:
+    clock, tz_name = spec.split()
+    hour, minute = (int(part) for part in clock.split(":"))
+    return hour, minute, pytz.timezone(tz_name)
+
+
+def next_session_close(spec: str, after: pd.Timestamp) -> pd.Timestamp:
+    """First daily close strictly after `after`"""
+    hour, minute, tz = parse_close(spec)
+    day = after.tz_convert(tz).date()
+    for offset in (0, 1):
+        date = day + timedelta(days=offset)
+        close = pd.Timestamp(tz.localize(datetime(date.year, date.month, date.day, hour, minute)))
+        if close > after:
+            return close
+    return close
+
+
+def next_bar_close(df: pd.DataFrame, minutes: int, now: pd.Timestamp,
+                   session_open: Optional[bool] = None) -> pd.Timestamp:
+    """
+    UTC close of the frame's forming (last) bar. If that bar is already closed
+    and the market is open (or its session is unknown), the provider has not
+    published the new bar yet: it is due again at `now`, i.e. after the
+    caller's grace period, for up to one bar past the close. A shut market
+    is checked one bar from `now`.
+    """
+    bar = pd.Timedelta(minutes=minutes)
+    last_bar = df.index[-1]
+    last_bar = last_bar.tz_convert("UTC") if last_bar.tzinfo else last_bar.tz_localize("UTC")
+    boundary = last_bar + bar
+    now = now.tz_convert("UTC")
+    if boundary > now:
+        return boundary
+    if session_open is not False and now - boundary < bar:
+        return now
+    return now + bar
+
+
+class FrameTTL:
+    """
+    Expiry policy for cached frames.
+    - Intraday: valid until the forming (last) bar closes. If the last bar is
+      already closed, an open market is re-checked after the grace period
+      (the provider is late with the new bar) and a shut one a bar later.
+      `session_open(symbol, now)` tells the two apart (None = unknown).
+    - Daily and longer: valid until the next session close of the symbol's
+      exchange group, and never longer than `daily_max_age_minutes`.
+    A short grace period gives Yahoo time to publish the just-closed bar.
+    """
+
+    def __init__(self, daily_closes: Optional[Dict[str, str]] = None,
+                 daily_max_age_minutes: float = 360, grace_seconds: float = 60,
+                 group: Callable[[str], str] = exchange_group,
+                 session_open: Optional[Callable[[str, pd.Timestamp], Optional[bool]]] = None):
+        self.daily_closes = dict(DEFAULT_DAILY_CLOSES if daily_closes is None else daily_closes)
+        self.daily_max_age = pd.Timedelta(minutes=daily_max_age_minutes)
+        self.grace = pd.Timedelta(seconds=grace_seconds)
+        self.group = group
+        self.session_open = session_open
+
+    def expiry(self, key: Tuple[str, str, str], df: pd.DataFrame,
+               fetched_at: pd.Timestamp) -> Optional[pd.Timestamp]:
+        """UTC expiry for a frame downloaded at `fetched_at` (None = do not keep)"""
+        symbol, interval, _ = key
+        if df is None or df.empty:
+            return None
+        fetched_at = fetched_at.tz_convert("UTC")
+
+        minutes = INTRADAY_MINUTES.get(interval)
+        if minutes:
+            session_open = self.session_open(symbol, fetched_at) if self.session_open else None
+            return next_bar_close(df, minutes, fetched_at, session_open) + self.grace
+
+        spec = self.daily_closes.get(self.group(symbol))
+        cap = fetched_at + self.daily_max_age
+        if not spec:
+            return cap
+        return min(next_session_close(spec, fetched_at).tz_convert("UTC") + self.grace, cap)
+
+
+# Test function
+if __name__ == "__main__":
+    ttl = FrameTTL()
+    now = pd.Timestamp("2025-01-08 10:20", tz="Asia/Kolkata").tz_convert("UTC")
+    hourly = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.DatetimeIndex(
+        ["2025-01-08 09:15", "2025-01-08 10:15"]).tz_localize("Asia/Kolkata"))
+    print("RELIANCE.NS 1h expires:", ttl.expiry(("RELIANCE.NS", "1h", "1y"), hourly, now).tz_convert("Asia/Kolkata"))
+    late = now + pd.Timedelta(minutes=60)  # 11:20, the 11:15 bar not published yet
+    print("  11:20, bar late:     ", ttl.expiry(("RELIANCE.NS", "1h", "1y"), hourly, late).tz_convert("Asia/Kolkata"))
+    shut = FrameTTL(session_open=lambda symbol, at: False)
+    print("  11:20, market shut:  ", shut.expiry(("RELIANCE.NS", "1h", "1y"), hourly, late).tz_convert("Asia/Kolkata"))
+    daily = pd.DataFrame({"Close": [1.0]}, index=pd.DatetimeIndex(["2025-01-08"]).tz_localize("Asia/Kolkata"))
+    print("RELIANCE.NS 1d expires:", ttl.expiry(("RELIANCE.NS", "1d", "2y"), daily, now).tz_convert("Asia/Kolkata"))
+    print("EURUSD=X 1d expires:   ", ttl.expiry(("EURUSD=X", "1d", "2y"), daily, now).tz_convert("Europe/London"))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+FX Conversion Rates
+Resolves each currency pair once per cycle from the shared frame cache and
+serves every conversion (MCX USD -> INR) from memory, together with the
+timestamp of the bar the rate was taken from
+"""
+
+import threading
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+# Yahoo symbol for each (base, quote) pair
+FX_SYMBOLS = {
+    ("USD", "INR"): "USDINR=X",
+}
+
+
+class FXRate(NamedTuple):
+    pair: str
+    rate: float
+    as_of: pd.Timestamp
+    symbol: str
+
+    def to_dict(self) -> Dict:
+        return {"pair": self.pair, "rate": self.rate, "as_of": self.as_of.isoformat(), "symbol": self.symbol}
+
+
+class FXRates:
+    """Per-cycle rate table on top of a (symbol, interval, period) frame getter"""
+
+    def __init__(self, get_frame: Callable[[str, str, str], pd.DataFrame],
+                 interval: str = "1d", period: str = "5d",
+                 symbols: Optional[Dict[Tuple[str, str], str]] = None):
+        self.get_frame = get_frame
+        self.interval = interval
+        self.period = period
+        self.symbols = dict(FX_SYMBOLS if symbols is None else symbols)
+        self.rates: Dict[Tuple[str, str], Optional[FXRate]] = {}
+        self.lock = threading.Lock()
+
+    def begin_cycle(self):
+        with self.lock:
+            self.rates = {}
+
+    def requests(self):
+        """Frame requests to include in the cycle's fetch plan"""
+        return [(symbol, self.interval, self.period) for symbol in self.symbols.values()]
+
+    def get(self, base: str, quote: str) -> Optional[FXRate]:
+        """Latest rate for base/quote (None if unavailable), resolved once per cycle"""
+        pair = (base, quote)
+        with self.lock:
+            if pair in self.rates:
+                return self.rates[pair]
+            rate = None
+            symbol = self.symbols.get(pair)
+            if symbol:
+                df = self.get_frame(symbol, self.interval, self.period)
+                closes = df['Close'].dropna() if not df.empty else df
+                if len(closes):
+                    rate = FXRate(f"{base}{quote}", float(closes.iloc[-1]), closes.index[-1], symbol)
+            self.rates[pair] = rate
+            return rate
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Indicator Memo
+LRU memo of computed indicator frames, keyed by what the values depend on
+(symbol, interval, last closed bar, MACD parameters, indicator periods and
+the forming bar), so unchanged frames - daily bars intra-day, closed markets,
+symbols shared by several instruments - are not recomputed every cycle
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+def frame_signature(df: pd.DataFrame) -> Tuple:
+    """
+    (last closed bar, forming bar, window start, length). The closed bar
+    alone is not enough: the forming bar's prices move within the bar, and
+    EMA values depend on where the download window starts. Revisions of
+    older bars under an unchanged window are not detected.
+    """
+    if df.empty:
+        return (None, None, None, 0)
+    closed = df.index[-2] if len(df) > 1 else None
+    last = df.iloc[-1]
+    forming = (df.index[-1],) + tuple(float(last[col]) for col in ('High', 'Low', 'Close'))
+    return (closed, forming, df.index[0], len(df))
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+class IndicatorMemo:
+    """
+    Thread-safe LRU of indicator frames bounded by `max_bytes`. Cached frames
+    are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 2**20):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Hashable, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(symbol: str, interval: Hashable, df: pd.DataFrame, macd: Tuple, periods: Tuple) -> Tuple:
+        return (symbol, interval, macd, periods) + frame_signature(df)
+
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, df: pd.DataFrame):
+        size = frame_bytes(df)
+        with self.lock:
+            if size > self.max_bytes:
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (df, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Cached frame for `key`, computed (outside the lock) and stored on a miss"""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        df = compute()
+        self.put(key, df)
+        return df
+
+    def clear(self):
+        """Drop every entry (the counters are kept)"""
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "mb": round(self.bytes / 2**20, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
+
+
+# Test function
+if __name__ == "__main__":
+    import numpy as np
+
+    idx = pd.date_range("2025-01-01", periods=500, freq="1D", tz="UTC")
+    close = 2000 + np.cumsum(np.random.default_rng(5).normal(0, 5, len(idx)))
+    gold = pd.DataFrame({"Open": close, "High": close + 3, "Low": close - 3, "Close": close, "Volume": 0.0}, index=idx)
+    memo = IndicatorMemo(max_bytes=100_000)
+    computed = []
+
+    def compute(df):
+        computed.append(1)
+        out = df.copy()
+        out['EMA_200'] = out['Close'].ewm(span=200, adjust=False).mean()
+        return out
+
+    # Gold and MCX Gold Mini both read GC=F: one computation per frame version
+    for cycle in range(3):
+        for name in ["Gold", "MCX Gold Mini"]:
+            key = IndicatorMemo.key("GC=F", "1d", gold, (12, 26, 9), ("EMA", 200))
+            memo.get_or_compute(key, lambda: compute(gold))
+    print(f"Unchanged frame, 2 instruments x 3 cycles: {len(computed)} computation(s)")
+    gold.iloc[-1, gold.columns.get_loc("Close")] += 1.5
+    memo.get_or_compute(IndicatorMemo.key("GC=F", "1d", gold, (12, 26, 9), ("EMA", 200)), lambda: compute(gold))
+    print(f"After the forming bar moved: {len(computed)} computations")
+    for symbol in ["SI=F", "HG=F", "CL=F"]:
+        memo.get_or_compute(IndicatorMemo.key(symbol, "1d", gold, (12, 26, 9), ("EMA", 200)), lambda: compute(gold))
+    print("Stats (100 kB cap):", memo.stats())
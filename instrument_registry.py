@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Instrument Registry
+Everything the analysis derives from an instrument's name and category -
+symbol, market session, rule profile, SL / TP parameters, MCX unit
+conversion, re-entry eligibility - resolved once at startup into compact
+records looked up by integer id, instead of string matching every cycle
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from market_sessions import MarketSession, SessionCalendar
+from rule_engine import RELAXED
+
+# MCX contract units from the USD future's quote: price / divisor * multiplier * USDINR * premium
+MCX_UNITS = {
+    "MCX Gold": (31.1035, 10.0, 1.0),          # troy ounce -> 10 g
+    "MCX Gold Mini": (31.1035, 10.0, 1.0),
+    "MCX Silver": (1.0, 32.1507, 1.0),         # troy ounce -> 1 kg
+    "MCX Silver Mini": (1.0, 32.1507, 1.0),
+    "MCX Copper": (1.0, 2.20462, 1.026),       # lb -> 1 kg, ~2.6% MCX premium
+    "MCX Lead": (1.0, 2.20462, 1.0),
+    "MCX Zinc": (1.0, 2.20462, 1.0),
+}
+MCX_DIRECT = (1.0, 1.0, 1.0)                   # Crude oil, natural gas: same unit
+
+REENTRY_CATEGORIES = ("Forex",)
+# New signals only inside these Indian market hours (IST)
+NSE_HOURS_NAMES = ("Nifty 50", "Bank Nifty", "Sensex")
+NSE_HOURS_CATEGORIES = ("Indian Stocks",)
+
+
+class InstrumentSpec(NamedTuple):
+    id: int
+    name: str
+    category: str
+    symbol: Optional[str]                # None for NSE Live: the front-month contract rolls
+    base_symbol: Optional[str]
+    pip_size: float
+    entry_interval: str
+    market: Optional[str]                # SessionCalendar market (None = always open)
+    session: Optional[MarketSession]
+    signal_hours: Optional[str]          # "MCX" / "NSE" trading hours gate new signals
+    relaxed: bool                        # BTC / ETH rule profile
+    spike_filter: bool                   # Ignore > 5% single-candle moves
+    sl_multiplier: float                 # x ATR
+    tp_ratios: Tuple[float, ...]         # x SL distance
+    unit_conversion: Optional[Tuple[float, float, float]]  # MCX (divisor, multiplier, premium)
+    reentry: bool
+    nse_filters: bool                    # NSE Live volume / ORB / pre-market filters on new signals
+
+    def convert(self, price: float, rate: float) -> float:
+        """USD quote -> INR per contract unit, in the original operation order"""
+        divisor, multiplier, premium = self.unit_conversion
+        return price / divisor * multiplier * rate * premium
+
+
+def risk_profile(category: str, risk: Dict, nse_sl_multiplier: float) -> Tuple[float, Tuple[float, ...]]:
+    """
+    (SL ATR multiplier, TP ratios) per category. NSE Live: wider SL for
+    3-4 day swings; stock scalping: tighter SL and 1:1 / 1:2 / 1:3 targets;
+    crypto: wider SL for the volatility
+    """
+    tp_ratios = tuple(risk['tp_ratios'])
+    if category == "NSE Live":
+        return nse_sl_multiplier, tp_ratios
+    if category == "Stock Scalping":
+        return 1.0, (1.0, 2.0, 3.0)
+    if category in ("Crypto Scalping", "Crypto"):
+        return 2.5, tp_ratios
+    return risk['sl_atr_multiplier'], tp_ratios
+
+
+class InstrumentRegistry:
+    """
+    InstrumentSpec per configured instrument, numbered in configuration
+    order. of() finds the record through the instrument's name (dicts of
+    unknown instruments are compiled on the fly); the instrument dicts
+    themselves are left untouched.
+    """
+
+    def __init__(self, instruments: Sequence[Dict], risk: Dict, nse_sl_multiplier: float,
+                 sessions: Optional[SessionCalendar] = None):
+        self.risk = risk
+        self.nse_sl_multiplier = nse_sl_multiplier
+        self.sessions = sessions or SessionCalendar()
+        self.specs: List[InstrumentSpec] = []
+        self.ids: Dict[str, int] = {}
+        for id, instrument in enumerate(instruments):
+            self.ids[instrument['name']] = id
+            self.specs.append(self.compile(instrument, id))
+
+    def compile(self, instrument: Dict, id: int = -1) -> InstrumentSpec:
+        name = instrument['name']
+        category = instrument.get('category', 'Forex')
+        nse_live = category == "NSE Live"
+        if name.startswith("MCX"):
+            signal_hours = "MCX"
+        elif name in NSE_HOURS_NAMES or category in NSE_HOURS_CATEGORIES:
+            signal_hours = "NSE"
+        else:
+            signal_hours = None
+        sl_multiplier, tp_ratios = risk_profile(category, self.risk, self.nse_sl_multiplier)
+        return InstrumentSpec(
+            id=id,
+            name=name,
+            category=category,
+            symbol=None if nse_live else instrument['symbol'],
+            base_symbol=instrument.get('base_symbol'),
+            pip_size=instrument['pip_size'],
+            entry_interval="15m" if category == "Stock Scalping" else "1h",
+            market=self.sessions.market(instrument),
+            session=self.sessions.session(instrument),
+            signal_hours=signal_hours,
+            relaxed=name in RELAXED,
+            spike_filter=category != "Crypto Scalping",
+            sl_multiplier=sl_multiplier,
+            tp_ratios=tp_ratios,
+            unit_conversion=MCX_UNITS.get(name, MCX_DIRECT) if name.startswith("MCX") else None,
+            reentry=category in REENTRY_CATEGORIES,
+            nse_filters=nse_live
+        )
+
+    def of(self, instrument: Dict) -> InstrumentSpec:
+        i = self.ids.get(instrument['name'])
+        return self.specs[i] if i is not None else self.compile(instrument)
+
+    def __getitem__(self, i: int) -> InstrumentSpec:
+        return self.specs[i]
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def __iter__(self) -> Iterator[InstrumentSpec]:
+        return iter(self.specs)
+
+    def id_of(self, name: str) -> Optional[int]:
+        return self.ids.get(name)
+
+
+# Test function
+if __name__ == "__main__":
+    import time
+
+    instruments = [
+        {"name": "EUR/USD", "symbol": "EURUSD=X", "pip_size": 0.0001, "category": "Forex"},
+        {"name": "MCX Gold Mini", "symbol": "GC=F", "pip_size": 0.1, "category": "Indian Indices & Commodities"},
+        {"name": "MCX Copper", "symbol": "HG=F", "pip_size": 0.05, "category": "Indian Indices & Commodities"},
+        {"name": "Nifty Futures", "symbol": "", "base_symbol": "NIFTY", "pip_size": 0.05, "category": "NSE Live"},
+        {"name": "Bitcoin", "symbol": "BTC-USD", "pip_size": 1.0, "category": "Crypto Scalping"},
+        {"name": "Tata Motors", "symbol": "TATAMOTORS.NS", "pip_size": 0.05, "category": "Stock Scalping"},
+    ]
+    registry = InstrumentRegistry(
+        instruments, {"sl_atr_multiplier": 1.5, "tp_ratios": [1.5, 3.0, 5.0]}, 2.5,
+        SessionCalendar(categories={"Forex": "FX", "NSE Live": "NSE", "Crypto Scalping": "CRYPTO"},
+                        name_prefixes={"MCX": "MCX"})
+    )
+    for spec in registry:
+        print(f"  #{spec.id} {spec.name:<14} {spec.entry_interval:>3} market={spec.market} hours={spec.signal_hours} "
+              f"relaxed={spec.relaxed} SL {spec.sl_multiplier}x TP {spec.tp_ratios} "
+              f"units={spec.unit_conversion} reentry={spec.reentry}")
+    gold = registry.of(instruments[1])
+    print(f"  MCX Gold Mini at $2650.00, USDINR 84.10: ₹{gold.convert(2650.0, 84.10):,.2f} "
+          f"(formula ₹{(2650.0 / 31.1035) * 10 * 84.10:,.2f})")
+
+    cycles = 20000
+    print(f"⏱️ {cycles} lookups of the per-instrument parameters")
+    started = time.perf_counter()
+    for _ in range(cycles):
+        for instrument in instruments:
+            name, category = instrument['name'], instrument.get('category', 'Forex')
+            (name.startswith("MCX"), name in ["Bitcoin", "Ethereum"], category in ['Forex'],
+             category != "Crypto Scalping", risk_profile(category, registry.risk, 2.5))
+    strings_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(cycles):
+        for instrument in instruments:
+            spec = registry.of(instrument)
+            (spec.unit_conversion, spec.relaxed, spec.reentry, spec.spike_filter, spec.sl_multiplier, spec.tp_ratios)
+    registry_s = time.perf_counter() - started
+    print(f"  string tests {strings_s * 1e9 / cycles / len(instruments):5.0f} ns | "
+          f"registry {registry_s * 1e9 / cycles / len(instruments):5.0f} ns per instrument")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Market Data Providers
+One interface for OHLCV history so the strategy, pre-market analysis and diag
+scripts can run against Yahoo Finance, a recorded on-disk replay (offline,
+deterministic, with simulated latency) or a recorder that captures a live run
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from timeframes import at_index_tz, slice_period
+
+try:
+    import pyarrow  # noqa: F401  (parquet engine)
+    REPLAY_FORMAT = "parquet"
+except ImportError:
+    REPLAY_FORMAT = "csv"
+
+MANIFEST_FILE = "manifest.json"
+# Finest first: a replayed quote is the last close of the finest recorded series
+QUOTE_INTERVALS = ["1m", "2m", "5m", "15m", "30m", "1h", "1d"]
+
+
+class MarketDataProvider(ABC):
+    """Base interface: single-symbol history plus a grouped multi-symbol download"""
+
+    name = "base"
+    # Upstream host for rate limiting (None = no limit needed)
+    host: Optional[str] = None
+
+    @abstractmethod
+    def history(self, symbol: str, interval: str = "1d", period: str = "1mo") -> pd.DataFrame:
+        """OHLCV bars of the last `period` at `interval`"""
+
+    def now(self) -> pd.Timestamp:
+        """Current time as seen by the data (UTC): the wall clock for live providers"""
+        return pd.Timestamp.now(tz="UTC")
+
+    def download(self, symbols: List[str], interval: str, period: str) -> pd.DataFrame:
+        """group_by='ticker' style frame; the default builds it from history() calls"""
+        frames = {symbol: self.history(symbol, interval, period) for symbol in symbols}
+        frames = {symbol: df for symbol, df in frames.items() if not df.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames.values(), axis=1, keys=frames.keys(), names=['Ticker', 'Price'])
+
+    def quotes(self, symbols: List[str]) -> Dict[str, Tuple[float, pd.Timestamp]]:
+        """Last price and its bar time per symbol, from one grouped 1-minute request"""
+        prices = {}
+        data = self.download(symbols, "1m", "1d")
+        if data is None or data.empty:
+            return prices
+        available = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol in available:
+                closes = data[symbol]['Close'].dropna()
+                if len(closes):
+                    prices[symbol] = (float(closes.iloc[-1]), closes.index[-1])
+        return prices
+
+    def describe(self) -> str:
+        return self.name
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance data"""
+
+    name = "yfinance"
+    host = "query2.finance.yahoo.com"
+
+    def history(self, symbol: str, interval: str = "1d", period: str = "1mo") -> pd.DataFrame:
+        import yfinance as yf
+        return yf.Ticker(symbol).history(period=period, interval=interval)
+
+    def download(self, symbols: List[str], interval: str, period: str) -> pd.DataFrame:
+        """One grouped Yahoo request, matching Ticker.history() adjustment and timezone"""
+        import yfinance as yf
+        return yf.download(
+            symbols, period=period, interval=interval, group_by='ticker',
+            auto_adjust=True, ignore_tz=False, threads=True, progress=False
+        )
+
+
+class ReplayStore:
+    """Directory of recorded bars: one file per (symbol, interval) plus a manifest"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.lock = threading.Lock()
+        manifest_path = self.root / MANIFEST_FILE
+        self.manifest: Dict[str, Dict] = {}
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+
+    @staticmethod
+    def key(symbol: str, interval: str) -> str:
+        return f"{symbol}|{interval}"
+
+    def path(self, symbol: str, interval: str, fmt: str = REPLAY_FORMAT) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9]", "_", symbol)
+        return self.root / f"{safe}_{interval}.{fmt}"
+
+    def load(self, symbol: str, interval: str) -> pd.DataFrame:
+        entry = self.manifest.get(self.key(symbol, interval))
+        if not entry:
+            return pd.DataFrame()
+        path = self.root / entry["file"]
+        if path.suffix == ".parquet":
+            return pd.read_parquet(path)
+        df = pd.read_csv(path, index_col=0, float_precision="round_trip")
+        # CSV loses the exchange timezone, which the 4H resample buckets depend on
+        df.index = pd.to_datetime(df.index, utc=True).tz_convert(entry["tz"]) if entry.get("tz") else pd.to_datetime(df.index)
+        df.index.name = entry.get("index_name")
+        return df
+
+    def save(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Merge `df` into the recorded series (newer bars win)"""
+        if df.empty:
+            return
+        with self.lock:
+            stored = self.load(symbol, interval)
+            if not stored.empty:
+                df = pd.concat([stored, df])
+                df = df[~df.index.duplicated(keep='last')].sort_index()
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.path(symbol, interval)
+            if REPLAY_FORMAT == "parquet":
+                df.to_parquet(path)
+            else:
+                # 17 significant digits round-trip float64 exactly
+                df.to_csv(path, float_format="%.17g")
+            self.manifest[self.key(symbol, interval)] = {
+                "symbol": symbol,
+                "interval": interval,
+                "file": path.name,
+                "tz": str(df.index.tz) if getattr(df.index, "tz", None) else None,
+                "index_name": df.index.name,
+                "rows": len(df),
+                "recorded_at": datetime.now().astimezone().isoformat()
+            }
+            tmp = self.root / (MANIFEST_FILE + ".tmp")
+            with open(tmp, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+            tmp.replace(self.root / MANIFEST_FILE)
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded bars from a ReplayStore directory. Every request is sliced
+    relative to the time its file was recorded, so a replayed cycle sees the
+    same windows as the live cycle did. `latency_ms` (+/- `jitter` fraction)
+    is slept per request to mimic the network; the jitter is seeded so runs
+    are repeatable.
+    """
+
+    name = "replay"
+
+    def __init__(self, root: Path, latency_ms: float = 0, jitter: float = 0.0, seed: int = 0):
+        self.store = ReplayStore(root)
+        if not self.store.manifest:
+            raise ValueError(f"No recorded bars in {root} (missing {MANIFEST_FILE})")
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.frames: Dict[str, pd.DataFrame] = {}
+        # The replayed run happens when the recording ended
+        self.recorded_at = max(pd.Timestamp(entry["recorded_at"]).tz_convert("UTC")
+                               for entry in self.store.manifest.values())
+
+    def now(self) -> pd.Timestamp:
+        return self.recorded_at
+
+    def _sleep(self):
+        if self.latency_ms <= 0:
+            return
+        with self.rng_lock:
+            factor = 1 + self.rng.uniform(-self.jitter, self.jitter)
+        time.sleep(self.latency_ms * factor / 1000)
+
+    def _series(self, symbol: str, interval: str) -> pd.DataFrame:
+        key = ReplayStore.key(symbol, interval)
+        if key not in self.frames:
+            self.frames[key] = self.store.load(symbol, interval)
+        return self.frames[key]
+
+    def _window(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
+        df = self._series(symbol, interval)
+        if df.empty or period == "max":
+            return df.copy()
+        recorded_at = pd.Timestamp(self.store.manifest[ReplayStore.key(symbol, interval)]["recorded_at"])
+        return slice_period(df, period, now=at_index_tz(recorded_at, df.index)).copy()
+
+    def history(self, symbol: str, interval: str = "1d", period: str = "1mo") -> pd.DataFrame:
+        self._sleep()
+        return self._window(symbol, interval, period)
+
+    def download(self, symbols: List[str], interval: str, period: str) -> pd.DataFrame:
+        # One grouped request costs one round trip
+        self._sleep()
+        frames = {symbol: self._window(symbol, interval, period) for symbol in symbols}
+        frames = {symbol: df for symbol, df in frames.items() if not df.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames.values(), axis=1, keys=frames.keys(), names=['Ticker', 'Price'])
+
+    def quotes(self, symbols: List[str]) -> Dict[str, Tuple[float, pd.Timestamp]]:
+        """Last recorded close per symbol from its finest recorded interval"""
+        self._sleep()
+        prices = {}
+        for symbol in symbols:
+            for interval in QUOTE_INTERVALS:
+                if ReplayStore.key(symbol, interval) not in self.store.manifest:
+                    continue
+                closes = self._window(symbol, interval, "5d")['Close'].dropna()
+                if len(closes):
+                    prices[symbol] = (float(closes.iloc[-1]), closes.index[-1])
+                    break
+        return prices
+
+    def describe(self) -> str:
+        return f"replay ({self.store.root}, {len(self.store.manifest)} series, {self.latency_ms:.0f}ms latency)"
+
+
+class RecordingProvider(MarketDataProvider):
+    """Passes requests through to `source` and records every response for replay"""
+
+    name = "record"
+
+    def __init__(self, source: MarketDataProvider, root: Path):
+        self.source = source
+        self.host = source.host
+        self.store = ReplayStore(root)
+
+    def now(self) -> pd.Timestamp:
+        return self.source.now()
+
+    def history(self, symbol: str, interval: str = "1d", period: str = "1mo") -> pd.DataFrame:
+        df = self.source.history(symbol, interval, period)
+        self.store.save(symbol, interval, df)
+        return df
+
+    def download(self, symbols: List[str], interval: str, period: str) -> pd.DataFrame:
+        data = self.source.download(symbols, interval, period)
+        if data is not None and not data.empty:
+            available = set(data.columns.get_level_values(0))
+            for symbol in symbols:
+                if symbol in available:
+                    self.store.save(symbol, interval, data[symbol].dropna(how='all'))
+        return data
+
+    def describe(self) -> str:
+        return f"{self.source.describe()} (recording to {self.store.root})"
+
+
+def get_provider() -> MarketDataProvider:
+    """
+    Provider selected by environment:
+      MARKET_DATA_PROVIDER = yfinance (default) | replay | record
+      REPLAY_DIR           = recorded bars directory (replay/record)
+      REPLAY_LATENCY_MS    = simulated per-request latency (replay)
+      REPLAY_JITTER        = latency jitter fraction, e.g. 0.3 (replay)
+    """
+    name = os.environ.get("MARKET_DATA_PROVIDER", "yfinance").lower()
+    if name == "yfinance":
+        return YFinanceProvider()
+    replay_dir = os.environ.get("REPLAY_DIR")
+    if not replay_dir:
+        raise ValueError(f"REPLAY_DIR must be set for MARKET_DATA_PROVIDER={name}")
+    if name == "replay":
+        return ReplayProvider(
+            replay_dir,
+            latency_ms=float(os.environ.get("REPLAY_LATENCY_MS", 0)),
+            jitter=float(os.environ.get("REPLAY_JITTER", 0))
+        )
+    if name == "record":
+        return RecordingProvider(YFinanceProvider(), replay_dir)
+    raise ValueError(f"Unknown MARKET_DATA_PROVIDER: {name}")
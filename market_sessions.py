@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Market Session Calendar
+Trading hours per market (NSE, MCX, forex, US cash, crypto) and the mapping
+from instruments to markets, so cycles can leave closed markets out of the
+fetch plan and reuse their last analysis
+"""
+
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pytz
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Local "HH:MM" hours on `days`. "weekly" sessions open once on the first day
+# and close on the last one (forex: Sunday 17:00 to Friday 17:00 New York).
+# A market without "open" trades around the clock.
+DEFAULT_MARKETS = {
+    "NSE": {"tz": "Asia/Kolkata", "open": "09:15", "close": "15:30", "days": "Mon-Fri"},
+    "MCX": {"tz": "Asia/Kolkata", "open": "09:00", "close": "23:55", "days": "Mon-Fri"},
+    "FX": {"tz": "America/New_York", "open": "17:00", "close": "17:00", "days": "Sun-Fri", "weekly": True},
+    "US": {"tz": "America/New_York", "open": "09:30", "close": "16:00", "days": "Mon-Fri"},
+    "CRYPTO": {},
+}
+
+
+def parse_days(spec: str) -> List[int]:
+    """'Mon-Fri' -> [0..4]; 'Sun-Fri' wraps to [6, 0..4]"""
+    first, last = (DAYS.index(day) for day in spec.split("-"))
+    return [(first + i) % 7 for i in range((last - first) % 7 + 1)]
+
+
+def parse_clock(spec: str) -> dt_time:
+    hour, minute = (int(part) for part in spec.split(":"))
+    return dt_time(hour, minute)
+
+
+class MarketSession:
+    """Open/close windows of one market; `is_holiday(local date)` removes a trading day"""
+
+    def __init__(self, tz: str = "UTC", open: Optional[str] = None, close: Optional[str] = None,
+                 days: str = "Mon-Sun", weekly: bool = False,
+                 is_holiday: Optional[Callable[[date], bool]] = None):
+        self.tz = pytz.timezone(tz)
+        self.is_holiday = is_holiday
+        self.always_open = open is None
+        self.open = parse_clock(open) if open else None
+        self.close = parse_clock(close) if close else None
+        self.days = parse_days(days)
+        self.weekly = weekly
+
+    def week_shape(self) -> Tuple[float, int]:
+        """(trading minutes per day, trading days per week)"""
+        if self.always_open:
+            return 1440, 7
+        if self.weekly:
+            return 1440, len(self.days) - 1
+        minutes = (self.close.hour - self.open.hour) * 60 + self.close.minute - self.open.minute
+        return minutes if minutes > 0 else minutes + 1440, len(self.days)
+
+    def _at(self, day, clock: dt_time) -> pd.Timestamp:
+        return pd.Timestamp(self.tz.localize(datetime.combine(day, clock))).tz_convert("UTC")
+
+    def windows(self, now: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """(open, close) windows from about a week before to a week after `now`"""
+        today = now.tz_convert(self.tz).date()
+        windows = []
+        for offset in range(-8, 9):
+            day = today + timedelta(days=offset)
+            if self.weekly:
+                if day.weekday() == self.days[0]:
+                    last_day = day + timedelta(days=len(self.days) - 1)
+                    windows.append((self._at(day, self.open), self._at(last_day, self.close)))
+            elif day.weekday() in self.days and not (self.is_holiday and self.is_holiday(day)):
+                windows.append((self._at(day, self.open), self._at(day, self.close)))
+        return windows
+
+    def is_open(self, now: pd.Timestamp) -> bool:
+        if self.always_open:
+            return True
+        return any(start <= now < end for start, end in self.windows(now))
+
+    def last_close(self, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+        """Most recent close at or before `now` (None for 24/7 markets)"""
+        if self.always_open:
+            return None
+        closes = [end for _, end in self.windows(now) if end <= now]
+        return max(closes) if closes else None
+
+    def next_open(self, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+        if self.always_open:
+            return None
+        opens = [start for start, _ in self.windows(now) if start > now]
+        return min(opens) if opens else None
+
+
+class SessionCalendar:
+    """Instrument -> market session, by name prefix first, then by category"""
+
+    def __init__(self, markets: Optional[Dict[str, Dict]] = None,
+                 categories: Optional[Dict[str, str]] = None,
+                 name_prefixes: Optional[Dict[str, str]] = None,
+                 holidays: Optional[Dict[str, Callable[[date], bool]]] = None):
+        markets = DEFAULT_MARKETS if markets is None else markets
+        holidays = holidays or {}
+        self.sessions = {name: MarketSession(**spec, is_holiday=holidays.get(name))
+                         for name, spec in markets.items()}
+        self.categories = dict(categories or {})
+        self.name_prefixes = dict(name_prefixes or {})
+
+    def market(self, instrument: Dict) -> Optional[str]:
+        """Market name for the instrument (None = unknown, treated as always open)"""
+        for prefix, market in self.name_prefixes.items():
+            if instrument['name'].startswith(prefix):
+                return market
+        return self.categories.get(instrument.get('category'))
+
+    def session(self, instrument: Dict) -> Optional[MarketSession]:
+        return self.sessions.get(self.market(instrument))
+
+    def is_open(self, instrument: Dict, now: pd.Timestamp) -> bool:
+        session = self.session(instrument)
+        return session is None or session.is_open(now)
+
+    def last_close(self, instrument: Dict, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+        session = self.session(instrument)
+        return session.last_close(now) if session else None
+
+    def next_open(self, instrument: Dict, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+        session = self.session(instrument)
+        return session.next_open(now) if session else None
+
+
+# Test function
+if __name__ == "__main__":
+    calendar = SessionCalendar(
+        categories={"Indian Stocks": "NSE", "Forex": "FX", "Crypto Scalping": "CRYPTO"},
+        name_prefixes={"MCX": "MCX"},
+        holidays={"NSE": lambda day: (day.month, day.day) == (8, 15)}  # Independence Day
+    )
+    instruments = [
+        {"name": "Reliance", "category": "Indian Stocks"},
+        {"name": "MCX Gold Mini", "category": "Indian Indices & Commodities"},
+        {"name": "EUR/USD", "category": "Forex"},
+        {"name": "Bitcoin", "category": "Crypto Scalping"},
+    ]
+    for label, now in [("Wed 11:00 IST", "2025-01-08 11:00"), ("Wed 23:58 IST", "2025-01-08 23:58"),
+                       ("Sat 12:00 IST", "2025-01-11 12:00"), ("Fri 15 Aug 11:00 IST", "2025-08-15 11:00")]:
+        now = pd.Timestamp(now, tz="Asia/Kolkata").tz_convert("UTC")
+        states = ", ".join(f"{inst['name']}={'open' if calendar.is_open(inst, now) else 'closed'}"
+                           for inst in instruments)
+        print(f"{label}: {states}")
+    now = pd.Timestamp("2025-01-11 12:00", tz="UTC")
+    print("Forex reopens:", calendar.next_open(instruments[2], now).tz_convert("America/New_York"))
+    print("NSE last close:", calendar.last_close(instruments[0], now).tz_convert("Asia/Kolkata"))
+    holiday = pd.Timestamp("2025-08-15 11:00", tz="Asia/Kolkata").tz_convert("UTC")
+    print("NSE after the 15 Aug holiday:", calendar.last_close(instruments[0], holiday).tz_convert("Asia/Kolkata"),
+          "->", calendar.next_open(instruments[0], holiday).tz_convert("Asia/Kolkata"))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Negative Result Cache
+Remembers (symbol, interval) pairs that returned no usable data (delisted or
+renamed tickers) so they are not re-downloaded every cycle. Each repeated
+empty probe pushes the next re-check further out.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+# Re-check after 5 min, 15 min, 1 h, 6 h, then once a day
+DEFAULT_TTLS = [300, 900, 3600, 6 * 3600, 24 * 3600]
+
+
+def is_valid_frame(df: pd.DataFrame) -> bool:
+    """A usable OHLCV response: non-empty with at least one Close value"""
+    return df is not None and not df.empty and 'Close' in df.columns and bool(df['Close'].notna().any())
+
+
+class NegativeCache:
+    """(symbol, interval) -> strikes / expiry, with an escalating TTL per strike"""
+
+    def __init__(self, ttls: Optional[List[float]] = None, state_file: Optional[Path] = None):
+        self.ttls = ttls or DEFAULT_TTLS
+        self.state_file = Path(state_file) if state_file else None
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    @staticmethod
+    def key(symbol: str, interval: str) -> str:
+        return f"{symbol}|{interval}"
+
+    def load(self):
+        if not self.state_file or not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Failed to load negative cache: {e}")
+
+    def save(self):
+        if not self.state_file:
+            return
+        tmp = self.state_file.with_suffix(self.state_file.suffix + ".tmp")
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            tmp.replace(self.state_file)
+        except Exception as e:
+            print(f"⚠️ Failed to save negative cache: {e}")
+
+    def is_live(self, symbol: str, interval: str) -> bool:
+        """True while the pair should not be requested; False once its probe is due"""
+        with self.lock:
+            entry = self.entries.get(self.key(symbol, interval))
+        return bool(entry) and datetime.now() < datetime.fromisoformat(entry["expires"])
+
+    def blocked(self, symbol: str, intervals: Iterable[str]) -> Optional[Tuple[str, float]]:
+        """First live (interval, seconds until probe) among `intervals`, or None"""
+        now = datetime.now()
+        with self.lock:
+            for interval in intervals:
+                entry = self.entries.get(self.key(symbol, interval))
+                if entry:
+                    remaining = (datetime.fromisoformat(entry["expires"]) - now).total_seconds()
+                    if remaining > 0:
+                        return interval, remaining
+        return None
+
+    def record(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Add a strike for an empty/invalid response, clear the entry for a valid one"""
+        key = self.key(symbol, interval)
+        with self.lock:
+            if is_valid_frame(df):
+                if self.entries.pop(key, None):
+                    print(f"  ✅ {symbol} ({interval}) is returning data again")
+                    self.save()
+                return
+            entry = self.entries.setdefault(key, {"strikes": 0})
+            entry["strikes"] += 1
+            ttl = self.ttls[min(entry["strikes"], len(self.ttls)) - 1]
+            entry["last_empty"] = datetime.now().isoformat()
+            entry["expires"] = (datetime.now() + timedelta(seconds=ttl)).isoformat()
+            print(f"  🚫 No data for {symbol} ({interval}), strike {entry['strikes']}; "
+                  f"next check in {ttl / 60:.0f} min")
+            self.save()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {key: dict(entry) for key, entry in self.entries.items()}
+
+
+# Test function
+if __name__ == "__main__":
+    cache = NegativeCache(ttls=[0, 60])
+    cache.record("TATAMOTORS.NS", "1d", pd.DataFrame())
+    print("Live after strike 1 (ttl 0s):", cache.is_live("TATAMOTORS.NS", "1d"))
+    cache.record("TATAMOTORS.NS", "1d", pd.DataFrame())
+    print("Live after strike 2 (ttl 60s):", cache.is_live("TATAMOTORS.NS", "1d"))
+    print("Blocked:", cache.blocked("TATAMOTORS.NS", ["1h", "1d"]))
+    cache.record("TATAMOTORS.NS", "1d", pd.DataFrame({"Close": [1.0]}))
+    print("Entries after a good probe:", cache.snapshot())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+NSE Futures Contract Calendar
+Monthly expiries and rollover dates precomputed for the next 24 months from
+a holiday list (an expiry falling on a holiday moves to the previous trading
+day), with the current contract served from a cache keyed by the IST day
+number: it is looked up again once after midnight IST, and listeners are
+told when the front month rolls over
+"""
+
+import calendar
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import pytz
+
+IST = pytz.timezone("Asia/Kolkata")
+IST_OFFSET_S = 5.5 * 3600          # No daylight saving: the IST date is a fixed offset from UTC
+
+# NSE trading holidays that fall on the same date every year. Festival
+# holidays move with the lunar calendar and come from CONFIG (NSE's annual
+# holiday circular)
+FIXED_HOLIDAYS = (
+    (1, 26),   # Republic Day
+    (4, 14),   # Dr. Ambedkar Jayanti
+    (5, 1),    # Maharashtra Day
+    (8, 15),   # Independence Day
+    (10, 2),   # Gandhi Jayanti
+    (12, 25),  # Christmas
+)
+
+# (first contract month, expiry weekday with Monday = 0). NSE moved the
+# monthly F&O expiry from Thursday to Tuesday with the September 2025 series
+EXPIRY_WEEKDAYS = (
+    ("2000-01-01", 3),
+    ("2025-09-01", 1),
+)
+
+
+class NSEContract(NamedTuple):
+    month: str           # "JAN"
+    year: str            # "25"
+    expiry: datetime     # Midnight of the expiry day (naive, IST)
+    rollover: date       # First day the next month's contract is traded instead
+
+    @property
+    def label(self) -> str:
+        return f"{self.month} {self.year}"
+
+
+def as_date(day) -> date:
+    return date.fromisoformat(day) if isinstance(day, str) else day
+
+
+def last_weekday(year: int, month: int, weekday: int) -> date:
+    """Last `weekday` (Monday = 0) of the month"""
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+class ContractCalendar:
+    """
+    Current NSE futures contract. Expiry is the last expiry weekday of the
+    month - the one in effect for that contract month in `expiry_weekdays` -
+    moved back to the previous trading day when that is a holiday or
+    weekend; the next month is traded from `rollover_days` calendar days
+    before expiry.
+    """
+
+    def __init__(self, holidays: Iterable = (), expiry_weekdays: Sequence = EXPIRY_WEEKDAYS,
+                 rollover_days: int = 1, months: int = 24, clock: Callable[[], float] = time.time):
+        self.extra_holidays = {as_date(day) for day in holidays}
+        self.expiry_weekdays = sorted((as_date(start), weekday) for start, weekday in expiry_weekdays)
+        self.rollover_days = rollover_days
+        self.months = months
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.contracts: Dict[Tuple[int, int], NSEContract] = {}
+        self.day: Optional[int] = None
+        self.contract: Optional[NSEContract] = None
+        self.listeners: List[Callable[[Optional[NSEContract], NSEContract], None]] = []
+        self.rebuilds = 0
+        self.rollovers = 0
+
+    def is_holiday(self, day: date) -> bool:
+        return day.weekday() >= 5 or (day.month, day.day) in FIXED_HOLIDAYS or day in self.extra_holidays
+
+    def expiry_weekday(self, year: int, month: int) -> int:
+        first = date(year, month, 1)
+        weekday = self.expiry_weekdays[0][1]
+        for start, rule in self.expiry_weekdays:
+            if start <= first:
+                weekday = rule
+        return weekday
+
+    def expiry(self, year: int, month: int) -> date:
+        day = last_weekday(year, month, self.expiry_weekday(year, month))
+        while self.is_holiday(day):
+            day -= timedelta(days=1)
+        return day
+
+    def build(self, start: date):
+        """Expiries and rollover dates of the `months` months from `start`'s month"""
+        contracts = {}
+        year, month = start.year, start.month
+        for _ in range(self.months):
+            expiry = self.expiry(year, month)
+            contracts[(year, month)] = NSEContract(
+                calendar.month_abbr[month].upper(), f"{year % 100:02d}",
+                datetime(expiry.year, expiry.month, expiry.day),
+                expiry - timedelta(days=self.rollover_days)
+            )
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        self.contracts = contracts
+        self.rebuilds += 1
+
+    def on_rollover(self, callback: Callable[[Optional[NSEContract], NSEContract], None]):
+        """callback(previous contract, new contract) when the front month changes"""
+        self.listeners.append(callback)
+
+    def current(self) -> NSEContract:
+        """Front-month contract: the cached one until the IST date changes"""
+        day = int((self.clock() + IST_OFFSET_S) // 86400)
+        if day == self.day:
+            return self.contract
+        with self.lock:
+            if day != self.day:
+                self._advance(day)
+            return self.contract
+
+    def _advance(self, day: int):
+        today = date(1970, 1, 1) + timedelta(days=day)
+        key = (today.year, today.month)
+        following = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+        if key not in self.contracts or following not in self.contracts:
+            self.build(today)
+        contract = self.contracts[key]
+        if today >= contract.rollover:
+            contract = self.contracts[following]
+        previous, self.contract, self.day = self.contract, contract, day
+        if previous is not None and previous != contract:
+            self.rollovers += 1
+            for callback in self.listeners:
+                try:
+                    callback(previous, contract)
+                except Exception as e:
+                    print(f"  ⚠️ Rollover listener failed: {e}")
+
+    def upcoming(self) -> List[NSEContract]:
+        return list(self.contracts.values())
+
+
+# Test function
+if __name__ == "__main__":
+    import time
+
+    print("📅 Expiries: Thursday until Aug 2025, Tuesday after, moved back on holidays")
+    cal = ContractCalendar(holidays=["2024-03-28"])
+    for year, month in ((2023, 1), (2024, 3), (2024, 12), (2025, 8), (2025, 9), (2026, 1), (2026, 11)):
+        weekday = cal.expiry_weekday(year, month)
+        scheduled = last_weekday(year, month, weekday)
+        expiry = cal.expiry(year, month)
+        note = "" if expiry == scheduled else f" (last {calendar.day_name[weekday]} {scheduled} is a holiday)"
+        print(f"  {calendar.month_abbr[month]} {year}: {calendar.day_abbr[expiry.weekday()]} {expiry}{note}")
+
+    print("\n🔁 Walking through January-March 2026 one IST day at a time")
+    clock = {"now": IST.localize(datetime(2026, 1, 1, 9, 0))}
+    cal = ContractCalendar(clock=lambda: clock["now"].timestamp())
+    cal.on_rollover(lambda old, new: print(f"  {clock['now']:%a %d %b}: rollover {old.label} -> {new.label} "
+                                           f"(expires {new.expiry:%d %b})"))
+    start = cal.current()
+    print(f"  {clock['now']:%a %d %b}: trading {start.label}, expiry {start.expiry:%d %b}, "
+          f"{len(cal.upcoming())} months precomputed")
+    while clock["now"] < IST.localize(datetime(2026, 4, 1)):
+        clock["now"] += timedelta(hours=1)
+        cal.current()
+    print(f"  rebuilds {cal.rebuilds}, rollovers {cal.rollovers}")
+
+    def recompute():
+        """The previous per-call calendar math"""
+        now = datetime.now()
+        last_day = calendar.monthrange(now.year, now.month)[1]
+        last_date = datetime(now.year, now.month, last_day)
+        expiry = last_date - timedelta(days=(last_date.weekday() - 3) % 7)
+        return expiry.strftime("%b").upper(), expiry.strftime("%y"), expiry
+
+    calls = 100000
+    print(f"\n⏱️ {calls} contract lookups")
+    cal = ContractCalendar()
+    for label, lookup in (("recomputed", recompute), ("cached", cal.current)):
+        started = time.perf_counter()
+        for _ in range(calls):
+            lookup()
+        print(f"  {label:<10} {(time.perf_counter() - started) * 1e9 / calls:6.0f} ns per lookup")
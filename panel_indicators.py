@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Panel Indicator Engine
+MACD, EMA, RSI and ATR for the whole instrument universe at once: the frames
+of one timeframe are stacked into a 2D NumPy panel (time x instruments) and
+each recurrence runs as a single vectorized pass over all columns, instead of
+one pandas pipeline per instrument
+"""
+
+import threading
+import time
+from typing import Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from streaming_indicators import StreamingIndicators, ewm_alpha
+
+
+class PanelIndicators:
+    """
+    One indicator set computed over many frames per call. compute() returns,
+    per key, the last `history` bars of the frame with the same indicator
+    columns as the pandas implementation.
+
+    Frames are aligned on bar position, right-aligned to each frame's last
+    bar, and the rows before a frame's first bar are NaN. Aligning on
+    timestamps instead would put other markets' hours inside each
+    instrument's EMA and rolling windows; on bar position every column sees
+    exactly its own bars, so the values match the per-instrument pandas run
+    (EMAs bit for bit, rolling means to rounding).
+
+    Frames with NaN prices go through the pandas path, as pandas' NaN
+    handling is not replicated. Columns are processed in chunks of
+    `chunk_size` instruments of similar length to bound memory and padding.
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9,
+                 ema_periods: Iterable[int] = (), rsi_period: Optional[int] = None,
+                 atr_period: Optional[int] = None, history: int = 24, chunk_size: int = 256):
+        self.reference = StreamingIndicators(fast, slow, signal, ema_periods, rsi_period, atr_period, history)
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self.ema_periods = tuple(ema_periods)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.history = max(history, 3)
+        self.chunk_size = max(chunk_size, 1)
+        self.lock = threading.Lock()
+        self.panels = 0
+        self.frames = 0
+        self.fallbacks = 0
+        self.seconds = 0.0
+
+    @property
+    def columns(self) -> List[str]:
+        return self.reference.columns
+
+    def frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Indicators over one frame with pandas (the reference)"""
+        return self.reference.frame(df)
+
+    @staticmethod
+    def _ewm(values: np.ndarray, alphas: np.ndarray, starts: Dict[int, np.ndarray]) -> np.ndarray:
+        """
+        ewm(adjust=False) down the time axis of a (T, K, N) panel with one
+        alpha per K, in pandas' operation order. Each column is seeded with its
+        own first bar (`starts`: row -> columns whose first bar is on that row).
+        """
+        alphas = alphas.reshape(-1, 1)
+        old_wt = 1.0 - alphas
+        denom = old_wt + alphas
+        out = np.empty(values.shape[:1] + (len(alphas), values.shape[-1]))
+        scaled = np.empty(out.shape[1:])
+        out[0] = values[0]
+        for t in range(1, len(values)):
+            np.multiply(alphas, values[t], out=scaled)
+            np.multiply(old_wt, out[t - 1], out=out[t])
+            out[t] += scaled
+            out[t] /= denom
+            cols = starts.get(t)
+            if cols is not None:
+                out[t][:, cols] = np.broadcast_to(values[t], out[t].shape)[:, cols]
+        return out
+
+    @staticmethod
+    def _rolling_mean(values: np.ndarray, period: int, age: np.ndarray) -> np.ndarray:
+        """Mean of the last `period` rows; NaN until a column has `period` bars of its own"""
+        total = values.copy()
+        for k in range(1, period):
+            total[k:] += values[:-k]
+        total /= period
+        total[age < period - 1] = np.nan
+        return total
+
+    def _panel(self, prices: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        """(T, N) arrays of every indicator column from (3, bars) high/low/close arrays"""
+        lengths = np.array([p.shape[1] for p in prices])
+        rows = int(lengths.max())
+        pads = rows - lengths
+        high, low, close = (np.full((rows, len(prices)), np.nan) for _ in range(3))
+        for j, (h, l, c) in enumerate(prices):
+            high[pads[j]:, j], low[pads[j]:, j], close[pads[j]:, j] = h, l, c
+        # Bar number of each cell within its own frame (negative in the padding)
+        age = np.arange(rows)[:, None] - pads[None, :]
+        starts: Dict[int, np.ndarray] = {}
+        for pad in np.unique(pads):
+            starts[int(pad)] = np.flatnonzero(pads == pad)
+
+        spans = [self.fast, self.slow] + list(self.ema_periods)
+        emas = self._ewm(close, np.array([ewm_alpha(span) for span in spans]), starts)
+        macd = emas[:, 0] - emas[:, 1]
+        signal = self._ewm(macd, np.array([ewm_alpha(self.signal)]), starts)[:, 0]
+        out = {'MACD_Line': macd, 'Signal_Line': signal, 'Histogram': macd - signal}
+        for i, period in enumerate(self.ema_periods, 2):
+            out[f'EMA_{period}'] = emas[:, i]
+
+        first = age == 0
+        if self.rsi_period:
+            delta = np.full_like(close, np.nan)
+            delta[1:] = close[1:] - close[:-1]
+            delta[first] = np.nan
+            gains = np.where(delta > 0, delta, 0.0)
+            losses = np.where(delta < 0, -delta, 0.0)
+            gain = self._rolling_mean(gains, self.rsi_period, age)
+            loss = self._rolling_mean(losses, self.rsi_period, age)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out['RSI'] = 100 - (100 / (1 + gain / loss))
+        if self.atr_period:
+            prev_close = np.full_like(close, np.nan)
+            prev_close[1:] = close[:-1]
+            ranges = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+            ranges[first] = (high - low)[first]
+            out['ATR'] = self._rolling_mean(ranges, self.atr_period, age)
+        return out
+
+    def compute(self, frames: Dict[Hashable, pd.DataFrame]) -> Dict[Hashable, pd.DataFrame]:
+        """Last `history` bars of every frame with indicator columns"""
+        started = time.perf_counter()
+        results: Dict[Hashable, pd.DataFrame] = {}
+        prices: Dict[Hashable, np.ndarray] = {}
+        panel_keys = []
+        for key, df in frames.items():
+            if df.empty:
+                continue
+            prices[key] = np.array([df[col].to_numpy(dtype=float) for col in ('High', 'Low', 'Close')])
+            if np.isnan(prices[key]).any():
+                results[key] = self.frame(df).iloc[-self.history:]
+                with self.lock:
+                    self.fallbacks += 1
+            else:
+                panel_keys.append(key)
+
+        # Similar lengths share a chunk, so little of the panel is padding
+        panel_keys.sort(key=lambda key: len(frames[key]))
+        chunks = [panel_keys[i:i + self.chunk_size] for i in range(0, len(panel_keys), self.chunk_size)]
+        for chunk in chunks:
+            values = self._panel([prices[key] for key in chunk])
+            for j, key in enumerate(chunk):
+                # One constructor call per view; column-by-column assignment costs more than the panel
+                tail = frames[key].iloc[-self.history:]
+                columns = {col: tail[col].to_numpy(copy=True) for col in tail.columns}
+                columns.update({col: values[col][len(values[col]) - len(tail):, j] for col in self.columns})
+                results[key] = pd.DataFrame(columns, index=tail.index)
+
+        with self.lock:
+            self.panels += len(chunks)
+            self.frames += len(panel_keys)
+            self.seconds += time.perf_counter() - started
+        return results
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"panels": self.panels, "frames": self.frames,
+                    "fallbacks": self.fallbacks, "seconds": round(self.seconds, 3)}
+
+
+# Test function
+if __name__ == "__main__":
+    import sys
+
+    def synthetic(count: int, bars: int, seed: int = 7) -> Dict[str, pd.DataFrame]:
+        """Random walks of uneven length (different sessions / listing dates)"""
+        rng = np.random.default_rng(seed)
+        frames = {}
+        for i in range(count):
+            length = int(bars * rng.uniform(0.6, 1.0))
+            idx = pd.date_range("2025-01-01", periods=length, freq="1h", tz="UTC")
+            close = 100 * (1 + i % 7) + np.cumsum(rng.normal(0, 0.5, length))
+            frames[f"SYM{i:04d}"] = pd.DataFrame({
+                "Open": close, "High": close + rng.uniform(0, 1, length),
+                "Low": close - rng.uniform(0, 1, length), "Close": close, "Volume": 1000.0
+            }, index=idx)
+        return frames
+
+    engine = PanelIndicators(ema_periods=(200,), rsi_period=14, atr_period=14)
+    bars = int(sys.argv[1]) if len(sys.argv) > 1 else 720
+
+    print("🧪 Panel indicator parity check (relative tolerance 1e-9)")
+    frames = synthetic(90, bars)
+    got = engine.compute(frames)
+    worst = 0.0
+    for key, df in frames.items():
+        a = got[key][engine.columns].to_numpy()
+        b = engine.frame(df).iloc[-len(a):][engine.columns].to_numpy()
+        diff = np.where(np.isnan(a) & np.isnan(b), 0.0, np.abs(a - b) / np.maximum(np.abs(b), 1.0))
+        worst = max(worst, float(np.nan_to_num(diff, nan=np.inf).max()))
+    print(f"  90 frames x ~{bars} bars: max rel diff {worst:.2e} {'✅' if worst < 1e-9 else '❌'}")
+
+    print(f"⏱️ Benchmark, ~{bars} bars per frame (per-instrument pandas loop vs one panel pass)")
+    for count in (90, 500, 2000):
+        frames = synthetic(count, bars, seed=count)
+        started = time.perf_counter()
+        for df in frames.values():
+            engine.frame(df).iloc[-engine.history:]
+        loop_s = time.perf_counter() - started
+        started = time.perf_counter()
+        engine.compute(frames)
+        panel_s = time.perf_counter() - started
+        print(f"  {count:>5} instruments: loop {loop_s:6.2f}s | panel {panel_s:6.2f}s | {loop_s / panel_s:4.1f}x")
+    print(f"  {engine.stats()}")
@@ -5,15 +5,17 @@ Fetches and analyzes global market data before NSE opening to predict market sen
 """
 
 import json
-import yfinance as yf
 from datetime import datetime, timedelta
 from pathlib import Path
 import pytz
 
+from market_data import get_provider
+
 BASE_DIR = Path(__file__).parent
 PREMARKET_FILE = BASE_DIR / "premarket_cues.json"
 
 IST = pytz.timezone('Asia/Kolkata')
+MARKET_DATA = get_provider()
 
 def fetch_us_markets():
     """Fetch previous day's US market data"""
@@ -26,8 +28,7 @@ def fetch_us_markets():
         
         results = {}
         for symbol, name in symbols.items():
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="5d")
+            hist = MARKET_DATA.history(symbol, "1d", "5d")
             
             if len(hist) >= 2:
                 prev_close = hist['Close'].iloc[-2]
@@ -55,8 +56,7 @@ def fetch_asian_markets():
         
         results = {}
         for symbol, name in symbols.items():
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="5d")
+            hist = MARKET_DATA.history(symbol, "1d", "5d")
             
             if len(hist) >= 2:
                 prev_close = hist['Close'].iloc[-2]
@@ -77,8 +77,7 @@ def fetch_asian_markets():
 def fetch_sgx_nifty():
     """Fetch SGX Nifty data (using Nifty 50 as proxy)"""
     try:
-        ticker = yf.Ticker("^NSEI")
-        hist = ticker.history(period="5d")
+        hist = MARKET_DATA.history("^NSEI", "1d", "5d")
         
         if len(hist) >= 2:
             prev_close = hist['Close'].iloc[-2]
@@ -97,8 +96,7 @@ def fetch_sgx_nifty():
 def fetch_crude_oil():
     """Fetch Crude Oil prices"""
     try:
-        ticker = yf.Ticker("CL=F")
-        hist = ticker.history(period="5d")
+        hist = MARKET_DATA.history("CL=F", "1d", "5d")
         
         if len(hist) >= 2:
             prev_close = hist['Close'].iloc[-2]
@@ -117,8 +115,7 @@ def fetch_crude_oil():
 def fetch_dollar_index():
     """Fetch Dollar Index (DXY)"""
     try:
-        ticker = yf.Ticker("DX-Y.NYB")
-        hist = ticker.history(period="5d")
+        hist = MARKET_DATA.history("DX-Y.NYB", "1d", "5d")
         
         if len(hist) >= 2:
             prev_close = hist['Close'].iloc[-2]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Quote Monitor
+Keeps each instrument's last full-analysis result and the time its entry bar
+closes, so cycles in between can skip the multi-timeframe analysis and only
+check open trades against a last-price quote
+"""
+
+import copy
+import threading
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+class QuoteMonitor:
+    """name -> (last full result, raw entry price, next full analysis time, when it ran)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+
+    def record(self, name: str, result: Dict, raw_price: float, next_full_at: pd.Timestamp,
+               analysed_at: Optional[pd.Timestamp] = None):
+        """Store a full-analysis result; `raw_price` is the unconverted entry close"""
+        with self.lock:
+            self.entries[name] = {
+                "result": result,
+                "raw_price": raw_price,
+                "next_full_at": next_full_at.tz_convert("UTC"),
+                "analysed_at": analysed_at.tz_convert("UTC") if analysed_at is not None else pd.Timestamp.now(tz="UTC")
+            }
+
+    def due(self, name: str, now: Optional[pd.Timestamp] = None) -> bool:
+        """True when the instrument needs a full analysis (new bar closed or no snapshot)"""
+        now = now if now is not None else pd.Timestamp.now(tz="UTC")
+        with self.lock:
+            entry = self.entries.get(name)
+        return entry is None or now >= entry["next_full_at"]
+
+    def snapshot(self, name: str) -> Optional[Dict]:
+        """Copy of the last full result (None if never analysed)"""
+        with self.lock:
+            entry = self.entries.get(name)
+        return copy.deepcopy(entry["result"]) if entry else None
+
+    def raw_price(self, name: str) -> Optional[float]:
+        with self.lock:
+            entry = self.entries.get(name)
+        return entry["raw_price"] if entry else None
+
+    def next_full_at(self, name: str) -> Optional[pd.Timestamp]:
+        with self.lock:
+            entry = self.entries.get(name)
+        return entry["next_full_at"] if entry else None
+
+    def analysed_at(self, name: str) -> Optional[pd.Timestamp]:
+        with self.lock:
+            entry = self.entries.get(name)
+        return entry["analysed_at"] if entry else None
+
+
+# Test function
+if __name__ == "__main__":
+    monitor = QuoteMonitor()
+    now = pd.Timestamp.now(tz="UTC")
+    print("Due before any analysis:", monitor.due("EUR/USD", now))
+    monitor.record("EUR/USD", {"instrument": "EUR/USD", "ltp": 1.1}, 1.1, now + pd.Timedelta(minutes=30))
+    print("Due mid-bar:", monitor.due("EUR/USD", now))
+    print("Due after the bar closes:", monitor.due("EUR/USD", now + pd.Timedelta(minutes=31)))
+    print("Snapshot:", monitor.snapshot("EUR/USD"))
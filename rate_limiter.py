@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Token-Bucket Rate Limiter
+Keeps the request rate to each upstream host under a configured ceiling while
+the fetch phase runs on a worker pool
+"""
+
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1):
+        """
+        Block until `tokens` are available. A request larger than the bucket
+        waits for a full bucket and leaves the balance negative, so the
+        callers after it repay the deficit and the rate ceiling still holds.
+        """
+        tokens = float(tokens)
+        needed = min(tokens, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= needed:
+                    self.tokens -= tokens
+                    return
+                wait = (needed - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One token bucket per upstream host"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, host: str, tokens: float = 1):
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.capacity)
+        bucket.acquire(tokens)
+
+
+# Test function
+if __name__ == "__main__":
+    rate, burst = 20.0, 10
+    print(f"🪣 {rate:.0f} tokens/s, burst {burst}: 5 batches of 20 symbols, then 20 single requests")
+    bucket = TokenBucket(rate, burst)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire(20)
+    for _ in range(20):
+        bucket.acquire()
+    elapsed = time.monotonic() - started
+    # The first `burst` tokens are free; everything after that is paid for at `rate`
+    print(f"  120 tokens in {elapsed:.2f}s = {120 / elapsed:.1f}/s (floor {(120 - burst) / rate:.2f}s)")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Incremental OHLCV Resampler
+Keeps the completed higher-timeframe buckets (4H momentum, 2H, 1W, ...) of
+each symbol between cycles and only re-aggregates the open bucket and the
+bars that arrived since, with the same output as resample_ohlcv() on the
+whole frame
+"""
+
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+from timeframes import OHLCV_AGG, bucket_origin, resample_ohlcv
+
+OHLCV_COLUMNS = list(OHLCV_AGG)
+# Per bucket: first source bar and source bar count, to stitch and validate
+STATE_AGG = {**OHLCV_AGG, "_first": "first", "_rows": "sum"}
+
+
+def incremental_rule(rule: str) -> bool:
+    """Rules whose bucket edges do not depend on where the frame starts"""
+    offset = to_offset(rule)
+    if isinstance(offset, Tick):
+        return pd.Timedelta(days=1) % pd.Timedelta(offset) == pd.Timedelta(0)
+    return offset.n == 1
+
+
+def aggregate(df: pd.DataFrame, rule: str, origin: Optional[pd.Timestamp]) -> pd.DataFrame:
+    kwargs = {"origin": origin} if origin is not None else {}
+    framed = df[OHLCV_COLUMNS].assign(_first=df.index, _rows=1)
+    return framed.resample(rule, **kwargs).agg(STATE_AGG).dropna(subset=OHLCV_COLUMNS)
+
+
+def aggregate_rows(df: pd.DataFrame, rule: str, origin: pd.Timestamp) -> pd.DataFrame:
+    """
+    aggregate() for the handful of bars around the open bucket of a fixed-length
+    rule: a plain loop is far cheaper than resample()'s per-call overhead
+    """
+    # Nanosecond epoch arithmetic (Timestamp.value is always in ns)
+    index = df.index
+    freq = pd.Timedelta(to_offset(rule)).value
+    start = origin.value
+    stamps = index.as_unit("ns").asi8
+    labels = start + (stamps - start) // freq * freq
+    buckets: Dict[int, list] = {}
+    for label, first, (o, h, l, c, v) in zip(labels.tolist(), stamps.tolist(), df[OHLCV_COLUMNS].to_numpy().tolist()):
+        bucket = buckets.get(label)
+        if bucket is None:
+            bucket = buckets[label] = [math.nan, math.nan, math.nan, math.nan, 0, first, 0]
+        # first / max / min / last skip NaN, like the pandas aggregations
+        if math.isnan(bucket[0]):
+            bucket[0] = o
+        if not math.isnan(h) and not h <= bucket[1]:
+            bucket[1] = h
+        if not math.isnan(l) and not l >= bucket[2]:
+            bucket[2] = l
+        if not math.isnan(c):
+            bucket[3] = c
+        if not math.isnan(v):
+            bucket[4] += v
+        bucket[6] += 1
+    # Buckets with a NaN in any OHLCV column are dropped, as by dropna()
+    kept = [(label, bucket) for label, bucket in buckets.items() if not any(math.isnan(x) for x in bucket[:5])]
+    rows = list(zip(*(bucket for _, bucket in kept))) or [()] * len(STATE_AGG)
+
+    def as_index(values) -> pd.DatetimeIndex:
+        naive = pd.DatetimeIndex(np.array(values, dtype="datetime64[ns]")).as_unit(index.unit)
+        return naive.tz_localize("UTC").tz_convert(index.tz) if index.tz is not None else naive
+
+    columns = {col: np.array(rows[i], dtype=df[col].dtype) for i, col in enumerate(OHLCV_COLUMNS)}
+    columns["_first"] = as_index(rows[5])
+    columns["_rows"] = np.array(rows[6], dtype=np.int64)
+    return pd.DataFrame(columns, index=as_index([label for label, _ in kept]).rename(index.name))
+
+
+class IncrementalResampler:
+    """
+    State per key (e.g. (symbol, rule, anchor)): the completed buckets and
+    the first source bar of the open one. A new frame is served as
+      first bucket (rebuilt, the window start may cut into it)
+      + stored completed buckets
+      + open bucket and newer (rebuilt).
+    Completed buckets are trusted once built; if the number of source bars
+    under them changes, or the default midnight origin shifts across a DST
+    change, the key is rebuilt from scratch.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key_locks = defaultdict(threading.Lock)
+        self.states: Dict[Hashable, Dict] = {}
+        self.increments = 0
+        self.rebuilds = 0
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self.lock:
+            return self.key_locks[key]
+
+    def resample(self, key: Hashable, df: pd.DataFrame, rule: str, anchor: Optional[str] = None) -> pd.DataFrame:
+        if df.empty or not incremental_rule(rule):
+            return resample_ohlcv(df.copy(deep=False), rule, anchor)
+        origin = bucket_origin(df.index, rule, anchor)
+        with self._key_lock(key):
+            state = self.states.get(key)
+            result = self._extend(state, df, rule, origin) if state else None
+            with self.lock:
+                if result is None:
+                    self.rebuilds += 1
+                else:
+                    self.increments += 1
+            if result is None:
+                result = aggregate(df, rule, origin)
+            self.states[key] = {
+                "rule": rule,
+                "origin": origin,
+                "completed": result.iloc[:-1],
+                "open_first": result['_first'].iloc[-1]
+            }
+        return result[OHLCV_COLUMNS]
+
+    @staticmethod
+    def _extend(state: Dict, df: pd.DataFrame, rule: str, origin: Optional[pd.Timestamp]) -> Optional[pd.DataFrame]:
+        """Stitched result, or None when the stored buckets cannot be reused"""
+        completed, open_first = state['completed'], state['open_first']
+        if state['rule'] != rule or completed.empty:
+            return None
+        if origin is not None and (origin - state['origin']) % pd.Timedelta(to_offset(rule)) != pd.Timedelta(0):
+            return None
+        start = df.index[0]
+        if start < completed['_first'].iloc[0] or open_first not in df.index:
+            return None
+
+        # Stored bucket containing the window start is rebuilt from the frame
+        k = completed['_first'].searchsorted(start, side='right') - 1
+        next_first = completed['_first'].iloc[k + 1] if k + 1 < len(completed) else open_first
+        middle = completed.iloc[k + 1:]
+        lo, hi = df.index.searchsorted(next_first), df.index.searchsorted(open_first)
+        if hi - lo != middle['_rows'].sum():
+            return None
+        combine = aggregate_rows if origin is not None else aggregate
+        head = combine(df.iloc[:lo], rule, origin)
+        tail = combine(df.iloc[hi:], rule, origin)
+        return pd.concat([head, middle, tail])
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"keys": len(self.states), "increments": self.increments, "rebuilds": self.rebuilds}
+
+
+# Test function
+if __name__ == "__main__":
+    print("🧪 Incremental resample parity check")
+    rng = np.random.default_rng(3)
+    cases = [
+        ("EURUSD=X", pd.date_range("2025-01-01", "2025-12-31", freq="1h", tz="Europe/London"), None),
+        ("RELIANCE.NS", pd.DatetimeIndex([ts for ts in pd.date_range(
+            "2025-01-01 09:15", "2025-12-31 15:15", freq="1h", tz="Asia/Kolkata")
+            if ts.weekday() < 5 and (9, 15) <= (ts.hour, ts.minute) <= (15, 15)]), "09:15 Asia/Kolkata"),
+    ]
+    resampler = IncrementalResampler()
+    for symbol, idx, anchor in cases:
+        close = 100 + np.cumsum(rng.normal(0, 0.5, len(idx)))
+        hourly = pd.DataFrame({
+            "Open": close + rng.normal(0, 0.1, len(idx)), "High": close + 1, "Low": close - 1,
+            "Close": close, "Volume": rng.integers(0, 1000, len(idx)).astype(float)
+        }, index=idx)
+        window = len(idx) // 2
+        for rule in ["4h", "2h", "1W"]:
+            mismatches = 0
+            # Rolling one-year-style window advancing one bar at a time, with a forming last bar
+            for end in range(window, len(idx), 29):
+                frame = hourly.iloc[end - window:end].copy()
+                frame.iloc[-1, frame.columns.get_loc("Close")] += rng.normal()
+                expected = resample_ohlcv(frame.copy(), rule, anchor)
+                got = resampler.resample((symbol, rule, anchor), frame, rule, anchor)
+                mismatches += not expected.equals(got)
+            print(f"  {symbol:<12} {rule:<3} anchor={anchor}: {'✅ identical' if not mismatches else f'❌ {mismatches} mismatches'}")
+    print(f"  {resampler.stats()}")
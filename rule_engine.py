@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Vectorized Rule Engine
+Trend / momentum / entry rules of the strategy for the whole universe at
+once: the latest and previous indicator values of every instrument are
+stacked into arrays and each condition becomes one boolean NumPy expression,
+with the relaxed BTC/ETH rules applied as a mask
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Instruments with relaxed trend / momentum / RSI / MACD rules
+RELAXED = ("Bitcoin", "Ethereum")
+
+BIASES = np.array(["NEUTRAL", "BULLISH", "BEARISH"])
+ENTRY_SIGNALS = np.array(["BEARISH_MOM", "BULLISH_MOM", "SELL_CROSS", "BUY_CROSS"])
+
+
+def evaluate_rules(relaxed: bool, t_last, m_last, m_prev, e_last, e_prev) -> Dict:
+    """
+    Trend / momentum / entry rule evaluation on the latest closed candles (no
+    side effects). `relaxed` selects the BTC/ETH profile (InstrumentSpec.relaxed).
+    """
+    # 3. Apply Rules
+    # Trend: MACD Line > 0 AND Price > EMA 200 (Relaxed for BTC/ETH)
+    trend_ema_200 = t_last.get('EMA_200', None)
+    if relaxed:
+        trend_bullish = t_last['MACD_Line'] > 0
+        trend_bearish = t_last['MACD_Line'] < 0
+    else:
+        trend_bullish = t_last['MACD_Line'] > 0 and (trend_ema_200 is None or t_last['Close'] > trend_ema_200)
+        trend_bearish = t_last['MACD_Line'] < 0 and (trend_ema_200 is None or t_last['Close'] < trend_ema_200)
+
+    trend_bias = "BULLISH" if trend_bullish else ("BEARISH" if trend_bearish else "NEUTRAL")
+
+    # Momentum: Histogram > 0 AND Histogram is increasing (Relaxed for BTC/ETH)
+    if relaxed:
+        mom_bullish = m_last['Histogram'] > 0
+        mom_bearish = m_last['Histogram'] < 0
+    else:
+        mom_bullish = m_last['Histogram'] > 0 and m_last['Histogram'] > m_prev['Histogram']
+        mom_bearish = m_last['Histogram'] < 0 and m_last['Histogram'] < m_prev['Histogram']
+
+    mom_bias = "BULLISH" if mom_bullish else ("BEARISH" if mom_bearish else "NEUTRAL")
+
+    # Entry Signal
+    e_signal = "NEUTRAL"
+
+    # Filters
+    ema_200 = e_last.get('EMA_200', None)
+    rsi = e_last.get('RSI', None)
+    atr = e_last.get('ATR', 0)
+
+    is_above_ema = True if ema_200 is None or e_last['Close'] > ema_200 else False
+    is_below_ema = True if ema_200 is None or e_last['Close'] < ema_200 else False
+
+    # Relaxed RSI for BTC/ETH
+    if relaxed:
+        rsi_bullish = True if rsi is None or rsi > 45 else False
+        rsi_bearish = True if rsi is None or rsi < 55 else False
+    else:
+        rsi_bullish = True if rsi is None or rsi > 50 else False
+        rsi_bearish = True if rsi is None or rsi < 50 else False
+
+    # Stricter MACD: Both lines must be on the same side of zero (Relaxed for BTC/ETH)
+    if relaxed:
+        macd_bullish = e_last['MACD_Line'] > 0
+        macd_bearish = e_last['MACD_Line'] < 0
+    else:
+        macd_bullish = e_last['MACD_Line'] > 0 and e_last['Signal_Line'] > 0
+        macd_bearish = e_last['MACD_Line'] < 0 and e_last['Signal_Line'] < 0
+
+    if e_prev['Histogram'] < 0 and e_last['Histogram'] > 0:
+        e_signal = "BUY_CROSS"
+    elif e_prev['Histogram'] > 0 and e_last['Histogram'] < 0:
+        e_signal = "SELL_CROSS"
+    elif e_last['Histogram'] > 0:
+        e_signal = "BULLISH_MOM"
+    else:
+        e_signal = "BEARISH_MOM"
+
+    return {
+        "trend_bias": trend_bias,
+        "mom_bias": mom_bias,
+        "e_signal": e_signal,
+        "ema_200": ema_200,
+        "rsi": rsi,
+        "atr": atr,
+        "is_above_ema": is_above_ema,
+        "is_below_ema": is_below_ema,
+        "rsi_bullish": rsi_bullish,
+        "rsi_bearish": rsi_bearish,
+        "macd_bullish": macd_bullish,
+        "macd_bearish": macd_bearish
+    }
+
+
+# ---- Batch evaluation ----
+# (array name, row, column); optional columns get a "<name>_present" mask
+INPUTS = (
+    ("t_macd", "t_last", "MACD_Line"), ("t_close", "t_last", "Close"), ("t_ema", "t_last", "EMA_200"),
+    ("m_hist", "m_last", "Histogram"), ("m_hist_prev", "m_prev", "Histogram"),
+    ("e_close", "e_last", "Close"), ("e_ema", "e_last", "EMA_200"), ("e_rsi", "e_last", "RSI"),
+    ("e_atr", "e_last", "ATR"), ("e_macd", "e_last", "MACD_Line"), ("e_signal_line", "e_last", "Signal_Line"),
+    ("e_hist", "e_last", "Histogram"), ("e_hist_prev", "e_prev", "Histogram"),
+)
+OPTIONAL = ("t_ema", "e_ema", "e_rsi", "e_atr")
+
+
+def gather(names: Sequence[str], rows: Sequence[Dict],
+           relaxed: Optional[Sequence[bool]] = None) -> Dict[str, np.ndarray]:
+    """
+    Stack the latest / previous rows of every instrument (dicts of t_last,
+    m_last, m_prev, e_last, e_prev - DataFrame rows or BarRows) into arrays.
+    A column missing from a row is NaN with its `_present` flag cleared.
+    `relaxed` flags come from the instrument registry when given, else
+    from the names.
+    """
+    out = {key: np.empty(len(rows)) for key, _, _ in INPUTS}
+    present = {key: np.ones(len(rows), dtype=bool) for key in OPTIONAL}
+    for i, row in enumerate(rows):
+        for key, frame, column in INPUTS:
+            value = row[frame].get(column, None)
+            if value is None:
+                present[key][i] = False
+                value = np.nan
+            out[key][i] = value
+    out.update({f"{key}_present": mask for key, mask in present.items()})
+    if relaxed is None:
+        relaxed = np.isin(np.asarray(names, dtype=object), RELAXED)
+    out["relaxed"] = np.asarray(relaxed, dtype=bool)
+    return out
+
+
+def evaluate_batch(inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    evaluate_rules() for every instrument in one pass. Biases and entry
+    signals come back as codes into BIASES / ENTRY_SIGNALS, filters as
+    boolean arrays. The setup / entry gating stays in analyze_instrument().
+    NaN compares False, as in the scalar rules.
+    """
+    relaxed = inputs["relaxed"]
+    t_macd, m_hist, m_prev = inputs["t_macd"], inputs["m_hist"], inputs["m_hist_prev"]
+    e_close, e_hist, e_prev = inputs["e_close"], inputs["e_hist"], inputs["e_hist_prev"]
+
+    # Trend: MACD line vs zero and price vs EMA-200 (EMA ignored for relaxed)
+    no_t_ema = ~inputs["t_ema_present"] | relaxed
+    trend_bullish = (t_macd > 0) & (no_t_ema | (inputs["t_close"] > inputs["t_ema"]))
+    trend_bearish = (t_macd < 0) & (no_t_ema | (inputs["t_close"] < inputs["t_ema"]))
+
+    # Momentum: histogram sign, increasing / decreasing unless relaxed
+    mom_bullish = (m_hist > 0) & (relaxed | (m_hist > m_prev))
+    mom_bearish = (m_hist < 0) & (relaxed | (m_hist < m_prev))
+
+    no_e_ema = ~inputs["e_ema_present"]
+    is_above_ema = no_e_ema | (e_close > inputs["e_ema"])
+    is_below_ema = no_e_ema | (e_close < inputs["e_ema"])
+
+    rsi, no_rsi = inputs["e_rsi"], ~inputs["e_rsi_present"]
+    rsi_bullish = no_rsi | (rsi > np.where(relaxed, 45.0, 50.0))
+    rsi_bearish = no_rsi | (rsi < np.where(relaxed, 55.0, 50.0))
+
+    e_macd, e_signal_line = inputs["e_macd"], inputs["e_signal_line"]
+    macd_bullish = (e_macd > 0) & (relaxed | (e_signal_line > 0))
+    macd_bearish = (e_macd < 0) & (relaxed | (e_signal_line < 0))
+
+    buy_cross = (e_prev < 0) & (e_hist > 0)
+    sell_cross = ~buy_cross & (e_prev > 0) & (e_hist < 0)
+    e_signal = np.select([buy_cross, sell_cross, e_hist > 0], [3, 2, 1], 0).astype(np.int8)
+
+    trend = np.where(trend_bullish, 1, np.where(trend_bearish, 2, 0)).astype(np.int8)
+    mom = np.where(mom_bullish, 1, np.where(mom_bearish, 2, 0)).astype(np.int8)
+
+    return {
+        "trend": trend, "mom": mom, "e_signal": e_signal,
+        "is_above_ema": is_above_ema, "is_below_ema": is_below_ema,
+        "rsi_bullish": rsi_bullish, "rsi_bearish": rsi_bearish,
+        "macd_bullish": macd_bullish, "macd_bearish": macd_bearish
+    }
+
+
+def rules_at(inputs: Dict[str, np.ndarray], out: Dict[str, np.ndarray], i: int) -> Dict:
+    """Instrument `i` of a batch in evaluate_rules()'s format"""
+    def optional(key, default=None):
+        return float(inputs[key][i]) if inputs[f"{key}_present"][i] else default
+    return {
+        "trend_bias": str(BIASES[out["trend"][i]]),
+        "mom_bias": str(BIASES[out["mom"][i]]),
+        "e_signal": str(ENTRY_SIGNALS[out["e_signal"][i]]),
+        "ema_200": optional("e_ema"),
+        "rsi": optional("e_rsi"),
+        "atr": optional("e_atr", 0),
+        **{key: bool(out[key][i]) for key in ("is_above_ema", "is_below_ema", "rsi_bullish",
+                                              "rsi_bearish", "macd_bullish", "macd_bearish")}
+    }
+
+
+def evaluate_universe(names: Sequence[str], rows: Sequence[Dict],
+                      relaxed: Optional[Sequence[bool]] = None) -> List[Dict]:
+    """evaluate_rules() results for a whole batch, computed in one vectorized pass"""
+    inputs = gather(names, rows, relaxed)
+    out = evaluate_batch(inputs)
+    return [rules_at(inputs, out, i) for i in range(len(rows))]
+
+
+# Test function
+if __name__ == "__main__":
+    import sys
+    import time
+    import pandas as pd
+
+    def universe(count: int, seed: int = 23):
+        """
+        Random latest / previous rows leaning one way per instrument (so
+        setups are common), with NaN warm-up values and exact zeros mixed in
+        """
+        rng = np.random.default_rng(seed)
+        names = ["Bitcoin", "Ethereum"] * 10 + [f"SYM{i:04d}" for i in range(count - 20)]
+        columns = ["Close", "MACD_Line", "Signal_Line", "Histogram", "EMA_200", "RSI", "ATR"]
+        rows = []
+        for _ in names:
+            lean = rng.choice([-1.0, 1.0])
+
+            def row():
+                values = dict(zip(columns, rng.normal(lean, 1, len(columns))))
+                values["Close"] = 100 + values["Close"]
+                values["EMA_200"] = 100 - lean * abs(values["EMA_200"])
+                values["RSI"] = 50 + 8 * values["RSI"]
+                values["ATR"] = abs(values["ATR"])
+                for column in rng.choice(columns[1:], size=rng.integers(0, 2)):
+                    values[column] = rng.choice([np.nan, 0.0])
+                return pd.Series(values)
+            rows.append({key: row() for key in ("t_last", "m_last", "m_prev", "e_last", "e_prev")})
+        return names, rows
+
+    def same(a, b) -> bool:
+        return a == b or (isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b))
+
+    print("🧪 Batch rules vs evaluate_rules()")
+    names, rows = universe(5000)
+    reference = [evaluate_rules(name in RELAXED, **row) for name, row in zip(names, rows)]
+    batch = evaluate_universe(names, rows)
+    mismatches = sum(any(not same(ref[key], got[key]) for key in ref) for ref, got in zip(reference, batch))
+    print(f"  {len(names)} instruments: {mismatches} mismatches {'✅' if mismatches == 0 else '❌'}")
+    kinds, counts = np.unique([f"{r['trend_bias']}/{r['mom_bias']}" for r in batch], return_counts=True)
+    print("  trend/momentum mix: " + ", ".join(f"{kind} {n}" for kind, n in zip(kinds, counts)))
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"⏱️ Rule evaluation, {count} instruments (rows already computed)")
+    names, rows = universe(count, seed=count)
+    flags = [name in RELAXED for name in names]
+    started = time.perf_counter()
+    for relaxed, row in zip(flags, rows):
+        evaluate_rules(relaxed, **row)
+    scalar_s = time.perf_counter() - started
+    started = time.perf_counter()
+    inputs = gather(names, rows)
+    gather_s = time.perf_counter() - started
+    started = time.perf_counter()
+    evaluate_batch(inputs)
+    vector_s = time.perf_counter() - started
+    print(f"  scalar loop {scalar_s * 1000:7.1f} ms | batch {vector_s * 1000:5.2f} ms "
+          f"(+ {gather_s * 1000:.1f} ms gathering rows) | rules {scalar_s / vector_s:,.0f}x")
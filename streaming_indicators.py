@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicator Engine
+MACD, EMA, RSI and ATR held as running state per (symbol, timeframe): each
+newly closed bar is folded in with O(1) work and the forming bar is evaluated
+on top of the committed state without being stored, so a cycle no longer
+recomputes the full recurrences over thousands of bars
+"""
+
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Hashable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def ewm_alpha(span: int) -> float:
+    """pandas' alpha for ewm(span=...)"""
+    return 1.0 / (1.0 + (span - 1) / 2.0)
+
+
+def ewm_step(prev: float, value: float, alpha: float) -> float:
+    """One ewm(adjust=False) step, in pandas' operation order"""
+    old_wt = 1.0 - alpha
+    return (old_wt * prev + alpha * value) / (old_wt + alpha)
+
+
+def rolling_mean(window: Iterable[float], value: float, period: int, count: int) -> float:
+    """Mean of the last `period` values (window holds the previous period - 1)"""
+    if count < period:
+        return math.nan
+    return (math.fsum(window) + value) / period
+
+
+class StreamingIndicators:
+    """
+    One indicator set (e.g. the entry timeframe's MACD + EMA-200 + RSI-14 +
+    ATR-14) kept for many keys. update() returns the last `history` bars of
+    the frame with the same indicator columns as the pandas implementation.
+
+    Bars before the last one are treated as closed and committed once; the
+    last bar is the forming candle and is re-evaluated every call. A key is
+    rebuilt from the whole frame when its last committed bar is missing or
+    was revised, when the frame contains NaN prices (pandas' NaN handling
+    is not replicated), or when the frame starts at a different bar than the
+    one the state was seeded from.
+
+    pandas starts its recurrences over from the first bar of each download
+    window, so a window that slid forward is reseeded rather than extended:
+    values always match the pandas implementation on the same frame, and the
+    O(1) path applies while the window start stays put (a growing frame).
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9,
+                 ema_periods: Iterable[int] = (), rsi_period: Optional[int] = None,
+                 atr_period: Optional[int] = None, history: int = 24):
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self.ema_periods = tuple(ema_periods)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.history = max(history, 3)
+        self.alphas = {"fast": ewm_alpha(fast), "slow": ewm_alpha(slow), "signal": ewm_alpha(signal)}
+        self.alphas.update({f"EMA_{p}": ewm_alpha(p) for p in self.ema_periods})
+        self.lock = threading.Lock()
+        self.key_locks = defaultdict(threading.Lock)
+        self.states: Dict[Hashable, Dict] = {}
+        self.updates = 0
+        self.rebuilds = 0
+        self.fallbacks = 0
+
+    @property
+    def columns(self):
+        columns = ['MACD_Line', 'Signal_Line', 'Histogram'] + [f"EMA_{p}" for p in self.ema_periods]
+        if self.rsi_period:
+            columns.append('RSI')
+        if self.atr_period:
+            columns.append('ATR')
+        return columns
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self.lock:
+            return self.key_locks[key]
+
+    def _count(self, counter: str):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    # ---- Reference (vectorized pandas) implementation ----
+    def _series(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
+        """Indicator columns plus the intermediate series the streaming state is made of"""
+        close = df['Close']
+        series = {
+            "fast": close.ewm(span=self.fast, adjust=False).mean(),
+            "slow": close.ewm(span=self.slow, adjust=False).mean()
+        }
+        macd = series["fast"] - series["slow"]
+        series["signal"] = macd.ewm(span=self.signal, adjust=False).mean()
+        series['MACD_Line'] = macd
+        series['Signal_Line'] = series["signal"]
+        series['Histogram'] = macd - series["signal"]
+        for period in self.ema_periods:
+            series[f'EMA_{period}'] = close.ewm(span=period, adjust=False).mean()
+        if self.rsi_period:
+            delta = close.diff()
+            series["gains"] = delta.where(delta > 0, 0)
+            series["losses"] = -delta.where(delta < 0, 0)
+            gain = series["gains"].rolling(window=self.rsi_period).mean()
+            loss = series["losses"].rolling(window=self.rsi_period).mean()
+            series['RSI'] = 100 - (100 / (1 + gain / loss))
+        if self.atr_period:
+            ranges = pd.concat([
+                df['High'] - df['Low'],
+                (df['High'] - close.shift()).abs(),
+                (df['Low'] - close.shift()).abs()
+            ], axis=1)
+            series["ranges"] = ranges.max(axis=1)
+            series['ATR'] = series["ranges"].rolling(window=self.atr_period).mean()
+        return series
+
+    def frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Indicators over the whole frame, exactly as calculate_macd/ema/rsi/atr compute them"""
+        df = df.copy()
+        series = self._series(df)
+        for column in self.columns:
+            df[column] = series[column]
+        return df
+
+    # ---- Streaming implementation ----
+    def _new_state(self) -> Dict:
+        return {
+            "count": 0,
+            "first_index": None,
+            "last_index": None,
+            "last_close": None,
+            "ema": {},
+            "gains": deque(maxlen=max((self.rsi_period or 1) - 1, 0)),
+            "losses": deque(maxlen=max((self.rsi_period or 1) - 1, 0)),
+            "ranges": deque(maxlen=max((self.atr_period or 1) - 1, 0)),
+            "rows": deque(maxlen=self.history - 1)
+        }
+
+    def _advance(self, state: Dict, index, high: float, low: float, close: float, commit: bool) -> Dict[str, float]:
+        """Indicator values for one bar on top of `state`; folded into it when `commit`"""
+        first = state["count"] == 0
+        ema = dict(state["ema"])
+        for name in ("fast", "slow"):
+            ema[name] = close if first else ewm_step(ema[name], close, self.alphas[name])
+        macd = ema["fast"] - ema["slow"]
+        ema["signal"] = macd if first else ewm_step(ema["signal"], macd, self.alphas["signal"])
+        values = {'MACD_Line': macd, 'Signal_Line': ema["signal"], 'Histogram': macd - ema["signal"]}
+        for period in self.ema_periods:
+            name = f"EMA_{period}"
+            ema[name] = close if first else ewm_step(ema[name], close, self.alphas[name])
+            values[name] = ema[name]
+
+        count = state["count"] + 1
+        prev_close = state["last_close"]
+        if self.rsi_period:
+            delta = math.nan if first else close - prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -(delta if delta < 0 else 0.0)
+            avg_gain = rolling_mean(state["gains"], gain, self.rsi_period, count)
+            avg_loss = rolling_mean(state["losses"], loss, self.rsi_period, count)
+            if math.isnan(avg_gain) or math.isnan(avg_loss) or (avg_gain == 0 and avg_loss == 0):
+                values['RSI'] = math.nan
+            elif avg_loss == 0:
+                values['RSI'] = 100.0
+            else:
+                values['RSI'] = 100 - (100 / (1 + avg_gain / avg_loss))
+        if self.atr_period:
+            true_range = high - low if first else max(high - low, abs(high - prev_close), abs(low - prev_close))
+            values['ATR'] = rolling_mean(state["ranges"], true_range, self.atr_period, count)
+
+        if commit:
+            state["count"] = count
+            state["last_index"] = index
+            state["last_close"] = close
+            state["ema"] = ema
+            if self.rsi_period:
+                state["gains"].append(gain)
+                state["losses"].append(loss)
+            if self.atr_period:
+                state["ranges"].append(true_range)
+            state["rows"].append(values)
+        return values
+
+    def _rebuild(self, df: pd.DataFrame) -> Dict:
+        """Fresh state up to the last closed bar from one vectorized pass"""
+        series = {name: values.to_numpy(dtype=float) for name, values in self._series(df).items()}
+        last = len(df) - 2
+        state = self._new_state()
+        state["count"] = last + 1
+        state["first_index"] = df.index[0]
+        state["last_index"] = df.index[last]
+        state["last_close"] = float(df['Close'].iat[last])
+        state["ema"] = {name: float(series[name][last]) for name in self.alphas}
+        for name in ("gains", "losses", "ranges"):
+            window = state[name]
+            if name in series and window.maxlen:
+                window.extend(series[name][max(last + 1 - window.maxlen, 0):last + 1].tolist())
+        first_row = max(last + 1 - state["rows"].maxlen, 0)
+        for i in range(first_row, last + 1):
+            state["rows"].append({column: float(series[column][i]) for column in self.columns})
+        return state
+
+    def _resume_at(self, state: Dict, df: pd.DataFrame) -> Optional[int]:
+        """Position of the first uncommitted bar, or None if the frame no longer matches the state"""
+        if df.index[0] != state["first_index"]:
+            return None
+        pos = df.index.searchsorted(state["last_index"])
+        if pos < len(df) - 1 and df.index[pos] == state["last_index"] and df['Close'].iat[pos] == state["last_close"]:
+            return pos + 1
+        return None
+
+    def update(self, key: Hashable, df: pd.DataFrame) -> pd.DataFrame:
+        """Last `history` bars of `df` with indicator columns (the last bar is the forming one)"""
+        with self._key_lock(key):
+            state = self.states.get(key)
+            start = self._resume_at(state, df) if state is not None and len(df) >= 2 else None
+            # Only bars not folded in yet need checking
+            prices = df[['High', 'Low', 'Close']].iloc[start or 0:].to_numpy(dtype=float)
+            if len(df) < 2 or np.isnan(prices).any():
+                self.states.pop(key, None)
+                self._count("fallbacks")
+                return self.frame(df).iloc[-self.history:]
+
+            if start is None:
+                state = self.states[key] = self._rebuild(df)
+                self._count("rebuilds")
+            else:
+                for i, (high, low, close) in enumerate(prices[:-1].tolist(), start):
+                    self._advance(state, df.index[i], high, low, close, commit=True)
+                self._count("updates")
+            high, low, close = prices[-1].tolist()
+            forming = self._advance(state, df.index[-1], high, low, close, commit=False)
+            rows = list(state["rows"]) + [forming]
+
+        out = df.iloc[-len(rows):].copy()
+        out[self.columns] = np.array([[row[column] for column in self.columns] for row in rows], dtype=float)
+        return out
+
+    def clear(self):
+        """Drop every key's state (the next update() rebuilds from the frame)"""
+        with self.lock:
+            self.states.clear()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"keys": len(self.states), "updates": self.updates,
+                    "rebuilds": self.rebuilds, "fallbacks": self.fallbacks}
+
+
+# Test function
+if __name__ == "__main__":
+    import sys
+    from timeframes import slice_period
+
+    def synthetic(interval: str, bars: int, seed: int) -> pd.DataFrame:
+        """Random-walk OHLC bars ending now"""
+        rng = np.random.default_rng(seed)
+        freq = {"1d": "D", "1h": "h", "15m": "15min"}[interval]
+        index = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor(freq), periods=bars, freq=freq)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, bars)))
+        spread = np.abs(rng.normal(0, 0.002, bars)) * close
+        return pd.DataFrame({'Open': np.r_[close[0], close[:-1]], 'High': close + spread,
+                             'Low': close - spread, 'Close': close, 'Volume': 0.0}, index=index)
+
+    if len(sys.argv) > 1:
+        # Recorded bars (MARKET_DATA_PROVIDER=record / benchmark_cycle.py --record)
+        from market_data import ReplayStore
+        store = ReplayStore(sys.argv[1])
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+        by_interval = {}
+        for entry in store.manifest.values():
+            by_interval.setdefault(entry["interval"], []).append(entry["symbol"])
+        series = [(symbol, interval) for interval, symbols in by_interval.items() for symbol in symbols[:limit]]
+        frames = {f"{symbol} {interval}": store.load(symbol, interval) for symbol, interval in series}
+    else:
+        frames = {f"SYN{seed} {interval}": synthetic(interval, bars, seed)
+                  for seed, (interval, bars) in enumerate([("1d", 900), ("1h", 1200), ("15m", 3200)])}
+
+    # Reference: the strategy's own indicator functions (importing it loads its configuration)
+    import forex_macd_strategy as strategy
+
+    def reference(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        strategy.calculate_macd(df)
+        strategy.calculate_ema(df, 200)
+        strategy.calculate_rsi(df)
+        strategy.calculate_atr(df)
+        return df
+
+    def max_diff(got: pd.DataFrame, expected: pd.DataFrame, columns) -> float:
+        """Max |diff| over the columns; NaN must line up (warm-up rows)"""
+        a, b = got[columns].to_numpy(), expected.loc[got.index, columns].to_numpy()
+        diff = np.where(np.isnan(a) & np.isnan(b), 0.0, np.abs(a - b))
+        return float(np.nan_to_num(diff, nan=np.inf).max())
+
+    macd = strategy.CONFIG['macd']
+    spec = dict(fast=macd['fast'], slow=macd['slow'], signal=macd['signal'],
+                ema_periods=(200,), rsi_period=14, atr_period=14)
+    failed = False
+
+    print("🧪 Growing download vs calculate_macd / _ema / _rsi / _atr (tolerance 1e-9)")
+    engine = StreamingIndicators(**spec)
+    for name, full in frames.items():
+        if len(full) < 300:
+            continue
+        worst = 0.0
+        for end in range(len(full) - 200, len(full) + 1):
+            frame = full.iloc[:end].copy()
+            # The forming bar is amended a few times before it closes
+            for tick in range(3):
+                frame.iloc[-1, frame.columns.get_loc('Close')] = full['Close'].iat[end - 1] + 0.01 * (tick - 1)
+                frame.iloc[-1, frame.columns.get_loc('High')] = max(frame['High'].iat[-1], frame['Close'].iat[-1])
+                frame.iloc[-1, frame.columns.get_loc('Low')] = min(frame['Low'].iat[-1], frame['Close'].iat[-1])
+                got = engine.update(name, frame)
+                worst = max(worst, max_diff(got, reference(frame), engine.columns))
+        failed |= worst >= 1e-9
+        print(f"  {name:<24} max |diff| {worst:.2e} {'✅' if worst < 1e-9 else '❌'}")
+    print(f"  {engine.stats()}")
+
+    print("🧪 Sliding download window (2y daily, 30d intraday) vs the same functions (tolerance 1e-9)")
+    engine = StreamingIndicators(**spec)
+    for name, full in frames.items():
+        period = "2y" if name.endswith(" 1d") else "30d"
+        bars = len(slice_period(full, period, now=full.index[-1])) if len(full) else 0
+        if bars < 50 or len(full) < bars + 100:
+            continue
+        worst = 0.0
+        for end in range(len(full) - 100, len(full) + 1):
+            # Same window re-downloaded within a bar, then slid forward by one
+            for frame in (full.iloc[end - bars:end], full.iloc[end - bars:end].copy()):
+                worst = max(worst, max_diff(engine.update(name, frame), reference(frame), engine.columns))
+        failed |= worst >= 1e-9
+        print(f"  {name:<24} {bars} bars | max |diff| {worst:.2e} {'✅' if worst < 1e-9 else '❌'}")
+    print(f"  {engine.stats()}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Timeframe Derivation Layer
+Builds the entry, 4H momentum and other intraday views from one base hourly
+download per symbol instead of requesting every window from Yahoo separately
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# Base download per interval: any shorter window of the same interval is sliced from it
+BASE_PERIODS = {
+    "1h": "1y",
+    # e.g. the 5d USD/INR conversion window comes out of the USD/INR instrument's 2y trend frame
+    "1d": "2y",
+}
+
+# Windows always downloaded as requested. Yahoo picks where an intraday
+# `range=30d` starts, so a slice can begin on a different bar and re-seed the
+# entry EMA-200; derive it again only after `timeframes.py DIR` passes on a
+# recording
+DIRECT_WINDOWS = {("1h", "30d")}
+
+
+def period_to_delta(period: str) -> relativedelta:
+    """Convert a Yahoo period string (30d, 1mo, 1y, ...) to a calendar delta"""
+    period = period.lower()
+    if period.endswith("mo"):
+        return relativedelta(months=int(period[:-2]))
+    if period.endswith("wk"):
+        return relativedelta(weeks=int(period[:-2]))
+    if period.endswith("d"):
+        return relativedelta(days=int(period[:-1]))
+    if period.endswith("y"):
+        return relativedelta(years=int(period[:-1]))
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def period_covers(outer: str, inner: str) -> bool:
+    """True if the `outer` period is at least as long as `inner`"""
+    ref = datetime(2000, 1, 1)
+    return ref + period_to_delta(outer) >= ref + period_to_delta(inner)
+
+
+def at_index_tz(when: pd.Timestamp, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """`when` in the timezone of `index` (its wall time for a naive index)"""
+    when = pd.Timestamp(when)
+    if index.tz is not None:
+        return when.tz_convert(index.tz) if when.tzinfo else when.tz_localize(index.tz)
+    return when.tz_localize(None) if when.tzinfo else when
+
+
+def slice_period(df: pd.DataFrame, period: str, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Return the rows a direct `period` request would have returned, i.e. every
+    bar at or after `now - period`. The slice keeps the base rows untouched so
+    indicators computed on it match the ones computed on a direct download.
+    `now` is the data provider's clock (the wall clock when omitted).
+    """
+    if df.empty:
+        return df
+    now = pd.Timestamp.now(tz=df.index.tz) if now is None else at_index_tz(now, df.index)
+    cutoff = now - period_to_delta(period)
+    return df[df.index >= cutoff]
+
+
+def is_intraday_rule(rule: str) -> bool:
+    """Fixed-length rules shorter than a day (2h, 4h, ...), whose buckets need an origin"""
+    offset = to_offset(rule)
+    return isinstance(offset, Tick) and pd.Timedelta(offset) < pd.Timedelta(days=1)
+
+
+def bucket_origin(index: pd.DatetimeIndex, rule: str, anchor: Optional[str] = None) -> Optional[pd.Timestamp]:
+    """
+    First bucket edge for an intraday `rule`: midnight of the first bar's day
+    (pandas' default), or the session open when `anchor` ("HH:MM Timezone")
+    is given, so e.g. NSE 4H buckets start at 09:15 IST.
+    """
+    if not len(index) or not is_intraday_rule(rule):
+        return None
+    if anchor is None or index.tz is None:
+        return index[0].normalize()
+    clock, tz_name = anchor.split()
+    hour, minute = (int(part) for part in clock.split(":"))
+    origin = index[0].tz_convert(tz_name).normalize() + pd.Timedelta(hours=hour, minutes=minute)
+    return origin.tz_convert(index.tz)
+
+
+def resample_ohlcv(df: pd.DataFrame, rule: str, anchor: Optional[str] = None) -> pd.DataFrame:
+    """Resample OHLCV bars to a coarser interval (e.g. 1H -> 4H), optionally session-anchored"""
+    df.index = pd.to_datetime(df.index)
+    if anchor is None:
+        return df.resample(rule).agg(OHLCV_AGG).dropna()
+    origin = bucket_origin(df.index, rule, anchor)
+    kwargs = {"origin": origin} if origin is not None else {}
+    return df.resample(rule, **kwargs).agg(OHLCV_AGG).dropna()
+
+
+class TimeframeDeriver:
+    """Maps frame requests onto base downloads and derives the requested views"""
+
+    def __init__(self, base_periods: Optional[Dict[str, str]] = None,
+                 derive_daily_symbols: Optional[set] = None, daily_base_period: str = "730d",
+                 direct_windows: Optional[set] = None):
+        self.base_periods = dict(BASE_PERIODS if base_periods is None else base_periods)
+        self.direct_windows = set(DIRECT_WINDOWS if direct_windows is None else direct_windows)
+        # Daily bars can only be rebuilt from hourly ones for 24/7 UTC markets (crypto);
+        # for those the hourly base is extended so the daily EMA-200 still has 2y of history.
+        self.derive_daily_symbols = set(derive_daily_symbols or ())
+        self.daily_base_period = daily_base_period
+
+    def base_key(self, key: Tuple[str, str, str]) -> Tuple[str, str, str]:
+        """Return the download that can serve `key` (the key itself if not derivable)"""
+        symbol, interval, period = key
+        if (interval, period) in self.direct_windows:
+            return key
+        if symbol in self.derive_daily_symbols and interval in ("1h", "1d"):
+            return (symbol, "1h", self.daily_base_period)
+        base_period = self.base_periods.get(interval)
+        if base_period and period != base_period and period_covers(base_period, period):
+            return (symbol, interval, base_period)
+        return key
+
+    def derive(self, base_df: pd.DataFrame, key: Tuple[str, str, str],
+               now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Build the frame for `key` from its base download"""
+        symbol, interval, period = key
+        if base_df.empty:
+            return base_df
+        if interval == "1d":
+            daily = resample_ohlcv(base_df.copy(deep=False), "1D")
+            return slice_period(daily, period, now)
+        return slice_period(base_df, period, now)
+
+
+# Test function
+if __name__ == "__main__":
+    import hashlib
+    import sys
+    from pathlib import Path
+    from market_data import ReplayStore
+
+    # Parity of the derived 30d entry frame with a direct 1h/30d download, both recorded live:
+    #   python3 timeframes.py --record parity_data [SYMBOL ...]   (needs internet)
+    #   python3 timeframes.py parity_data
+    if len(sys.argv) < 2:
+        sys.exit(__doc__ + "\nusage: timeframes.py [--record] DIR [SYMBOL ...]")
+    if sys.argv[1] == "--record":
+        from market_data import YFinanceProvider
+        root = Path(sys.argv[2])
+        symbols = sys.argv[3:] or ["EURUSD=X", "CL=F", "^NSEI", "RELIANCE.NS", "BTC-USD"]
+        provider = YFinanceProvider()
+        base_store, direct_store = ReplayStore(root / BASE_PERIODS["1h"]), ReplayStore(root / "30d")
+        for symbol in symbols:
+            # Back to back, so both windows end on the same forming bar
+            base_store.save(symbol, "1h", provider.history(symbol, "1h", BASE_PERIODS["1h"]))
+            direct_store.save(symbol, "1h", provider.history(symbol, "1h", "30d"))
+            print(f"  📼 {symbol}")
+        sys.exit(0)
+
+    # The strategy's own indicator functions (importing it loads its configuration)
+    import forex_macd_strategy as strategy
+
+    def indicators(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        strategy.calculate_macd(df)
+        strategy.calculate_ema(df, 200)
+        strategy.calculate_rsi(df)
+        strategy.calculate_atr(df)
+        return df
+
+    def digest(df: pd.DataFrame) -> str:
+        return hashlib.sha256(df.to_numpy().tobytes() + df.index.asi8.tobytes()).hexdigest()
+
+    root = Path(sys.argv[1])
+    base_store, direct_store = ReplayStore(root / BASE_PERIODS["1h"]), ReplayStore(root / "30d")
+    print("🧪 Derived 30d entry frame vs recorded 1h/30d download (calculate_macd / _ema / _rsi / _atr)")
+    failures = 0
+    for entry in direct_store.manifest.values():
+        symbol = entry["symbol"]
+        direct = direct_store.load(symbol, "1h")
+        base = base_store.load(symbol, "1h")
+        if direct.empty or base.empty:
+            print(f"  {symbol:<12} ⚠️ missing recording")
+            continue
+        now = pd.Timestamp(entry["recorded_at"])
+        derived = TimeframeDeriver(direct_windows=set()).derive(base, (symbol, "1h", "30d"), now)
+        a, b = indicators(direct), indicators(derived)
+        same = digest(a) == digest(b)
+        failures += not same
+        note = ""
+        if not same:
+            # Where the two first part: start of the window, or revised bars inside it
+            if len(a) != len(b) or not a.index.equals(b.index):
+                note = f" | first bar {a.index[0]} vs {b.index[0]}, last {a.index[-1]} vs {b.index[-1]}"
+            else:
+                differs = (a != b) & ~(a.isna() & b.isna())
+                row = differs.any(axis=1).idxmax()
+                note = f" | first difference at {row}: {list(differs.columns[differs.loc[row]])}"
+        print(f"  {symbol:<12} direct {len(a):4d} rows | derived {len(b):4d} rows | "
+              f"byte-identical {'✅' if same else '❌'}{note}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Indicator Warm-up Calculator
+Minimum number of bars an indicator set needs before its latest values agree
+with a full-history computation to within a tolerance, and the download
+window that holds them, so fetches and indicator passes can stop carrying
+years of history the last few values no longer depend on
+"""
+
+import math
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+def ema_warmup(span: int, tolerance: float) -> int:
+    """
+    Bars after which an ewm(span, adjust=False) seeded at an arbitrary bar
+    is within `tolerance` of the full-history value: the seed keeps a weight
+    of (1 - alpha)^n, relative to the price range it was seeded across.
+    """
+    alpha = 2.0 / (span + 1.0)
+    return math.ceil(math.log(tolerance) / math.log(1.0 - alpha))
+
+
+def macd_warmup(fast: int, slow: int, signal: int, tolerance: float) -> int:
+    """MACD and signal line: the MACD line converges first, then the signal EMA on top of it (half the tolerance each)"""
+    line = max(ema_warmup(fast, tolerance / 2), ema_warmup(slow, tolerance / 2))
+    return line + ema_warmup(signal, tolerance / 2)
+
+
+def warmup_bars(fast: int = 12, slow: int = 26, signal: int = 9, ema_periods: Iterable[int] = (),
+                rsi_period: Optional[int] = None, atr_period: Optional[int] = None,
+                tolerance: float = 1e-4, history: int = 24) -> int:
+    """
+    Bars to keep for one timeframe: the slowest warm-up plus the `history`
+    most recent bars the strategy reads. RSI / ATR rolling means are exact
+    after period + 1 bars (one bar is lost to the diff / previous close).
+    """
+    bars = macd_warmup(fast, slow, signal, tolerance)
+    for period in ema_periods:
+        bars = max(bars, ema_warmup(period, tolerance))
+    for period in (rsi_period, atr_period):
+        if period:
+            bars = max(bars, period + 1)
+    return bars + history
+
+
+def trim_frame(df: pd.DataFrame, bars: int) -> pd.DataFrame:
+    """The last `bars` rows (the frame itself when it is not longer)"""
+    return df.iloc[-bars:] if len(df) > bars else df
+
+
+def bars_per_session(session_minutes: float, bar_minutes: float) -> int:
+    """
+    Bars one trading day contributes at least: a session of that length
+    touches no fewer buckets than this, wherever the bucket edges fall.
+    """
+    return max(1, math.ceil(session_minutes / bar_minutes))
+
+
+def calendar_days(bars: int, per_day: int, days_per_week: int, margin: float = 1.2) -> int:
+    """Calendar days that hold `bars` bars, with `margin` for holidays and missing bars"""
+    trading_days = math.ceil(bars / per_day)
+    return math.ceil(trading_days * 7 / days_per_week * margin)
+
+
+# Test function
+if __name__ == "__main__":
+    import time
+    import numpy as np
+    from streaming_indicators import StreamingIndicators
+    from timeframes import resample_ohlcv
+
+    print("📏 Warm-up bars per timeframe (history = 24 bars)")
+    sets = {
+        "1D trend  (MACD, EMA-200)": dict(ema_periods=(200,)),
+        "4H momentum (MACD)": dict(),
+        "1H entry  (MACD, EMA-200, RSI/ATR-14)": dict(ema_periods=(200,), rsi_period=14, atr_period=14),
+    }
+    for label, spec in sets.items():
+        row = " | ".join(f"tol {tol:.0e}: {warmup_bars(tolerance=tol, **spec):>5}" for tol in (1e-3, 1e-4, 1e-6))
+        print(f"  {label:<38} {row}")
+
+    tolerance = 1e-4
+    bars = warmup_bars(tolerance=tolerance)
+    print(f"\n🧪 4H momentum from 1y of hourly bars: full vs last {bars} 4H bars (tol {tolerance:.0e})")
+    markets = {
+        "FX (24h x 5d)": (pd.date_range("2025-01-01", "2025-12-31", freq="1h", tz="UTC"), None, 1440, 5),
+        "NSE (09:15-15:30)": (pd.DatetimeIndex([ts for ts in pd.date_range(
+            "2025-01-01 09:15", "2025-12-31 15:15", freq="1h", tz="Asia/Kolkata")
+            if ts.weekday() < 5 and (9, 15) <= (ts.hour, ts.minute) <= (15, 15)]), "09:15 Asia/Kolkata", 375, 5),
+    }
+    engine = StreamingIndicators()
+    rng = np.random.default_rng(19)
+    for label, (idx, anchor, minutes, days) in markets.items():
+        if anchor is None:
+            idx = idx[idx.weekday < 5]
+        close = 100 + np.cumsum(rng.normal(0, 0.4, len(idx)))
+        hourly = pd.DataFrame({"Open": close, "High": close + 0.5, "Low": close - 0.5,
+                               "Close": close, "Volume": 1.0}, index=idx)
+        window = calendar_days(bars, bars_per_session(minutes, 240), days)
+        fetched = hourly[hourly.index >= idx[-1] - pd.Timedelta(days=window)]
+
+        worst, flips, ends = 0.0, 0, range(len(hourly) // 2, len(hourly), 7)
+        full_s = trimmed_s = 0.0
+        for end in ends:
+            full = resample_ohlcv(hourly.iloc[:end].copy(), "4h", anchor)
+            started = time.perf_counter()
+            a = engine.frame(full).iloc[-3:]
+            full_s += time.perf_counter() - started
+            short = trim_frame(full, bars)
+            started = time.perf_counter()
+            b = engine.frame(short).iloc[-3:]
+            trimmed_s += time.perf_counter() - started
+            price = float(full['Close'].abs().max() - full['Close'].abs().min())
+            diff = (a[engine.columns] - b[engine.columns]).abs().to_numpy().max() / price
+            worst = max(worst, float(diff))
+            # What the rules read: MACD vs signal on the last closed bar and the cross against the one before
+            state = lambda df: (df['MACD_Line'] > df['Signal_Line']).iloc[-3:-1].tolist()
+            flips += state(a) != state(b)
+        held = len(resample_ohlcv(fetched.copy(), "4h", anchor))
+        print(f"  {label:<18} 1h download {window:>3}d instead of 1y: {len(fetched):>5} vs {len(hourly)} rows "
+              f"({fetched.memory_usage().sum() / 2**10:.0f} vs {hourly.memory_usage().sum() / 2**10:.0f} KiB), "
+              f"{held} 4H bars {'✅' if held >= bars else '❌'}")
+        print(f"  {'':<18} max diff {worst:.1e} of the price range | MACD state changes "
+              f"{flips}/{len(ends)} | indicator time {full_s * 1000 / len(ends):.2f} -> {trimmed_s * 1000 / len(ends):.2f} ms")